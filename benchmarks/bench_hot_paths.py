@@ -0,0 +1,132 @@
+"""
+Micro benchmarks of FairyClient hot paths, compared with stored baselines.
+
+    python -m benchmarks.bench_hot_paths                   # compare with benchmarks/baselines.json
+    python -m benchmarks.bench_hot_paths --save-baseline   # overwrite the baselines with this run
+    python -m benchmarks.bench_hot_paths --threshold 1.3 --only parse_param
+
+Each case reports the best of --repeat rounds in microseconds per operation.
+The process exits with code 1 if any case is slower than baseline * threshold.
+Baselines are machine-dependent. Save your own before measuring an optimization.
+"""
+from typing import Callable, Dict, Tuple
+import argparse
+import base64
+import json
+import os
+import sys
+import timeit
+
+from neo_fairy_client import FairyClient, Hash160Str, Interpreter
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+from neo_fairy_client.utils.nef import NefFile, validate_contract
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+account = Hash160Str('0x' + '22' * 20)
+address = account.to_address()
+contract = Hash160Str('0x' + '11' * 20)
+
+nested_params = [
+    [i, f'string {i}', b'\xff' * 32, account, True, None, {f'key{i}': [i, b'\x00\x01', {'inner': i}]}]
+    for i in range(200)
+]
+
+
+def integer(i: int):
+    return {'type': 'Integer', 'value': str(i)}
+
+
+def byte_string(b: bytes):
+    return {'type': 'ByteString', 'value': base64.b64encode(b).decode()}
+
+
+big_array = {'type': 'Array', 'value': [integer(i * 7919) for i in range(1000)] + [byte_string(b'%d' % i) for i in range(1000)]}
+big_map = {'type': 'Map', 'value': [{'key': byte_string(i.to_bytes(20, 'little')), 'value': integer(i)} for i in range(1000)]}
+big_struct = {'type': 'Struct', 'value': [
+    {'type': 'Struct', 'value': [byte_string(i.to_bytes(32, 'little')), integer(i), {'type': 'Boolean', 'value': True}, {'type': 'Any'}]}
+    for i in range(1000)
+]}
+# 10KB script of PUSHDATA1, JMP and NOP instructions, with 100 ABI methods
+nef_10kb = NefFile(b''.join(bytes([0x0C, 4]) + b'\x00' * 4 + bytes([0x22, 2, 0x21]) for _ in range(1100)) + b'\x40').to_bytes()
+manifest_10kb = json.dumps({'name': 'Bench', 'abi': {'events': [], 'methods': [
+    {'name': f'method{i}', 'parameters': [{'name': 'a', 'type': 'Integer'}], 'returntype': 'Integer', 'offset': i * 90, 'safe': False}
+    for i in range(100)]}, 'permissions': [{'contract': '*', 'methods': ['transfer']}]})
+
+
+def new_client(url: str = 'http://localhost:16868') -> FairyClient:
+    return FairyClient(url, wallet_address_or_scripthash=account, with_print=False, function_default_relay=False)
+
+
+def cases(url: str) -> Dict[str, Tuple[Callable[[], object], int]]:
+    """
+    :return: {name: (function, operations per call of function)}
+    """
+    client = new_client()
+    remote_client = new_client(url)
+    remote_client.fairy_session = 'bench'
+    remote_client.new_snapshots_from_current_system()
+    return {
+        'parse_param[nested 200x7]': (lambda: FairyClient.parse_param(nested_params), 1),
+        'parse_single_item[Array 2000]': (lambda: client.parse_single_item(big_array), 1),
+        'parse_single_item[Map 1000]': (lambda: client.parse_single_item(big_map), 1),
+        'parse_single_item[Struct 1000x4]': (lambda: client.parse_single_item(big_struct), 1),
+        'Hash160Str(str)': (lambda: Hash160Str('0x' + '33' * 20), 1),
+        'Hash160Str.from_address': (lambda: Hash160Str.from_address(address), 1),
+        'Hash160Str.to_address': (lambda: account.to_address(), 1),
+        'Interpreter.int_to_bytes': (lambda: [Interpreter.int_to_bytes(i) for i in (1, 255, 256, 65535, 2**64, 2**255)], 6),
+        'request_body_builder': (lambda: FairyClient.request_body_builder('invokefunctionwithsession', ['bench', False, str(contract), 'balanceOf', [FairyClient.parse_param(account)], []]), 1),
+        'validate_contract[10KB]': (lambda: validate_contract(nef_10kb, manifest_10kb), 1),
+        'e2e invokefunction': (lambda: remote_client.invokefunction_of_any_contract(contract, 'balanceOf', [account], with_print=False), 1),
+        'e2e get_storage': (lambda: remote_client.get_storage_with_session(b'\x01', contract_scripthash=contract), 1),
+    }
+
+
+def measure(func: Callable[[], object], operations: int, repeat: int, min_time: float = 0.2) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat=repeat, number=number)) / number / operations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--threshold', type=float, default=1.25, help='max allowed ratio of current/baseline')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='*', default=None, help='run cases whose names contain any of these strings')
+    args = parser.parse_args()
+
+    baselines: Dict[str, float] = dict()
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    results: Dict[str, float] = dict()
+    regressions = []
+    with FairyStubServer() as server:
+        for name, (func, operations) in cases(server.url).items():
+            if args.only and not any(o in name for o in args.only):
+                continue
+            results[name] = us = measure(func, operations, args.repeat)
+            baseline = baselines.get(name)
+            if baseline:
+                ratio = us / baseline
+                flag = ' REGRESSION' if ratio > args.threshold else ''
+                if flag:
+                    regressions.append(name)
+                print(f'{name:<36}{us:>12.2f} us   baseline {baseline:>10.2f} us   x{ratio:.2f}{flag}')
+            else:
+                print(f'{name:<36}{us:>12.2f} us')
+    if args.save_baseline:
+        baselines.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f'Saved baselines to {args.baseline}')
+    elif regressions:
+        print(f'{len(regressions)} regression(s) over threshold x{args.threshold}: {regressions}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Startup time of importing the package and of running the fairy command line, in fresh interpreters.
+
+    python -m benchmarks.bench_startup --runs 20
+
+Reports the median and minimum milliseconds of wall time of each command over --runs processes,
+against a stub server in another process for the commands calling RPC.
+"""
+from typing import List
+import argparse
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+
+def measure(argv: List[str], runs: int) -> List[float]:
+    seconds = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(argv, check=True, stdout=subprocess.DEVNULL)
+        seconds.append(time.perf_counter() - started)
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    url = f'http://127.0.0.1:{port}'
+    server = subprocess.Popen([sys.executable, '-m', 'neo_fairy_client.rpc.stub_server', '--port', str(port)])
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        python = [sys.executable]
+        commands = {
+            'python -c pass': python + ['-c', 'pass'],
+            'import neo_fairy_client': python + ['-c', 'import neo_fairy_client'],
+            'import FairyClient': python + ['-c', 'from neo_fairy_client import FairyClient'],
+            'fairy --help': python + ['-m', 'neo_fairy_client', '--help'],
+            'fairy blockcount': python + ['-m', 'neo_fairy_client', '--url', url, 'blockcount'],
+            'fairy snapshots': python + ['-m', 'neo_fairy_client', '--url', url, 'snapshots'],
+            'fairy invoke': python + ['-m', 'neo_fairy_client', '--url', url, '-s', 'bench', '-w', '0x' + '22' * 20, 'invoke', '0x' + '33' * 20, 'main'],
+        }
+        print(f'{"command":<26}{"median ms":>10}{"min ms":>10}')
+        for name, argv in commands.items():
+            seconds = measure(argv, args.runs)
+            print(f'{name:<26}{statistics.median(seconds) * 1000:>10.1f}{min(seconds) * 1000:>10.1f}')
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
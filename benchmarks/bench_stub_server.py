@@ -0,0 +1,110 @@
+"""
+Drive FairyClient against the in-process FairyStubServer and report
+calls/sec, p50/p99 latency and client CPU time per call.
+
+    python -m benchmarks.bench_stub_server --calls 2000 --threads 1 4 16 --latency-ms 0 1
+
+The stub server shares the GIL with the client when run in-process.
+To measure the client alone, serve the stub from another process and point --url to it:
+
+    python -m neo_fairy_client.rpc.stub_server --port 16869
+    python -m benchmarks.bench_stub_server --url http://127.0.0.1:16869
+"""
+from typing import Callable, Dict, List
+import argparse
+import statistics
+import threading
+import time
+
+from neo_fairy_client import FairyClient, Hash160Str
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+
+contract = Hash160Str('0x' + '11' * 20)
+account = Hash160Str('0x' + '22' * 20)
+
+OPERATIONS: Dict[str, Callable[[FairyClient], object]] = {
+    'invokefunction': lambda c: c.invokefunction_of_any_contract(contract, 'balanceOf', [account], relay=False, with_print=False),
+    'put_storage': lambda c: c.put_storage_with_session(b'\x01key', 1, contract_scripthash=contract),
+    'get_storage': lambda c: c.get_storage_with_session(b'\x01key', contract_scripthash=contract),
+    'list_snapshots': lambda c: c.list_snapshots(),
+    'get_many_blocks': lambda c: c.get_many_blocks([0, 99]),
+}
+
+
+def new_client(url: str, session: str) -> FairyClient:
+    import requests
+    return FairyClient(url, wallet_address_or_scripthash=account, fairy_session=session, with_print=False,
+                       function_default_relay=False, requests_session=requests.Session(), auto_preparation=False)
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def run(url: str, operation: str, calls: int, threads: int) -> Dict[str, float]:
+    func = OPERATIONS[operation]
+    latencies: List[float] = []
+    cpu_times: List[float] = []
+    lock = threading.Lock()
+    calls_per_thread = max(1, calls // threads)
+
+    def worker(index: int):
+        client = new_client(url, f'bench-{index}')
+        client.new_snapshots_from_current_system()
+        func(client)  # warm up the connection
+        local_latencies = []
+        cpu_start = time.thread_time()
+        for _ in range(calls_per_thread):
+            start = time.perf_counter()
+            func(client)
+            local_latencies.append(time.perf_counter() - start)
+        cpu = time.thread_time() - cpu_start
+        with lock:
+            latencies.extend(local_latencies)
+            cpu_times.append(cpu)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    wall_start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    wall = time.perf_counter() - wall_start
+    latencies.sort()
+    return {
+        'calls': len(latencies),
+        'calls_per_sec': len(latencies) / wall,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000,
+        'cpu_us_per_call': sum(cpu_times) / len(latencies) * 1_000_000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--latency-ms', type=float, nargs='+', default=[0.0])
+    parser.add_argument('--operations', nargs='+', default=list(OPERATIONS), choices=list(OPERATIONS))
+    parser.add_argument('--url', default=None, help='an external stub server; --latency-ms is ignored')
+    args = parser.parse_args()
+    print(f'{"operation":<16}{"latency":>8}{"threads":>8}{"calls/s":>10}{"p50 ms":>9}{"p99 ms":>9}{"cpu us/call":>13}')
+
+    def report(url: str, latency_ms: float):
+        for operation in args.operations:
+            for threads in args.threads:
+                r = run(url, operation, args.calls, threads)
+                print(f'{operation:<16}{latency_ms:>8.1f}{threads:>8}{r["calls_per_sec"]:>10.0f}'
+                      f'{r["p50_ms"]:>9.3f}{r["p99_ms"]:>9.3f}{r["cpu_us_per_call"]:>13.1f}')
+
+    if args.url:
+        report(args.url, 0.0)
+        return
+    for latency_ms in args.latency_ms:
+        with FairyStubServer(latency=latency_ms / 1000) as server:
+            report(server.url, latency_ms)
+
+
+if __name__ == '__main__':
+    main()
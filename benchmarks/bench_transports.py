@@ -0,0 +1,84 @@
+"""
+Per-call overhead of each HTTP transport of FairyClient against a local stub server.
+
+    python -m benchmarks.bench_transports --calls 5000
+    python -m benchmarks.bench_transports --url http://127.0.0.1:16869 --threads 1 8
+
+For each transport, reports microseconds of wall time and of client CPU time per call,
+for posting a small JSON-RPC body with the transport alone ('post'), and for FairyClient.get_block_count ('client').
+The stub server shares the GIL with the client when run in-process; serve it from another process
+(python -m neo_fairy_client.rpc.stub_server --port 16869) to measure the client alone.
+"""
+from typing import Dict, List
+import argparse
+import threading
+import time
+
+from neo_fairy_client import FairyClient, Hash160Str
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+from neo_fairy_client.rpc.transports import TRANSPORTS, make_transport
+
+account = Hash160Str('0x' + '22' * 20)
+body = '{"jsonrpc":"2.0","method":"getblockcount","params":[],"id":1}'
+
+
+def run(url: str, transport_name: str, mode: str, calls: int, threads: int) -> Dict[str, float]:
+    transport = make_transport(transport_name, pool_maxsize=max(threads, 1))
+    cpu_times: List[float] = []
+    lock = threading.Lock()
+    calls_per_thread = max(1, calls // threads)
+
+    def worker():
+        if mode == 'client':
+            client = FairyClient(url, account, with_print=False, requests_session=transport, auto_preparation=False)
+            call = client.get_block_count
+        else:
+            call = lambda: transport.post(url, body).text
+        call()  # warm up the connection
+        cpu_start = time.thread_time()
+        for _ in range(calls_per_thread):
+            call()
+        with lock:
+            cpu_times.append(time.thread_time() - cpu_start)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    wall_start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    wall = time.perf_counter() - wall_start
+    total_calls = calls_per_thread * threads
+    return {
+        'calls_per_sec': total_calls / wall,
+        'us_per_call': wall / total_calls * threads * 1_000_000,
+        'cpu_us_per_call': sum(cpu_times) / total_calls * 1_000_000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=3000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1])
+    parser.add_argument('--transports', nargs='+', default=list(TRANSPORTS), choices=list(TRANSPORTS))
+    parser.add_argument('--url', default=None, help='an external stub server')
+    args = parser.parse_args()
+    print(f'{"transport":<13}{"mode":<8}{"threads":>8}{"calls/s":>10}{"us/call":>10}{"cpu us/call":>13}')
+
+    def report(url: str):
+        for mode in ('post', 'client'):
+            for transport_name in args.transports:
+                for threads in args.threads:
+                    r = run(url, transport_name, mode, args.calls, threads)
+                    print(f'{transport_name:<13}{mode:<8}{threads:>8}{r["calls_per_sec"]:>10.0f}'
+                          f'{r["us_per_call"]:>10.1f}{r["cpu_us_per_call"]:>13.1f}')
+
+    if args.url:
+        report(args.url)
+        return
+    with FairyStubServer() as server:
+        report(server.url)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,69 @@
-from neo_fairy_client.rpc import *
-from neo_fairy_client.utils import *
+"""
+Names of the package are imported on first access (PEP 562), so that `import neo_fairy_client`
+and the `fairy` command line start without loading requests, urllib3 and the whole client until they are used.
+
+    from neo_fairy_client import FairyClient, Hash160Str  # imports the modules defining them
+"""
+import importlib
+
+_EXPORTS = {
+    'neo_fairy_client.rpc.fairy_client': ('FairyClient', 'RpcBreakpoint', 'DebugFrame', 'DebugState'),
+    'neo_fairy_client.utils.types': ('Hash160Str', 'Hash256Str', 'UInt160', 'UInt256', 'PublicKeyStr', 'Signer',
+                                     'WitnessScope', 'VMState', 'NamedCurveHash'),
+    'neo_fairy_client.utils.interpreters': ('Interpreter',),
+    'neo_fairy_client.utils.misc': ('to_list',),
+    'neo_fairy_client.utils': ('ContractManagementAddress', 'CryptoLibAddress', 'GasAddress', 'LedgerAddress',
+                               'NeoAddress', 'OracleAddress', 'PolicyAddress', 'RoleManagementAddress', 'StdLibAddress',
+                               'defaultFairyWalletPublicKeySecp256R1', 'defaultFairyWalletPublicKeySecp256K1',
+                               'defaultFairyWalletScriptHash'),
+    'enum': ('Enum',),
+    'neo_fairy_client.rpc.events': ('RpcCallEvent', 'RpcEventDispatcher'),
+    'neo_fairy_client.rpc.record_replay': ('RecordingSession', 'ReplaySession', 'requests_session_from_environment'),
+    'neo_fairy_client.rpc.cache': ('InvocationCache', 'ContractMetadata', 'ContractMetadataCache', 'BreakpointCache'),
+    'neo_fairy_client.rpc.deploy_cache': ('DeployCache', 'DeployArtifacts'),
+    'neo_fairy_client.utils.nef': ('NefFile', 'MethodToken', 'validate_manifest', 'validate_contract', 'compute_contract_hash'),
+    'neo_fairy_client.utils.script_builder': ('ScriptBuilder',),
+    'neo_fairy_client.utils.debug_info': ('DebugInfoIndex', 'DebugMethod', 'SequencePoint'),
+    'neo_fairy_client.rpc.debugger': ('ConditionalBreakpoint', 'ConditionalDebugger'),
+    'neo_fairy_client.rpc.trace': ('ExecutionTrace', 'TraceRow'),
+    'neo_fairy_client.rpc.profiler': ('ExecutionProfile', 'ProfileEntry'),
+    'neo_fairy_client.rpc.tracker': ('TransactionTracker',),
+    'neo_fairy_client.rpc.relay': ('RelayPipeline', 'RelayReport', 'RelayResult'),
+    'neo_fairy_client.utils.transaction': ('Transaction', 'Witness', 'transaction_hash'),
+    'neo_fairy_client.rpc.fees': ('NetworkFeeEstimator',),
+    'neo_fairy_client.rpc.endpoints': ('Endpoint', 'EndpointPool'),
+    'neo_fairy_client.rpc.retry': ('RetryPolicy',),
+    'neo_fairy_client.rpc.transports': ('HttpClientTransport', 'Urllib3Transport', 'TransportResponse', 'make_transport'),
+    'neo_fairy_client.rpc.compression': ('HttpCompression',),
+}
+_MODULE_OF_NAME = {name: module for module, names in _EXPORTS.items() for name in names}
+# submodules bound by `from neo_fairy_client import *` before names were imported lazily
+_SUBMODULES = ('rpc', 'utils', 'fairy_client', 'types', 'interpreters', 'misc', 'timers', 'oracle')
+__all__ = list(_MODULE_OF_NAME) + list(_SUBMODULES)
+
+
+def __getattr__(name: str):
+    module = _MODULE_OF_NAME.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module(module), name)
+        globals()[name] = value  # later accesses do not call __getattr__
+        return value
+    if name.startswith('__'):
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    if name in {'rpc', 'utils'}:
+        return importlib.import_module(f'{__name__}.{name}')
+    # submodules formerly reachable as attributes of the package, e.g. neo_fairy_client.types
+    for package in ('utils', 'rpc'):
+        try:
+            value = importlib.import_module(f'{__name__}.{package}.{name}')
+        except ModuleNotFoundError as e:
+            if e.name != f'{__name__}.{package}.{name}':
+                raise
+            continue
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
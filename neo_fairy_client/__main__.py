@@ -0,0 +1,4 @@
+import sys
+from neo_fairy_client.cli import main
+
+sys.exit(main())
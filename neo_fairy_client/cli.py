@@ -0,0 +1,245 @@
+"""
+Command line for common Fairy operations, for shell scripts and CI.
+
+    fairy hello
+    fairy snapshots new test
+    fairy -s test deploy ../NFTLoan/NFTLoan/bin/sc/NFTFlashLoan.nef --deploy-cache .fairy_deploy_cache.json
+    fairy -s test invoke 0x5c1068339fae89eb1a743909d0213e1d99dc5dc9 balanceOf 0xd2cefc96ad5cb7b625a0986ef6badde0533731d5
+    fairy -s test storage 0x5c1068339fae89eb1a743909d0213e1d99dc5dc9 --prefix 01
+    fairy blocks 0 10
+    fairy snapshots copy test test-backup
+    fairy snapshots delete test test-backup
+
+Results are printed as JSON on stdout. Errors are printed on stderr with exit status 1 (2 for usage errors).
+--url, --session and --wallet default to $FAIRY_URL, $FAIRY_SESSION and $FAIRY_WALLET.
+Plain RPC commands are posted with http.client and json of the standard library;
+only deploy and invoke import FairyClient (and requests), keeping the startup of the other commands short.
+"""
+from typing import Any, List, Union
+import argparse
+import base64
+import json
+import os
+import sys
+
+DEFAULT_URL = 'http://localhost:16868'
+
+
+def rpc(url: str, method: str, params: List[Any], timeout: Union[float, None] = None) -> Any:
+    """
+    Post a single JSON-RPC call without FairyClient
+    :return: the result of the call
+    :raise ValueError: for JSON-RPC errors and non-JSON responses
+    """
+    import http.client
+    from urllib.parse import urlsplit
+    from neo_fairy_client.rpc.compression import decode_content
+    parsed = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parsed.scheme == 'https' else http.client.HTTPConnection
+    connection = connection_class(parsed.hostname, parsed.port, timeout=timeout)
+    path = (parsed.path or '/') + (f'?{parsed.query}' if parsed.query else '')
+    body = json.dumps({'jsonrpc': '2.0', 'method': method, 'params': params, 'id': 1})
+    try:
+        connection.request('POST', path, body, {'Content-Type': 'application/json', 'Accept-Encoding': 'gzip'})
+        response = connection.getresponse()
+        content = decode_content(response.getheader('Content-Encoding'), response.read())
+    finally:
+        connection.close()
+    try:
+        result = json.loads(content)
+    except ValueError:
+        raise ValueError(f'HTTP {response.status} from {url}: {content[:256]!r}')
+    if 'error' in result:
+        raise ValueError(result['error'])
+    return result['result']
+
+
+def parse_argument(argument: str) -> Any:
+    """
+    Parameter of invoke from the command line:
+    0x + 40 hex digits is a Hash160, 0x + 64 hex digits a Hash256, an address starting with N a Hash160,
+    JSON (42, true, null, [1, "a"], {"k": 1}, "quoted") its value, and anything else a string
+    """
+    from neo_fairy_client.utils.types import Hash160Str, Hash256Str
+    hex_digits = argument[2:] if argument.startswith('0x') else None
+    if hex_digits is not None and all(c in '0123456789abcdefABCDEF' for c in hex_digits):
+        if len(hex_digits) == 40:
+            return Hash160Str(argument)
+        if len(hex_digits) == 64:
+            return Hash256Str(argument)
+    if len(argument) == 34 and argument.startswith('N'):
+        try:
+            return Hash160Str.from_address(argument)
+        except Exception:
+            pass
+    try:
+        return json.loads(argument)
+    except ValueError:
+        return argument
+
+
+def to_json(value: Any) -> Any:
+    """
+    :return: value with bytes as hex, tuples as lists, enums by name and keys as str, for json.dumps
+    """
+    from enum import Enum
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).hex()
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, (list, tuple)):
+        return [to_json(v) for v in value]
+    if isinstance(value, dict):
+        return {k if isinstance(k, str) else json.dumps(to_json(k)): to_json(v) for k, v in value.items()}
+    return value
+
+
+def encode_bytes(data: bytes, encoding: str) -> str:
+    if encoding == 'hex':
+        return data.hex()
+    if encoding == 'base64':
+        return base64.b64encode(data).decode()
+    return data.decode('utf-8', errors='backslashreplace')
+
+
+def decode_bytes(text: str, encoding: str) -> bytes:
+    if encoding == 'hex':
+        return bytes.fromhex(text[2:] if text.startswith('0x') else text)
+    if encoding == 'base64':
+        return base64.b64decode(text)
+    return text.encode()
+
+
+def require_session(args: argparse.Namespace) -> str:
+    if not args.session:
+        raise ValueError(f'{args.command} needs a fairy session: --session or $FAIRY_SESSION')
+    return args.session
+
+
+def make_client(args: argparse.Namespace, **kwargs):
+    from neo_fairy_client.rpc.fairy_client import FairyClient
+    return FairyClient(args.url, args.wallet, fairy_session=args.session, with_print=False, auto_preparation=False,
+                       requests_timeout=args.timeout, **kwargs)
+
+
+def command_hello(args: argparse.Namespace) -> Any:
+    return rpc(args.url, 'hellofairy', [], args.timeout)
+
+
+def command_blockcount(args: argparse.Namespace) -> Any:
+    return rpc(args.url, 'getblockcount', [], args.timeout)
+
+
+def command_snapshots(args: argparse.Namespace) -> Any:
+    names = args.names
+    if args.action == 'list':
+        return rpc(args.url, 'listsnapshots', [], args.timeout)
+    if args.action in {'copy', 'rename'}:
+        if len(names) != 2:
+            raise ValueError(f'snapshots {args.action} needs the old and the new name')
+        return rpc(args.url, f'{args.action}snapshot', names, args.timeout)
+    names = names or ([args.session] if args.session else [])
+    if not names:
+        raise ValueError(f'snapshots {args.action} needs names of snapshots, or --session')
+    method = 'newsnapshotsfromcurrentsystem' if args.action == 'new' else 'deletesnapshots'
+    return rpc(args.url, method, names, args.timeout)
+
+
+def command_storage(args: argparse.Namespace) -> Any:
+    from neo_fairy_client.utils.types import Hash160Str
+    session = require_session(args)
+    prefix = decode_bytes(args.prefix, args.encoding)
+    storage = rpc(args.url, 'findstoragewithsession',
+                  [session, str(Hash160Str.from_str_or_int(args.contract)), base64.b64encode(prefix).decode(), args.debug],
+                  args.timeout)
+    return {encode_bytes(base64.b64decode(k), args.encoding): encode_bytes(base64.b64decode(v), args.encoding)
+            for k, v in storage.items()}
+
+
+def command_blocks(args: argparse.Namespace) -> Any:
+    return rpc(args.url, 'getmanyblocks', [int(i) if i.isdigit() else i for i in args.indexes_or_hashes], args.timeout)
+
+
+def command_deploy(args: argparse.Namespace) -> Any:
+    require_session(args)
+    deploy_cache = None
+    if args.deploy_cache:
+        from neo_fairy_client.rpc.deploy_cache import DeployCache
+        deploy_cache = DeployCache(args.deploy_cache)
+    client = make_client(args, deploy_cache=deploy_cache)
+    return client.virutal_deploy_from_path(args.nef_path, data=parse_argument(args.data) if args.data is not None else None,
+                                           auto_dumpnef=not args.no_dumpnef, auto_set_debug_info=not args.no_debug_info)
+
+
+def command_invoke(args: argparse.Namespace) -> Any:
+    client = make_client(args)
+    return client.invokefunction_of_any_contract(args.contract, args.method, [parse_argument(a) for a in args.arguments],
+                                                 relay=args.relay, with_print=False)
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='fairy', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default=os.environ.get('FAIRY_URL', DEFAULT_URL), help='rpc server; default $FAIRY_URL or %(default)s')
+    parser.add_argument('-s', '--session', default=os.environ.get('FAIRY_SESSION'), help='fairy session; default $FAIRY_SESSION')
+    parser.add_argument('-w', '--wallet', default=os.environ.get('FAIRY_WALLET'),
+                        help='address or scripthash signing deploys and invocations; default $FAIRY_WALLET')
+    parser.add_argument('--timeout', type=float, default=None, help='seconds for each request')
+    parser.add_argument('--indent', type=int, default=None, help='indent the JSON output')
+    commands = parser.add_subparsers(dest='command', metavar='command', required=True)
+
+    commands.add_parser('hello', help='hellofairy').set_defaults(function=command_hello)
+    commands.add_parser('blockcount', help='getblockcount').set_defaults(function=command_blockcount)
+
+    snapshots = commands.add_parser('snapshots', help='list, create, copy, rename or delete snapshots')
+    snapshots.add_argument('action', nargs='?', default='list', choices=['list', 'new', 'copy', 'rename', 'delete'])
+    snapshots.add_argument('names', nargs='*', help='snapshots to create or delete (default: --session), or old and new name')
+    snapshots.set_defaults(function=command_snapshots)
+
+    storage = commands.add_parser('storage', help='dump the storage of a contract in the session')
+    storage.add_argument('contract', help='scripthash of the contract')
+    storage.add_argument('--prefix', default='', help='only keys starting with this prefix, in --encoding')
+    storage.add_argument('--encoding', default='hex', choices=['hex', 'base64', 'text'], help='of keys, values and prefix')
+    storage.add_argument('--debug', action='store_true', help='read the debug snapshot instead of the test snapshot')
+    storage.set_defaults(function=command_storage)
+
+    blocks = commands.add_parser('blocks', help='getmanyblocks: all blocks from START to END, or the blocks of each index or hash')
+    blocks.add_argument('indexes_or_hashes', nargs='+', metavar='INDEX_OR_HASH')
+    blocks.set_defaults(function=command_blocks)
+
+    deploy = commands.add_parser('deploy', help='virtual deploy a .nef with its manifest, dumpnef and debug info')
+    deploy.add_argument('nef_path')
+    deploy.add_argument('--data', default=None, help='parameter of _deploy, parsed as arguments of invoke')
+    deploy.add_argument('--deploy-cache', default=os.environ.get('FAIRY_DEPLOY_CACHE'),
+                        help='DeployCache index file skipping repeated deploys; default $FAIRY_DEPLOY_CACHE')
+    deploy.add_argument('--no-dumpnef', action='store_true')
+    deploy.add_argument('--no-debug-info', action='store_true')
+    deploy.set_defaults(function=command_deploy)
+
+    invoke = commands.add_parser('invoke', help='invoke a method of a contract, in the session if any',
+                                 description=parse_argument.__doc__)
+    invoke.add_argument('contract', help='scripthash of the contract')
+    invoke.add_argument('method')
+    invoke.add_argument('arguments', nargs='*')
+    invoke.add_argument('--relay', action='store_true', help='write the result to the session')
+    invoke.set_defaults(function=command_invoke)
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = make_parser().parse_args(argv)
+    stdout = sys.stdout
+    sys.stdout = sys.stderr  # prints and warnings of the client do not mix with the JSON output
+    try:
+        result = args.function(args)
+    except (ValueError, OSError) as e:
+        print(f'ERROR: {e}', file=sys.stderr)
+        return 1
+    finally:
+        sys.stdout = stdout
+    json.dump(to_json(result), sys.stdout, indent=args.indent)
+    sys.stdout.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
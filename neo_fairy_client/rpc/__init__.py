@@ -1 +1,16 @@
-from neo_fairy_client.rpc.fairy_client import FairyClient, RpcBreakpoint
\ No newline at end of file
+import importlib
+
+# imported on first access (PEP 562): importing a module of neo_fairy_client.rpc does not load the client and requests
+__all__ = ['FairyClient', 'RpcBreakpoint', 'DebugFrame', 'DebugState']
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        value = getattr(importlib.import_module('neo_fairy_client.rpc.fairy_client'), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
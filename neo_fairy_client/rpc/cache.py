@@ -0,0 +1,236 @@
+from typing import Any, Dict, Hashable, List, Set, Tuple, Union
+from collections import OrderedDict
+import base64
+import copy
+import json
+import threading
+
+from neo_fairy_client.utils import ContractManagementAddress, Hash160Str, UInt160
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 4096):
+        if maxsize <= 0:
+            raise ValueError(f'Expected maxsize > 0. Got {maxsize}')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key: Hashable):
+        return key in self._data
+
+
+class InvocationCache:
+    def __init__(self, maxsize: int = 4096):
+        """
+        Caches results of RPC calls reading a fairy session without writing to it
+        (invocations with relay=False, getcontract, listcontracts, get/find storage),
+        keyed by the session and the whole request body (contract, operation, encoded params, signers).
+        FairyClient invalidates all entries of a session whenever it sends any call that may change the session.
+        Invalidation is O(1): the version of the session is increased, and old entries are evicted as least recently used.
+        Changes made by other clients to the same session are not observed.
+        Do not cache invocations whose results depend on Runtime.GetRandom or time, unless the session has them designated.
+        :param maxsize: max count of cached results
+        """
+        self.entries = LRUCache(maxsize)
+        self.session_versions: Dict[str, int] = dict()
+
+    def _key(self, fairy_session: str, post_data: str) -> Tuple[str, int, str]:
+        return fairy_session, self.session_versions.get(fairy_session, 0), post_data
+
+    def get(self, fairy_session: str, post_data: str) -> Union[Tuple[Any, dict], None]:
+        """
+        :return: (parsed result, raw result) or None
+        """
+        cached = self.entries.get(self._key(fairy_session, post_data))
+        if cached is None:
+            return None
+        parsed_result, raw_result = cached
+        if type(parsed_result) in {list, dict, tuple}:
+            parsed_result = copy.deepcopy(parsed_result)  # do not let callers modify the cache
+        return parsed_result, raw_result
+
+    def put(self, fairy_session: str, post_data: str, parsed_result: Any, raw_result: dict):
+        if type(parsed_result) in {list, dict, tuple}:
+            parsed_result = copy.deepcopy(parsed_result)
+        self.entries.put(self._key(fairy_session, post_data), (parsed_result, raw_result))
+
+    def invalidate_session(self, fairy_session: str):
+        self.session_versions[fairy_session] = self.session_versions.get(fairy_session, 0) + 1
+
+    def clear(self):
+        self.entries.clear()
+        self.session_versions.clear()
+
+    @property
+    def hits(self) -> int:
+        return self.entries.hits
+
+    @property
+    def misses(self) -> int:
+        return self.entries.misses
+
+
+class ContractMetadata:
+    def __init__(self, contract_hash: Union[str, int, Hash160Str], manifest: Union[str, dict], nef: bytes = None,
+                 contract_state: dict = None):
+        """
+        What a client needs to know about a deployed contract, parsed once.
+        :param manifest: manifest json str or parsed dict
+        :param nef: content of the .nef file
+        :param contract_state: result of RPC getcontract, if fetched
+        """
+        self.contract_hash: Hash160Str = Hash160Str.from_str_or_int(contract_hash)
+        self.manifest: dict = json.loads(manifest) if type(manifest) is str else manifest
+        self.name: str = self.manifest['name']
+        self.nef: Union[bytes, None] = nef
+        self.contract_state: Union[dict, None] = contract_state
+        self.nef_checksum: Union[int, None] = int.from_bytes(nef[-4:], 'little') if nef else None
+        # {method name: {parameter count: method descriptor in manifest abi}}
+        self.abi_methods: Dict[str, Dict[int, dict]] = dict()
+        for method in self.manifest.get('abi', {}).get('methods', []):
+            self.abi_methods.setdefault(method['name'], dict())[len(method['parameters'])] = method
+
+    @classmethod
+    def from_contract_state(cls, contract_state: dict) -> 'ContractMetadata':
+        nef = base64.b64decode(contract_state['nefFile']) if contract_state.get('nefFile') else None
+        return cls(contract_state['hash'], contract_state['manifest'], nef=nef, contract_state=contract_state)
+
+    def get_abi_method(self, name: str, parameter_count: int = None) -> Union[dict, None]:
+        """
+        :param parameter_count: None to return any overload of the method
+        """
+        overloads = self.abi_methods.get(name)
+        if not overloads:
+            return None
+        if parameter_count is None:
+            return next(iter(overloads.values()))
+        return overloads.get(parameter_count)
+
+    def __repr__(self):
+        return f'ContractMetadata {self.name} {self.contract_hash}'
+
+
+class ContractMetadataCache:
+    def __init__(self):
+        """
+        Per-session cache of ContractMetadata, populated by FairyClient from deploys and get_contract.
+        FairyClient drops a session when the snapshot is created, deleted, renamed or copied to,
+        and drops a contract when ContractManagement notifies Deploy, Update or Destroy of it in a relayed invocation.
+        """
+        self.sessions: Dict[str, Dict[str, ContractMetadata]] = dict()
+        self._lock = threading.Lock()
+
+    def get(self, fairy_session: str, contract_hash: str) -> Union[ContractMetadata, None]:
+        return self.sessions.get(fairy_session, {}).get(str(contract_hash))
+
+    def put(self, fairy_session: str, metadata: ContractMetadata):
+        with self._lock:
+            self.sessions.setdefault(fairy_session, dict())[str(metadata.contract_hash)] = metadata
+
+    def invalidate_contract(self, fairy_session: str, contract_hash: str):
+        with self._lock:
+            self.sessions.get(fairy_session, {}).pop(str(contract_hash), None)
+
+    def invalidate_session(self, fairy_session: str):
+        with self._lock:
+            self.sessions.pop(fairy_session, None)
+
+    def clear(self):
+        with self._lock:
+            self.sessions.clear()
+
+    def observe_notifications(self, fairy_session: str, notifications: List[dict]):
+        """
+        Drop contracts deployed, updated or destroyed according to the notifications of a relayed invocation
+        """
+        for notification in notifications:
+            if notification.get('contract') != ContractManagementAddress.to_str() \
+                    or notification.get('eventname') not in {'Deploy', 'Update', 'Destroy'}:
+                continue
+            try:
+                contract_hash = Hash160Str.from_UInt160(UInt160(base64.b64decode(notification['state']['value'][0]['value'])))
+            except (KeyError, IndexError, TypeError, ValueError):
+                self.invalidate_session(fairy_session)
+                return
+            self.invalidate_contract(fairy_session, contract_hash)
+
+
+class BreakpointCache:
+    def __init__(self):
+        """
+        Breakpoints known to be set on the server for each contract, kept by FairyClient from the results of
+        every breakpoint call it sends, so that FairyClient.sync_breakpoints can send only the differences.
+        A contract is unknown until its breakpoints are listed or all deleted,
+        and becomes unknown again when a breakpoint call for it fails.
+        """
+        self.assembly: Dict[str, Set[int]] = dict()
+        self.source_code: Dict[str, Set[Tuple[str, int]]] = dict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def pairs(filename_and_line_num: List[Union[str, int]]) -> Set[Tuple[str, int]]:
+        return {(filename_and_line_num[i], int(filename_and_line_num[i + 1])) for i in range(0, len(filename_and_line_num) - 1, 2)}
+
+    def forget(self, contract: str):
+        with self._lock:
+            self.assembly.pop(str(contract), None)
+            self.source_code.pop(str(contract), None)
+
+    def observe(self, method: str, parameters: List, raw_result: Union[dict, None]):
+        """
+        :param raw_result: the JSON-RPC response of a breakpoint call; None if no response was received
+        """
+        contract = str(parameters[0])
+        if raw_result is None or 'error' in raw_result:
+            self.forget(contract)
+            return
+        result, arguments = raw_result.get('result'), parameters[1:]
+        with self._lock:
+            if method == 'listassemblybreakpoints' and type(result) is list:
+                self.assembly[contract] = {int(ip) for ip in result}
+            elif method == 'deleteassemblybreakpoints' and not arguments:
+                self.assembly[contract] = set()
+            elif method == 'deleteassemblybreakpoints' and contract in self.assembly:
+                self.assembly[contract].difference_update(int(ip) for ip in arguments)
+            elif method == 'setassemblybreakpoints' and contract in self.assembly:
+                self.assembly[contract].update(int(ip) for ip in arguments)
+            elif method == 'listsourcecodebreakpoints' and type(result) is list:
+                self.source_code[contract] = {(b['filename'], int(b['line'])) for b in result}
+            elif method == 'deletesourcecodebreakpoints' and not arguments:
+                self.source_code[contract] = set()
+            elif method == 'deletesourcecodebreakpoints' and contract in self.source_code:
+                self.source_code[contract].difference_update(self.pairs(arguments))
+            elif method == 'setsourcecodebreakpoints' and contract in self.source_code:
+                self.source_code[contract].update(self.pairs(arguments))
@@ -0,0 +1,141 @@
+"""
+Compression of JSON-RPC bodies over slow links.
+
+    compression = HttpCompression(compress_requests_above=16 * 1024)
+    client = FairyClient(target_url, wallet, compression=compression)
+    ...
+    print(compression)  # bytes sent and received, before and after compression
+
+Responses: every request asks for gzip or deflate encoded responses with Accept-Encoding,
+which the RpcServer of neo-cli gives for large JSON results (getmanyblocks, findstorage, ...).
+Requests: bodies larger than compress_requests_above (virtual deploys and debug info with NEFs, manifests
+and dumpnef files) are sent gzip encoded. A server rejecting compressed bodies (HTTP 400/415, or JSON-RPC parse error)
+gets the body again uncompressed, and no more compressed bodies.
+"""
+from typing import Dict, Tuple, Union
+import gzip
+import threading
+import zlib
+
+ENCODING_HEADER = 'Content-Encoding'
+
+
+def decode_content(content_encoding: Union[str, None], content: bytes) -> bytes:
+    """
+    :param content_encoding: the Content-Encoding header of a response
+    """
+    encoding = (content_encoding or '').strip().lower()
+    if not encoding or encoding == 'identity':
+        return content
+    if encoding in {'gzip', 'x-gzip'}:
+        return gzip.decompress(content)
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(content)
+        except zlib.error:  # raw deflate without zlib header, sent by some servers
+            return zlib.decompress(content, -zlib.MAX_WBITS)
+    raise ValueError(f'Unsupported Content-Encoding {content_encoding}')
+
+
+def wire_size(response) -> int:
+    """
+    :return: bytes of the response body received, before decoding
+    """
+    size = getattr(response, 'wire_size', None)  # TransportResponse
+    if size is not None:
+        return size
+    raw = getattr(response, 'raw', None)  # requests.Response, decoded by urllib3
+    if raw is not None and hasattr(raw, 'tell'):
+        try:
+            return raw.tell()
+        except Exception:
+            pass
+    return len(response.content) if hasattr(response, 'content') else len(response.text.encode())
+
+
+class HttpCompression:
+    def __init__(self, accept_encoding: str = 'gzip, deflate', compress_requests_above: Union[int, None] = None,
+                 level: int = 6):
+        """
+        :param accept_encoding: of the responses. None to receive uncompressed responses
+        :param compress_requests_above: gzip request bodies larger than this many bytes. None to never compress requests
+        :param level: gzip level of request bodies, from 1 (fastest) to 9 (smallest)
+        """
+        self.accept_encoding = accept_encoding
+        self.compress_requests_above = compress_requests_above
+        self.level = level
+        self.compressed_requests_rejected: Dict[str, bool] = dict()  # {url: True if the server rejects compressed bodies}
+        self.requests = 0
+        self.compressed_requests = 0
+        self.request_bytes = 0  # bodies before compression
+        self.request_bytes_sent = 0
+        self.response_bytes = 0  # bodies after decoding
+        self.response_bytes_received = 0
+        self._lock = threading.Lock()
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.request_bytes - self.request_bytes_sent + self.response_bytes - self.response_bytes_received
+
+    def headers(self) -> Dict[str, str]:
+        return {'Accept-Encoding': self.accept_encoding} if self.accept_encoding else {'Accept-Encoding': 'identity'}
+
+    def encode_request(self, url: str, body: bytes) -> Tuple[bytes, Dict[str, str]]:
+        """
+        :return: (body to send, headers)
+        """
+        headers = self.headers()
+        if self.compress_requests_above is not None and len(body) > self.compress_requests_above \
+                and not self.compressed_requests_rejected.get(url):
+            headers[ENCODING_HEADER] = 'gzip'
+            return gzip.compress(body, self.level), headers
+        return body, headers
+
+    @staticmethod
+    def rejected(response, text: str) -> bool:
+        """
+        :return: True if the server did not understand a compressed request body
+        """
+        if getattr(response, 'status_code', 200) in {400, 411, 415}:
+            return True
+        return '-32700' in text[:256]  # JSON-RPC parse error
+
+    def post(self, requests_session, url: str, post_data: Union[str, bytes], timeout=None, verify: bool = True) -> str:
+        """
+        Post a request body with compression, through requests_session or any transport with its post method
+        :return: the decoded response text
+        """
+        body = post_data.encode() if type(post_data) is str else post_data
+        sent, headers = self.encode_request(url, body)
+        response = requests_session.post(url, sent, timeout=timeout, verify=verify, headers=headers)
+        text = response.text
+        if ENCODING_HEADER in headers and self.rejected(response, text):
+            with self._lock:
+                self.compressed_requests_rejected[url] = True
+            sent, headers = body, self.headers()
+            response = requests_session.post(url, sent, timeout=timeout, verify=verify, headers=headers)
+            text = response.text
+        received = wire_size(response)
+        with self._lock:
+            self.requests += 1
+            self.compressed_requests += ENCODING_HEADER in headers
+            self.request_bytes += len(body)
+            self.request_bytes_sent += len(sent)
+            self.response_bytes += len(response.content) if hasattr(response, 'content') else len(text.encode())
+            self.response_bytes_received += received
+        return text
+
+    def __repr__(self):
+        return f'HttpCompression {self.requests} requests ({self.compressed_requests} compressed): ' \
+               f'sent {self.request_bytes_sent}/{self.request_bytes} bytes, ' \
+               f'received {self.response_bytes_received}/{self.response_bytes} bytes, saved {self.bytes_saved} bytes'
+
+
+def post_json(requests_session, url: str, post_data: str, timeout=None, verify: bool = True,
+              compression: Union[HttpCompression, None] = None) -> str:
+    """
+    :return: the response text of posting a JSON-RPC request body
+    """
+    if compression is None:
+        return requests_session.post(url, post_data, timeout=timeout, verify=verify).text
+    return compression.post(requests_session, url, post_data, timeout, verify)
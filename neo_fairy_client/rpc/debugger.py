@@ -0,0 +1,219 @@
+"""
+Conditional breakpoints, hit counts and log-points, evaluated on the client.
+
+    debugger = ConditionalDebugger(client, [
+        ConditionalBreakpoint(('NFTLoan.cs', 253), condition=lambda frame: frame.named_variables()['i'] >= 5000),
+        ConditionalBreakpoint(('NFTLoan.cs', 258), log_message='tokenId={tokenId} amount={amount}'),
+    ])
+    rpc_breakpoint = debugger.run(client.debug_function_with_session('registerRental', [...]))
+
+Each time the VM breaks at a breakpoint, the driver fetches what the conditions need in the same batch
+as the debugcontinue that got there, so a hit costs a single round trip.
+"""
+from typing import Any, Callable, Dict, List, Tuple, Union
+import base64
+import ntpath
+from neo_fairy_client.utils import Hash160Str, VMState
+from neo_fairy_client.rpc.fairy_client import FairyClient, RpcBreakpoint, DebugFrame
+
+Location = Union[int, Tuple[str, int]]
+
+
+class ConditionalBreakpoint:
+    def __init__(self, location: Location, condition: Callable[[DebugFrame], bool] = None, hit_count: int = None,
+                 log_message: Union[str, Callable[[DebugFrame], str]] = None,
+                 storage_keys: List[Union[str, bytes, int]] = None,
+                 contract_scripthash: Union[str, int, Hash160Str] = None):
+        """
+        :param location: instruction pointer, or (source filename, line number)
+        :param condition: predicate over the frame of the current context, with frame.named_variables(),
+            frame.local_variables, frame.arguments, frame.static_fields, and frame.storage
+        :param hit_count: stop only from the hit_count-th time the condition holds
+        :param log_message: makes a log-point, which never stops, but logs the message each time the condition holds.
+            A str is formatted with the named variables of the frame, e.g. 'i={i}'; or a function of the frame
+        :param storage_keys: keys of the contract storage in the debug snapshot, fetched into frame.storage as {key: value bytes}
+        :param contract_scripthash: default: client.contract_scripthash
+        """
+        self.location = location
+        self.condition = condition
+        self.hit_count = hit_count
+        self.log_message = log_message
+        self.storage_keys = storage_keys or []
+        self.contract_scripthash = Hash160Str.from_str_or_int(contract_scripthash)
+        self.hits = 0  # times the condition held
+        # instruction pointers of a source line location, resolved with local debug info
+        self.instruction_pointers: Union[set, None] = None
+
+    @property
+    def is_log_point(self) -> bool:
+        return self.log_message is not None
+
+    @property
+    def needs_frame(self) -> bool:
+        return self.condition is not None or self.log_message is not None or bool(self.storage_keys)
+
+    def matches(self, rpc_breakpoint: RpcBreakpoint) -> bool:
+        if rpc_breakpoint.scripthash != self.contract_scripthash:
+            return False
+        if type(self.location) is int:
+            return rpc_breakpoint.instruction_pointer == self.location
+        if self.instruction_pointers is not None:
+            return rpc_breakpoint.instruction_pointer in self.instruction_pointers
+        filename, line_num = self.location
+        return rpc_breakpoint.source_line_num == line_num and rpc_breakpoint.source_filename is not None \
+            and ntpath.basename(rpc_breakpoint.source_filename) == ntpath.basename(filename)
+
+    def format_log_message(self, frame: DebugFrame) -> str:
+        if callable(self.log_message):
+            return self.log_message(frame)
+        return self.log_message.format(ip=frame.instruction_pointer, **frame.named_variables())
+
+    def __repr__(self):
+        kind = 'LogPoint' if self.is_log_point else 'ConditionalBreakpoint'
+        return f'{kind}({self.contract_scripthash} {self.location} hits={self.hits})'
+
+
+class ConditionalDebugger:
+    def __init__(self, client: FairyClient, breakpoints: List[ConditionalBreakpoint], fairy_session: str = None,
+                 log: Callable[[str], Any] = print):
+        """
+        Sets the breakpoints on the server, and drives debugcontinue until a breakpoint whose condition and hit count hold.
+        Source line locations are set as assembly breakpoints at the instruction pointers of the line
+        if the client has the local debug info index of the contract
+        :param log: receives messages of log-points. All messages are also kept in self.log_messages
+        """
+        self.client = client
+        self.breakpoints = breakpoints
+        self.fairy_session = fairy_session or client.fairy_session
+        self.log = log
+        self.log_messages: List[str] = []
+        self.round_trips = 0
+        for breakpoint in breakpoints:
+            breakpoint.contract_scripthash = breakpoint.contract_scripthash or client.contract_scripthash
+        # server-side breakpoints set by this debugger: {contract: [instruction pointers]}, {contract: [filename, line, ...]}
+        self.assembly_breakpoints: Dict[Hash160Str, List[int]] = dict()
+        self.source_code_breakpoints: Dict[Hash160Str, List[Union[str, int]]] = dict()
+        self.installed = False
+
+    def install(self):
+        """
+        Set all breakpoints on the server in a single batch
+        """
+        for breakpoint in self.breakpoints:
+            contract = breakpoint.contract_scripthash
+            if type(breakpoint.location) is int:
+                self.assembly_breakpoints.setdefault(contract, []).append(breakpoint.location)
+                continue
+            filename, line_num = breakpoint.location
+            index = self.client.get_debug_info_index(contract)
+            if index is not None and (instruction_pointers := index.instruction_pointers_of_line(filename, line_num)):
+                self.assembly_breakpoints.setdefault(contract, []).extend(instruction_pointers)
+                breakpoint.instruction_pointers = set(instruction_pointers)
+            else:
+                self.source_code_breakpoints.setdefault(contract, []).extend([filename, line_num])
+        calls = [('setassemblybreakpoints', [contract] + sorted(set(ips))) for contract, ips in self.assembly_breakpoints.items()] \
+            + [('setsourcecodebreakpoints', [contract] + file_lines) for contract, file_lines in self.source_code_breakpoints.items()]
+        if calls:
+            self.client.meta_rpc_batch(calls)
+            self.round_trips += 1
+        self.installed = True
+
+    def uninstall(self):
+        """
+        Delete the breakpoints set by install, in a single batch
+        """
+        calls = [('deleteassemblybreakpoints', [contract] + sorted(set(ips))) for contract, ips in self.assembly_breakpoints.items()] \
+            + [('deletesourcecodebreakpoints', [contract] + file_lines) for contract, file_lines in self.source_code_breakpoints.items()]
+        if calls:
+            self.client.meta_rpc_batch(calls, raise_on_error=False)
+            self.round_trips += 1
+        self.assembly_breakpoints, self.source_code_breakpoints = dict(), dict()
+        self.installed = False
+
+    def matching_breakpoints(self, rpc_breakpoint: RpcBreakpoint) -> List[ConditionalBreakpoint]:
+        if rpc_breakpoint.state != VMState.BREAK:
+            return []
+        return [b for b in self.breakpoints if b.matches(rpc_breakpoint)]
+
+    def frame_calls(self) -> List[Tuple[str, List]]:
+        calls = self.client.debug_state_calls(1, fairy_session=self.fairy_session)
+        for breakpoint in self.breakpoints:
+            calls += [('getstoragewithsession', [self.fairy_session, breakpoint.contract_scripthash, self.client.all_to_base64(key), True])
+                      for key in breakpoint.storage_keys]
+        return calls
+
+    def frame_from_results(self, results: List[Any]) -> Union[DebugFrame, None]:
+        state_call_count = 1 + len(FairyClient.DEBUG_STATE_METHODS)
+        try:
+            frame = self.client.debug_state_from_results(results[:state_call_count], 1)[0]
+        except (ValueError, IndexError):
+            return None
+        frame.storage = dict()
+        storage_results = iter(results[state_call_count:])
+        for breakpoint in self.breakpoints:
+            for key in breakpoint.storage_keys:
+                result = next(storage_results)
+                if not isinstance(result, ValueError):
+                    value = next(iter(result.values()), '') if type(result) is dict else ''
+                    frame.storage[key] = base64.b64decode(value) if value else b''
+        return frame
+
+    def should_stop(self, rpc_breakpoint: RpcBreakpoint, frame: Union[DebugFrame, None]) -> bool:
+        """
+        Evaluate the breakpoints matching the location, counting hits and writing logs
+        :return: True if any non-log-point breakpoint at the location is satisfied
+        """
+        stop = False
+        for breakpoint in self.matching_breakpoints(rpc_breakpoint):
+            if breakpoint.condition is not None and (frame is None or not breakpoint.condition(frame)):
+                continue
+            breakpoint.hits += 1
+            if breakpoint.hit_count is not None and breakpoint.hits < breakpoint.hit_count:
+                continue
+            if breakpoint.is_log_point:
+                message = breakpoint.format_log_message(frame) if frame is not None else str(breakpoint.log_message)
+                self.log_messages.append(message)
+                if self.log:
+                    self.log(message)
+            else:
+                stop = True
+        return stop
+
+    def run(self, rpc_breakpoint: RpcBreakpoint = None, max_continues: int = None, uninstall: bool = False) -> RpcBreakpoint:
+        """
+        Continue debugging until a satisfied breakpoint, or until the end of execution
+        :param rpc_breakpoint: where the debugging session is now, e.g. returned by client.debug_function_with_session.
+            If None, execution continues first
+        :param max_continues: give up and return after this many debugcontinue
+        :param uninstall: delete the breakpoints from the server when returning
+        :return: the breakpoint where execution stopped; also self.frame, the state of the current context there
+        """
+        if not self.installed:
+            self.install()
+        needs_frame = any(b.needs_frame for b in self.breakpoints)
+        self.frame: Union[DebugFrame, None] = None
+        continues = 0
+        try:
+            if rpc_breakpoint is not None and self.matching_breakpoints(rpc_breakpoint):
+                if needs_frame:
+                    self.frame = self.frame_from_results(self.client.meta_rpc_batch(self.frame_calls(), raise_on_error=False))
+                    self.round_trips += 1
+                if self.should_stop(rpc_breakpoint, self.frame):
+                    return rpc_breakpoint
+            while max_continues is None or continues < max_continues:
+                calls = [('debugcontinue', [self.fairy_session])] + (self.frame_calls() if needs_frame else [])
+                results = self.client.meta_rpc_batch(calls, raise_on_error=False)
+                self.round_trips += 1
+                continues += 1
+                if isinstance(results[0], ValueError):
+                    raise results[0]
+                rpc_breakpoint = RpcBreakpoint.from_raw_result({'result': results[0]})
+                self.frame = self.frame_from_results(results[1:]) if needs_frame and rpc_breakpoint.state == VMState.BREAK else None
+                if rpc_breakpoint.state != VMState.BREAK or not self.matching_breakpoints(rpc_breakpoint):
+                    return rpc_breakpoint  # end of execution, or a break not managed by this debugger
+                if self.should_stop(rpc_breakpoint, self.frame):
+                    return rpc_breakpoint
+            return rpc_breakpoint
+        finally:
+            if uninstall:
+                self.uninstall()
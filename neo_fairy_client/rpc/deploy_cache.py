@@ -0,0 +1,163 @@
+from typing import Dict, Union
+import hashlib
+import json
+import os
+import threading
+
+
+def content_hash(*contents: Union[bytes, str, None]) -> str:
+    """
+    sha256 of all contents, each prefixed by its length so that boundaries count
+    """
+    h = hashlib.sha256()
+    for content in contents:
+        if content is None:
+            content = b''
+        if type(content) is str:
+            content = content.encode('utf-8')
+        h.update(len(content).to_bytes(8, 'little'))
+        h.update(content)
+    return h.hexdigest()
+
+
+class DeployCache:
+    def __init__(self, index_path: str = '.fairy_deploy_cache.json'):
+        """
+        Content-addressed index remembering, across runs, what FairyClient.virutal_deploy_from_path has already done:
+            which NEF + manifest + deploy data is deployed at which scripthash in which session of which server,
+            which debug info each server holds for each contract,
+            and which NEF content each .nef.txt was dumped from.
+        FairyClient forgets a session when it creates, deletes, renames or copies over the snapshot,
+        and forgets debug info when it calls deletedebuginfo.
+        Cached deployments are still checked against the server with get_contract before being trusted.
+        :param index_path: the index file; written after every change
+        """
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        # {server url: {session: {content hash: contract scripthash}}}
+        self.deployments: Dict[str, Dict[str, Dict[str, str]]] = dict()
+        # {server url: {contract scripthash: debug info content hash}}
+        self.debug_info: Dict[str, Dict[str, str]] = dict()
+        # {absolute .nef path: nef content hash of the .nef.txt beside it}
+        self.dumpnef: Dict[str, str] = dict()
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                self.deployments = index.get('deployments', {})
+                self.debug_info = index.get('debug_info', {})
+                self.dumpnef = index.get('dumpnef', {})
+            except ValueError:
+                print(f'WARNING: ignoring corrupted deploy cache index {index_path}')
+
+    def save(self):
+        with self._lock:
+            tmp_path = f'{self.index_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'deployments': self.deployments, 'debug_info': self.debug_info, 'dumpnef': self.dumpnef}, f, indent=1)
+            os.replace(tmp_path, self.index_path)
+
+    def get_deployment(self, server: str, fairy_session: str, deploy_hash: str) -> Union[str, None]:
+        return self.deployments.get(server, {}).get(fairy_session, {}).get(deploy_hash)
+
+    def put_deployment(self, server: str, fairy_session: str, deploy_hash: str, contract_hash: str):
+        with self._lock:
+            self.deployments.setdefault(server, {}).setdefault(fairy_session, {})[deploy_hash] = str(contract_hash)
+        self.save()
+
+    def forget_session(self, server: str, fairy_session: str):
+        if fairy_session not in self.deployments.get(server, {}):
+            return
+        with self._lock:
+            self.deployments[server].pop(fairy_session, None)
+        self.save()
+
+    def get_debug_info(self, server: str, contract_hash: str) -> Union[str, None]:
+        return self.debug_info.get(server, {}).get(str(contract_hash))
+
+    def put_debug_info(self, server: str, contract_hash: str, debug_info_hash: str):
+        with self._lock:
+            self.debug_info.setdefault(server, {})[str(contract_hash)] = debug_info_hash
+        self.save()
+
+    def forget_debug_info(self, server: str, contract_hash: str):
+        if str(contract_hash) not in self.debug_info.get(server, {}):
+            return
+        with self._lock:
+            self.debug_info[server].pop(str(contract_hash), None)
+        self.save()
+
+    def dumpnef_is_current(self, nef_path_and_filename: str, nef_hash: str) -> bool:
+        """
+        :return: True if {nef_path_and_filename}.txt exists and was dumped from NEF content of nef_hash
+        """
+        return os.path.exists(f'{nef_path_and_filename}.txt') \
+            and self.dumpnef.get(os.path.abspath(nef_path_and_filename)) == nef_hash
+
+    def put_dumpnef(self, nef_path_and_filename: str, nef_hash: str):
+        with self._lock:
+            self.dumpnef[os.path.abspath(nef_path_and_filename)] = nef_hash
+        self.save()
+
+
+class DeployArtifacts:
+    def __init__(self, nef_path_and_filename: str, nef: bytes, manifest: str,
+                 nefdbgnfo: Union[bytes, None] = None, dumpnef: Union[str, None] = None):
+        """
+        Files of a compiled contract read from disk.
+        :param nefdbgnfo: content of .nefdbgnfo; None if not read or not existing
+        :param dumpnef: content of .nef.txt; None if not read or not up to date
+        """
+        self.nef_path_and_filename = nef_path_and_filename
+        self.nef = nef
+        self.manifest = manifest
+        self.nefdbgnfo = nefdbgnfo
+        self.dumpnef = dumpnef
+        self.nef_hash = content_hash(nef)
+
+    @property
+    def name(self) -> str:
+        return json.loads(self.manifest)['name']
+
+    @classmethod
+    def from_path(cls, nef_path_and_filename: str, auto_dumpnef=True, dumpnef_backup=True,
+                  deploy_cache: DeployCache = None, read_debug_info=True) -> 'DeployArtifacts':
+        """
+        Read .nef and .manifest.json, and executes dumpnef (on your machine) if .nef.txt is not up to date.
+        .nef.txt is up to date if it is newer than .nef, or deploy_cache knows it was dumped from the same NEF content.
+        :param nef_path_and_filename: '../NFTLoan/NFTLoan/bin/sc/NFTFlashLoan.nef'
+        :param read_debug_info: read .nefdbgnfo and .nef.txt if they exist and are up to date
+        """
+        path, nef_filename = os.path.split(nef_path_and_filename)  # '../NFTLoan/NFTLoan/bin/sc', 'NFTFlashLoan.nef'
+        assert nef_filename.endswith('.nef'), f"File name must end with .nef . Got {nef_filename}"
+        with open(nef_path_and_filename, 'rb') as f:
+            nef = f.read()
+        contract_path_and_filename = nef_path_and_filename[:-4]  # '../NFTLoan/NFTLoan/bin/sc/NFTFlashLoan'
+        with open(contract_path_and_filename + ".manifest.json", 'r', encoding='utf-8') as f:
+            manifest = f.read()
+        artifacts = cls(nef_path_and_filename, nef, manifest)
+        nefdbgnfo_path_and_filename = contract_path_and_filename + '.nefdbgnfo'
+        dumpnef_path_and_filename = contract_path_and_filename + '.nef.txt'
+        if not os.path.exists(nefdbgnfo_path_and_filename):
+            print('WARNING! No .nefdbgnfo found.'
+                  'It is highly recommended to generate .nefdbgnfo for debugging.'
+                  'If you are writing contracts in C#,'
+                  'consider building your project with command `nccs your.csproj --debug`.')
+            return artifacts
+        dumpnef_is_current = os.path.exists(dumpnef_path_and_filename) and (
+            os.path.getmtime(dumpnef_path_and_filename) >= os.path.getmtime(nef_path_and_filename)
+            or (deploy_cache is not None and deploy_cache.dumpnef_is_current(nef_path_and_filename, artifacts.nef_hash)))
+        if auto_dumpnef and not dumpnef_is_current:
+            if dumpnef_backup and os.path.exists(dumpnef_path_and_filename) and not os.path.exists(contract_path_and_filename + '.bk.txt'):
+                # only backup the .nef.txt file when no backup exists
+                os.rename(dumpnef_path_and_filename, contract_path_and_filename + '.bk.txt')
+            print(f'dumpnef {nef_filename}', os.popen(f'dumpnef {nef_path_and_filename} > {nef_path_and_filename}.txt').read())
+            dumpnef_is_current = os.path.exists(dumpnef_path_and_filename)
+        if deploy_cache is not None and dumpnef_is_current and not deploy_cache.dumpnef_is_current(nef_path_and_filename, artifacts.nef_hash):
+            deploy_cache.put_dumpnef(nef_path_and_filename, artifacts.nef_hash)
+        if read_debug_info and dumpnef_is_current:
+            with open(nefdbgnfo_path_and_filename, 'rb') as f:
+                artifacts.nefdbgnfo = f.read()
+            with open(dumpnef_path_and_filename, 'r', encoding='utf-8') as f:
+                artifacts.dumpnef = f.read()
+        return artifacts
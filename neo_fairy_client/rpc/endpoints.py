@@ -0,0 +1,213 @@
+"""
+Routing of RPC calls across several neo-cli + Fairy nodes.
+
+    client = FairyClient(['http://node0:16868', 'http://node1:16868', 'http://node2:16868'], wallet, fairy_session='test')
+    client.endpoint_pool.check_health()
+
+- Read-only calls without session (getblockcount, invokefunction, getapplicationlog, ...) go to the healthy node
+  with the lowest EWMA latency, and fail over to the next one on connection errors and timeouts.
+- Calls of a fairy session go to the node holding its snapshot: the node where the session was created.
+- Other calls (sendrawtransaction, debug info, breakpoints) and new sessions go to the primary node:
+  the first healthy node in the order of the urls, so that debug info and breakpoints meet the sessions debugged with them.
+
+A node is marked down after a transport error, and tried again after `retry_after` seconds,
+or when check_health finds it answering and synchronized.
+"""
+from typing import Dict, Iterable, List, Tuple, Union
+import json
+import threading
+import time
+import requests
+from neo_fairy_client.rpc.compression import HttpCompression, post_json
+from neo_fairy_client.rpc.methods import session_of_call, READ_ONLY_METHODS, ITERATOR_SESSION_METHODS, SNAPSHOT_LIFECYCLE_METHODS
+
+
+class Endpoint:
+    __slots__ = ('url', 'latency', 'healthy', 'down_since', 'failures', 'requests', 'block_count')
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latency: Union[float, None] = None  # EWMA of seconds per request; None before the first request
+        self.healthy = True
+        self.down_since: Union[float, None] = None  # time.monotonic() of the last failure while healthy
+        self.failures = 0
+        self.requests = 0
+        self.block_count: Union[int, None] = None  # at the last health check
+
+    def __repr__(self):
+        latency = f'{self.latency * 1000:.1f}ms' if self.latency is not None else '-'
+        return f'Endpoint {self.url} {"healthy" if self.healthy else "down"} latency={latency} requests={self.requests} failures={self.failures}'
+
+
+class EndpointPool:
+    def __init__(self, urls: Iterable[str], alpha: float = 0.3, retry_after: float = 30,
+                 max_block_lag: int = 2, health_check_interval: Union[float, None] = None, health_check_timeout: float = 5):
+        """
+        :param urls: of the rpc servers; the first healthy one is the primary node
+        :param alpha: weight of the latest request in the EWMA of latency
+        :param retry_after: seconds before a node marked down is tried again by calls
+        :param max_block_lag: check_health marks down nodes more than this many blocks behind the highest block count
+        :param health_check_interval: seconds between health checks in a background thread. None for no background check
+        """
+        self.endpoints: List[Endpoint] = [Endpoint(url) for url in urls]
+        if not self.endpoints:
+            raise ValueError('Expected at least one url')
+        self.alpha = alpha
+        self.retry_after = retry_after
+        self.max_block_lag = max_block_lag
+        self.health_check_timeout = health_check_timeout
+        self.sessions: Dict[str, Endpoint] = dict()  # {fairy session: node holding its snapshot}
+        self.iterator_sessions: Dict[str, Endpoint] = dict()  # {iterator session id: node holding the iterator}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Union[threading.Thread, None] = None
+        if health_check_interval:
+            self._thread = threading.Thread(target=self._health_check_loop, args=(health_check_interval,),
+                                            name='EndpointPool', daemon=True)
+            self._thread.start()
+
+    @property
+    def primary(self) -> Endpoint:
+        return next((e for e in self.endpoints if self._available(e)), self.endpoints[0])
+
+    def _available(self, endpoint: Endpoint) -> bool:
+        return endpoint.healthy or time.monotonic() - endpoint.down_since >= self.retry_after
+
+    def ranked(self) -> List[Endpoint]:
+        """
+        :return: available nodes from the lowest latency; nodes not measured yet first, to measure them
+        """
+        available = [e for e in self.endpoints if self._available(e)] or list(self.endpoints)
+        return sorted(available, key=lambda e: (not e.healthy, e.latency or 0.0))
+
+    def url_of_session(self, fairy_session: Union[str, None] = None) -> str:
+        """
+        :return: url of the node holding the snapshot of fairy_session, or of the primary node
+        """
+        endpoint = self.sessions.get(fairy_session) if fairy_session else None
+        return (endpoint or self.primary).url
+
+    def route(self, calls: List[Tuple[str, List]]) -> List[Endpoint]:
+        """
+        :param calls: [(method, parameters)] sent in one request
+        :return: the nodes to try in order
+        """
+        with self._lock:
+            session = next((s for method, parameters in calls if (s := session_of_call(method, parameters))), None)
+            if session is not None:
+                endpoint = self.sessions.get(session)
+                recreated = any(method == 'newsnapshotsfromcurrentsystem' for method, _ in calls)
+                if endpoint is None or (recreated and not self._available(endpoint)):
+                    endpoint = self.primary
+                for method, parameters in calls:
+                    if method == 'deletesnapshots':
+                        for s in parameters:
+                            self.sessions.pop(s, None)
+                    elif method in SNAPSHOT_LIFECYCLE_METHODS or session_of_call(method, parameters):
+                        # copies and renames of a snapshot stay on its node
+                        for s in (parameters if method in SNAPSHOT_LIFECYCLE_METHODS else parameters[:1]):
+                            if type(s) is str:
+                                self.sessions[s] = endpoint
+                return [endpoint]
+            for method, parameters in calls:
+                if method in ITERATOR_SESSION_METHODS and parameters and parameters[0] in self.iterator_sessions:
+                    return [self.iterator_sessions[parameters[0]]]
+            if all(method in READ_ONLY_METHODS for method, _ in calls):
+                return self.ranked()
+            return [self.primary]
+
+    def observe(self, endpoint: Endpoint, latency: Union[float, None]):
+        """
+        :param latency: seconds of a successful request; None for a failed request
+        """
+        with self._lock:
+            endpoint.requests += 1
+            if latency is None:
+                endpoint.failures += 1
+                if endpoint.healthy:
+                    endpoint.healthy, endpoint.down_since = False, time.monotonic()
+                else:  # failed again after retry_after
+                    endpoint.down_since = time.monotonic()
+                return
+            endpoint.healthy = True
+            endpoint.latency = latency if endpoint.latency is None else self.alpha * latency + (1 - self.alpha) * endpoint.latency
+
+    def post(self, requests_session, post_data: str, calls: List[Tuple[str, List]],
+             timeout: Union[float, Tuple[float, float], None] = None, verify: bool = True, replica: int = 0,
+             compression: HttpCompression = None) -> str:
+        """
+        Post to the nodes routed for the calls, failing over on transport errors for read-only calls
+        :param replica: start from the replica-th routed node, e.g. 1 for a hedged duplicate of a request
+        :return: the response text
+        """
+        endpoints = self.route(calls)
+        if replica:
+            replica %= len(endpoints)
+            endpoints = endpoints[replica:] + endpoints[:replica]
+        for i, endpoint in enumerate(endpoints):
+            started = time.perf_counter()
+            try:
+                response_text = post_json(requests_session, endpoint.url, post_data, timeout, verify, compression)
+            except requests.RequestException:
+                self.observe(endpoint, None)
+                if i + 1 < len(endpoints):
+                    continue
+                raise
+            self.observe(endpoint, time.perf_counter() - started)
+            if '"session"' in response_text and any(method in {'invokefunction', 'invokescript'} for method, _ in calls):
+                self._observe_iterator_sessions(endpoint, response_text)
+            return response_text
+
+    def _observe_iterator_sessions(self, endpoint: Endpoint, response_text: str):
+        try:
+            responses = json.loads(response_text)
+        except ValueError:
+            return
+        for response in responses if type(responses) is list else [responses]:
+            result = response.get('result') if type(response) is dict else None
+            if type(result) is dict and type(result.get('session')) is str:
+                with self._lock:
+                    self.iterator_sessions[result['session']] = endpoint
+
+    def check_health(self, requests_session: requests.Session = None) -> List[Endpoint]:
+        """
+        Ask every node for its block count. Nodes not answering, or lagging behind the others, are marked down
+        :return: the healthy nodes
+        """
+        requests_session = requests_session or requests.Session()
+        post_data = json.dumps({'jsonrpc': '2.0', 'method': 'getblockcount', 'params': [], 'id': 1})
+        for endpoint in self.endpoints:
+            started = time.perf_counter()
+            try:
+                response = requests_session.post(endpoint.url, post_data, timeout=self.health_check_timeout).json()
+                endpoint.block_count = int(response['result'])
+            except (requests.RequestException, ValueError, KeyError, TypeError):
+                endpoint.block_count = None
+                self.observe(endpoint, None)
+                continue
+            self.observe(endpoint, time.perf_counter() - started)
+        highest = max((e.block_count for e in self.endpoints if e.block_count is not None), default=None)
+        with self._lock:
+            for endpoint in self.endpoints:
+                if endpoint.block_count is not None and highest - endpoint.block_count > self.max_block_lag:
+                    endpoint.healthy, endpoint.down_since = False, time.monotonic()
+        return [e for e in self.endpoints if e.healthy]
+
+    def _health_check_loop(self, interval: float):
+        requests_session = requests.Session()
+        while not self._stopped.wait(interval):
+            try:
+                self.check_health(requests_session)
+            except Exception as e:
+                print(f'WARNING: EndpointPool failed to check health: {e}')
+
+    def stop(self):
+        """
+        Stop the background health checks
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __repr__(self):
+        return f'EndpointPool {self.endpoints}'
@@ -0,0 +1,120 @@
+from typing import Any, Callable, List, Union
+import queue
+import random
+import threading
+import time
+import traceback
+
+
+class RpcCallEvent:
+    """
+    What happened in a single RPC call of FairyClient.
+    status is one of 'ok', 'rpc_error' (the server returned an `error` field),
+    'vm_fault' (the invocation ended with an exception), 'transport_error' (no valid response)
+    and 'cache_hit' (served by FairyClient.invocation_cache without any request)
+    """
+    __slots__ = ('method', 'params_size', 'response_size', 'duration', 'status', 'gas_consumed', 'fairy_session', 'timestamp')
+
+    def __init__(self, method: str, params_size: int, response_size: int, duration: float, status: str,
+                 gas_consumed: Union[int, None] = None, fairy_session: Union[str, None] = None, timestamp: float = None):
+        """
+        :param params_size: length of the JSON request body
+        :param response_size: length of the JSON response body; 0 if no response
+        :param duration: seconds spent waiting for and decoding the response
+        """
+        self.method = method
+        self.params_size = params_size
+        self.response_size = response_size
+        self.duration = duration
+        self.status = status
+        self.gas_consumed = gas_consumed
+        self.fairy_session = fairy_session
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __repr__(self):
+        return f'{self.fairy_session}::{self.method} {self.status} {self.duration * 1000:.2f}ms gas={self.gas_consumed}'
+
+
+class RpcEventDispatcher:
+    def __init__(self, subscribers: Union[Callable[[RpcCallEvent], Any], List[Callable], None] = None,
+                 asynchronous: bool = False, queue_size: int = 1024, sample_rate: float = 1.0):
+        """
+        Delivers RpcCallEvent to subscribers.
+        :param subscribers: callables accepting a single RpcCallEvent
+        :param asynchronous: if True, events are put into a bounded queue and delivered by a background thread,
+            so that slow subscribers do not slow down RPC calls.
+            Events are dropped (and counted in self.dropped) when the queue is full.
+        :param queue_size: max count of undelivered events in asynchronous mode
+        :param sample_rate: 0.0~1.0. Only this ratio of RPC calls produce events
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f'Expected 0.0 <= sample_rate <= 1.0. Got {sample_rate}')
+        self.subscribers: List[Callable[[RpcCallEvent], Any]] = list(subscribers) if type(subscribers) is list \
+            else ([subscribers] if subscribers else [])
+        self.sample_rate = sample_rate
+        self.asynchronous = asynchronous
+        self.dropped = 0
+        self._queue: Union[queue.Queue, None] = None
+        self._thread: Union[threading.Thread, None] = None
+        if asynchronous:
+            self._queue = queue.Queue(maxsize=queue_size)
+            self._thread = threading.Thread(target=self._deliver_forever, name='fairy-rpc-events', daemon=True)
+            self._thread.start()
+
+    def subscribe(self, subscriber: Callable[[RpcCallEvent], Any]):
+        self.subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber: Callable[[RpcCallEvent], Any]):
+        self.subscribers.remove(subscriber)
+
+    def sampled(self) -> bool:
+        """
+        :return: whether an event should be built for the current RPC call
+        """
+        if not self.subscribers:
+            return False
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def publish(self, event: RpcCallEvent):
+        if not self.asynchronous:
+            self._deliver(event)
+            return
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def _deliver(self, event: RpcCallEvent):
+        for subscriber in self.subscribers:
+            try:
+                subscriber(event)
+            except Exception:
+                traceback.print_exc()
+
+    def _deliver_forever(self):
+        while True:
+            event = self._queue.get()
+            try:
+                if event is None:
+                    return
+                self._deliver(event)
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """
+        Block until all queued events are delivered
+        """
+        if self.asynchronous:
+            self._queue.join()
+
+    def close(self):
+        """
+        Deliver the queued events and stop the background thread
+        """
+        if self.asynchronous and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
@@ -1,10 +1,13 @@
-from typing import List, Tuple, Union, Dict, Any, Callable
+from typing import List, Tuple, Union, Dict, Any, Callable, Set
 from enum import Enum
 import base64
+import copy
 import json
 import os
 import random
+import time
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
 import requests
 import urllib3
 
@@ -16,6 +19,22 @@ from neo_fairy_client.utils import NamedCurveHash, defaultFairyWalletScriptHash
 from neo_fairy_client.utils import UInt160, UInt256
 from neo_fairy_client.utils import VMState, WitnessScope
 from neo_fairy_client.utils.oracle import OracleRequest, OracleResponseCode
+from neo_fairy_client.utils.nef import NefFile, validate_contract, compute_contract_hash
+from neo_fairy_client.utils.debug_info import DebugInfoIndex, DebugMethod
+from neo_fairy_client.utils.opcodes import DEFAULT_EXEC_FEE_FACTOR, instruction_prices
+from neo_fairy_client.rpc.events import RpcCallEvent, RpcEventDispatcher
+from neo_fairy_client.rpc.methods import session_of_call, is_cacheable_call, sessions_changed_by_call
+from neo_fairy_client.rpc.methods import RELAY_FLAG_METHODS, SNAPSHOT_LIFECYCLE_METHODS, BREAKPOINT_METHODS
+from neo_fairy_client.rpc.methods import DEBUG_RUN_METHODS, DEBUG_RESUME_METHODS
+from neo_fairy_client.rpc.cache import InvocationCache, ContractMetadata, ContractMetadataCache, BreakpointCache
+from neo_fairy_client.rpc.deploy_cache import DeployCache, DeployArtifacts, content_hash
+from neo_fairy_client.rpc.trace import ExecutionTrace
+from neo_fairy_client.rpc.tracker import TransactionTracker
+from neo_fairy_client.rpc.fees import NetworkFeeEstimator
+from neo_fairy_client.rpc.endpoints import EndpointPool
+from neo_fairy_client.rpc.retry import RetryPolicy
+from neo_fairy_client.rpc.compression import HttpCompression, post_json
+from neo_fairy_client.utils.transaction import Transaction
 
 RequestExceptions = (
     requests.RequestException,
@@ -61,8 +80,72 @@ class RpcBreakpoint:
             return f'''{self.state} {self.break_reason} {self.contract_name} instructionPointer {self.instruction_pointer};'''
 
 
+
+class DebugFrame:
+    def __init__(self, index: int, instruction_pointer: int, local_variables: List, arguments: List, static_fields: List,
+                 evaluation_stack: List, variable_names_and_values: Any = None, scripthash: Union[Hash160Str, None] = None,
+                 method: Union[DebugMethod, None] = None, source_line: Union[Tuple[str, int, str], None] = None,
+                 variable_names: Union[Dict[str, List[str]], None] = None):
+        """
+        State of a context in the invocation stack of a debugging session
+        :param index: invocation_stack_index; 0 for the current context
+        :param method: from the local debug info index of the contract, if available
+        :param source_line: (document, line number, source code) from the local debug info index, if available
+        :param variable_names: {'arguments': [...], 'locals': [...], 'statics': [...]} from the local debug info index
+        """
+        self.index = index
+        self.instruction_pointer = instruction_pointer
+        self.local_variables = local_variables
+        self.arguments = arguments
+        self.static_fields = static_fields
+        self.evaluation_stack = evaluation_stack
+        self.variable_names_and_values = variable_names_and_values
+        self.scripthash = scripthash
+        self.method = method
+        self.source_line = source_line
+        self.variable_names = variable_names
+        self.storage: Dict[Union[str, bytes, int], bytes] = dict()  # filled by ConditionalDebugger
+
+    def named_variables(self) -> Dict[str, Any]:
+        """
+        :return: {name: value} of static fields, arguments and local variables, with names from debug info.
+            Later kinds shadow earlier ones of the same name
+        """
+        if not self.variable_names:
+            return dict()
+        named = dict()
+        for kind, values in (('statics', self.static_fields), ('arguments', self.arguments), ('locals', self.local_variables)):
+            named.update({name: value for name, value in zip(self.variable_names[kind], values) if name})
+        return named
+
+    def __repr__(self):
+        where = f'{self.method} ' if self.method else ''
+        if self.source_line:
+            where += f'{self.source_line[0]} line {self.source_line[1]} '
+        return f'Frame {self.index} {where}instructionPointer {self.instruction_pointer}'
+
+
+class DebugState:
+    def __init__(self, invocation_stack: Any, frames: List[DebugFrame]):
+        """
+        :param invocation_stack: result of RPC getinvocationstack
+        :param frames: from the current context (index 0) outwards
+        """
+        self.invocation_stack = invocation_stack
+        self.frames = frames
+
+    def __getitem__(self, index: int) -> DebugFrame:
+        return self.frames[index]
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __repr__(self):
+        return '\n'.join(map(repr, self.frames))
+
+
 class FairyClient:
-    def __init__(self, target_url: str = 'http://localhost:16868',
+    def __init__(self, target_url: Union[str, List[str], EndpointPool] = 'http://localhost:16868',
                  wallet_address_or_scripthash: Union[str, int, Hash160Str] = None,
                  contract_scripthash: Union[str, int, Hash160Str] = None, signers: Union[Signer, List[Signer], None] = None,
                  fairy_session: str = None, function_default_relay=True, script_default_relay=False,
@@ -74,12 +157,22 @@ class FairyClient:
                  auto_set_neo_balance=100_0000_0000, auto_set_gas_balance=100_0000_0000,
                  auto_preparation=True,
                  hook_function_after_rpc_call: Callable = None,
+                 rpc_event_dispatcher: RpcEventDispatcher = None,
+                 invocation_cache: InvocationCache = None,
+                 cache_contract_metadata: bool = False,
+                 deploy_cache: DeployCache = None,
+                 validate_contracts: bool = True,
+                 reject_invalid_contracts: bool = False,
+                 retry_policy: RetryPolicy = None,
+                 compression: HttpCompression = None,
                  default_fairy_wallet_scripthash: Union[str, int, Hash160Str] = defaultFairyWalletScriptHash):
         """
         Fairy RPC client to interact with both normal Neo3 and Fairy RPC backend.
         Fairy RPC backend helps you test and debug transactions with sessions, which contain snapshots.
         Use fairy_session strings to name your snapshots.
-        :param target_url: url to the rpc server affiliated to neo-cli
+        :param target_url: url to the rpc server affiliated to neo-cli.
+            A list of urls, or an EndpointPool, to spread read-only calls across many nodes,
+            keeping the calls of each fairy session on the node holding its snapshot. See EndpointPool
         :param wallet_address_or_scripthash: address of your wallet (starting with 'N'); "NVbGwMfRQVudTjWAUJwj4K68yyfXjmgbPp"
         :param signers: by default, which account(s) will sign the transactions with which scope
             https://docs.neo.org/docs/en-us/basic/concept/transaction.html#signature-scope
@@ -93,12 +186,37 @@ class FairyClient:
         :param verbose_return: return (parsed_result, raw_result, post_data) if True. return parsed result if False.
             This is to avoid reading previous_result for concurrency safety.
             For concurrency, set verbose_return=True
-        :param requests_session: requests.Session
+        :param requests_session: requests.Session, or a lean transport with its post method:
+            make_transport('urllib3') or make_transport('http.client'). See neo_fairy_client.rpc.transports
         :param requests_timeout: raise Exceptions if request not completed in that many seconds. None for no limit
         :param auto_preparation: prepares environments for common usage at a small cost of time
         :param hook_function_after_rpc_call: a function with no input argument, executed after each successful RPC call
+        :param rpc_event_dispatcher: delivers an RpcCallEvent (method, sizes, duration, status, gas, session)
+            to its subscribers after each RPC call, successful or not.
+            Use RpcEventDispatcher(asynchronous=True, sample_rate=...) for telemetry without adding latency to calls
+        :param invocation_cache: e.g. InvocationCache(maxsize=4096). If given, results of calls reading a fairy session
+            without writing to it (relay=False invocations, get_contract, list_contracts, get/find storage) are cached,
+            until this client sends any call that may change the session
+        :param cache_contract_metadata: remember contract states and parsed manifests of each fairy session,
+            from virtual deploys and get_contract. Dropped when this client replaces the snapshot,
+            or when ContractManagement notifies Deploy, Update or Destroy of the contract in relayed invocations.
+            Contracts updated in the session by other clients are not noticed, so only enable it when this client
+            is the only one changing the contracts of its sessions
+        :param deploy_cache: e.g. DeployCache('.fairy_deploy_cache.json').
+            Lets virutal_deploy_from_path skip deploys, dumpnef runs and debug info uploads already done with the same content
+        :param validate_contracts: parse the NEF and validate the manifest locally before virtual deploys,
+            printing warnings about invalid or risky contracts
+        :param reject_invalid_contracts: raise ValueError for contracts failing local validation without sending them.
+            If False, they are sent anyway with a warning, and the server decides
+        :param retry_policy: e.g. RetryPolicy(timeout=5, max_attempts=3, hedge=True).
+            Timeouts, retries and hedging of idempotent calls; other calls are sent once with requests_timeout
+        :param compression: e.g. HttpCompression(compress_requests_above=16 * 1024), for slow links.
+            Asks for gzip or deflate encoded responses, compresses large request bodies, and counts the bytes saved
         """
-        self.target_url: str = target_url
+        if type(target_url) is list:
+            target_url = EndpointPool(target_url)
+        self.endpoint_pool: Union[EndpointPool, None] = target_url if isinstance(target_url, EndpointPool) else None
+        self.target_url: str = self.endpoint_pool.endpoints[0].url if self.endpoint_pool else target_url
         self.contract_scripthash: Union[Hash160Str, None] = Hash160Str.from_str_or_int(contract_scripthash)
         self.requests_session: requests.Session = requests_session
         if wallet_address_or_scripthash:
@@ -112,6 +230,7 @@ class FairyClient:
             self.signers: List[Signer] = signers or []
             print('WARNING: No wallet address specified when building the fairy client!')
         self.previous_post_data = None
+        self.previous_response_size: int = 0
         self.with_print: bool = with_print
         self.previous_raw_result: Union[dict, None] = None
         self.previous_result: Any = None
@@ -125,7 +244,23 @@ class FairyClient:
         self.fairy_session: Union[str, None] = fairy_session
         self.verify_SSL: bool = verify_SSL
         self.requests_timeout: Union[int, None] = requests_timeout
+        self.retry_policy: Union[RetryPolicy, None] = retry_policy
+        self.compression: Union[HttpCompression, None] = compression
         self.hook_function_after_rpc_call = hook_function_after_rpc_call
+        self.rpc_event_dispatcher: Union[RpcEventDispatcher, None] = rpc_event_dispatcher
+        self.invocation_cache: Union[InvocationCache, None] = invocation_cache
+        self.contract_metadata_cache: Union[ContractMetadataCache, None] = ContractMetadataCache() if cache_contract_metadata else None
+        self.deploy_cache: Union[DeployCache, None] = deploy_cache
+        self.breakpoint_cache: BreakpointCache = BreakpointCache()
+        # sessions whose debug run, started with relay=True, has not finished: it writes the session when finishing
+        self.relayed_debug_sessions: Set[str] = set()
+        self.transaction_tracker: Union[TransactionTracker, None] = None
+        self.network_fee_estimator: Union[NetworkFeeEstimator, None] = None
+        self.validate_contracts: bool = validate_contracts
+        self.reject_invalid_contracts: bool = reject_invalid_contracts
+        # {contract scripthash: (nefdbgnfo, dumpnef)} set by this client, indexed on demand by get_debug_info_index
+        self.debug_info_sources: Dict[Hash160Str, Tuple[bytes, str]] = dict()
+        self.debug_info_indexes: Dict[Hash160Str, DebugInfoIndex] = dict()
         self.default_fairy_wallet_scripthash = Hash160Str.from_str_or_int(default_fairy_wallet_scripthash)
         if verify_SSL is False:
             print('WARNING: Will ignore SSL certificate errors!')
@@ -182,24 +317,161 @@ class FairyClient:
                     processed_struct.append(base64.b64decode(value['value']))
         return processed_struct
     
-    def meta_rpc_method_with_raw_result(self, method: str, parameters: List) -> Any:
-        post_data = self.request_body_builder(method, parameters)
+    def post_rpc_body(self, post_data: str, calls: List[Tuple[str, List]] = None) -> str:
+        """
+        :param calls: [(method, parameters)] in the body, for routing with the endpoint pool, and retrying idempotent calls
+        :return: the response text of posting the JSON-RPC request body to the server
+        """
+        calls = calls or []
+        if self.retry_policy is not None and self.retry_policy.applies_to(calls):
+            return self.retry_policy.call(lambda replica, timeout: self.post_rpc_body_once(post_data, calls, timeout, replica), calls)
+        return self.post_rpc_body_once(post_data, calls, self.requests_timeout)
+
+    def post_rpc_body_once(self, post_data: str, calls: List[Tuple[str, List]],
+                           timeout: Union[float, Tuple[float, float], None], replica: int = 0) -> str:
+        """
+        :param replica: 1 for a hedged duplicate, sent to the next node of the endpoint pool
+        """
+        if self.endpoint_pool is not None:
+            return self.endpoint_pool.post(self.requests_session, post_data, calls, timeout=timeout, verify=self.verify_SSL,
+                                           replica=replica, compression=self.compression)
+        return post_json(self.requests_session, self.target_url, post_data, timeout, self.verify_SSL, self.compression)
+
+    def url_of_session(self, fairy_session: str = None) -> str:
+        """
+        :return: url of the node holding the snapshot of fairy_session; of the node receiving calls without session if None
+        """
+        return self.endpoint_pool.url_of_session(fairy_session) if self.endpoint_pool is not None else self.target_url
+
+    def invalidate_caches_before_call(self, method: str, parameters: List):
+        if self.invocation_cache is not None:
+            for fairy_session in sessions_changed_by_call(method, parameters):
+                self.invocation_cache.invalidate_session(fairy_session)
+        if method in SNAPSHOT_LIFECYCLE_METHODS:
+            for fairy_session in sessions_changed_by_call(method, parameters):
+                if self.contract_metadata_cache is not None:
+                    self.contract_metadata_cache.invalidate_session(fairy_session)
+                if self.deploy_cache is not None:
+                    self.deploy_cache.forget_session(self.url_of_session(fairy_session), fairy_session)
+        if method == 'deletedebugsnapshots':
+            self.relayed_debug_sessions.difference_update(p for p in parameters if type(p) is str)
+
+    def send_rpc_request(self, method: str, parameters: List, post_data: str = None) -> Tuple[dict, str, float]:
+        """
+        Post a JSON-RPC request without interpreting the result
+        :param post_data: request body built by request_body_builder(method, parameters), if already built
+        :return: (decoded JSON response, post_data, time.perf_counter() before posting)
+        """
+        post_data = post_data or self.request_body_builder(method, parameters)
         self.previous_post_data = post_data
-        result = json.loads(self.requests_session.post(self.target_url, post_data, timeout=self.requests_timeout).text)
+        self.invalidate_caches_before_call(method, parameters)
+        started = time.perf_counter()
+        try:
+            response_text = self.post_rpc_body(post_data, [(method, parameters)])
+            self.previous_response_size = len(response_text)
+            result = json.loads(response_text)
+        except Exception:
+            self.previous_response_size = 0
+            if method in BREAKPOINT_METHODS:
+                self.breakpoint_cache.observe(method, parameters, None)
+            self.publish_rpc_event(method, parameters, post_data, started, 'transport_error')
+            raise
+        if method in BREAKPOINT_METHODS:
+            self.breakpoint_cache.observe(method, parameters, result)
+        return result, post_data, started
+
+    def send_rpc_batch(self, calls: List[Tuple[str, List]]) -> List[dict]:
+        """
+        Post many JSON-RPC requests in a single HTTP request (JSON-RPC batch).
+        The RpcServer of neo-cli executes synchronous methods of a batch one by one in order.
+        :param calls: [(method, parameters)]
+        :return: decoded JSON responses, in the order of calls
+        """
+        for method, parameters in calls:
+            self.invalidate_caches_before_call(method, parameters)
+        post_data = json.dumps([
+            {"jsonrpc": "2.0", "method": method, "params": parameters, "id": i}
+            for i, (method, parameters) in enumerate(calls)
+        ], separators=(',', ':'))
+        self.previous_post_data = post_data
+        started = time.perf_counter()
+        try:
+            response_text = self.post_rpc_body(post_data, calls)
+            self.previous_response_size = len(response_text)
+            responses = json.loads(response_text)
+        except Exception:
+            self.previous_response_size = 0
+            for method, parameters in calls:
+                if method in BREAKPOINT_METHODS:
+                    self.breakpoint_cache.observe(method, parameters, None)
+                self.publish_rpc_event(method, parameters, post_data, started, 'transport_error')
+            raise
+        if type(responses) is not list:  # the whole batch is rejected
+            raise ValueError(responses.get('error', responses))
+        responses.sort(key=lambda response: response.get('id') if type(response.get('id')) is int else -1)
+        for (method, parameters), response in zip(calls, responses):
+            if method in BREAKPOINT_METHODS:
+                self.breakpoint_cache.observe(method, parameters, response)
+            self.publish_rpc_event(method, parameters, post_data, started, 'rpc_error' if 'error' in response else 'ok', response)
+        return responses
+
+    def meta_rpc_batch(self, calls: List[Tuple[str, List]], raise_on_error=True) -> List[Any]:
+        """
+        :param calls: [(method, parameters)], sent in a single HTTP request
+        :param raise_on_error: if False, errors are returned as ValueError objects in the list instead of being raised
+        :return: the undecoded `result` of each call, in the order of calls
+        """
+        results = []
+        for (method, parameters), response in zip(calls, self.send_rpc_batch(calls)):
+            if 'error' in response:
+                error = response['error']
+                error = ValueError(f"""{error['message']}\r\n{error['data']}""" if type(error) is dict and 'data' in error else error)
+                if raise_on_error:
+                    raise error
+                results.append(error)
+                continue
+            self.observe_relayed_result(method, parameters, response)
+            results.append(response['result'])
+        return results
+
+    def publish_rpc_event(self, method: str, parameters: List, post_data: str, started: float, status: str, raw_result: dict = None):
+        dispatcher = self.rpc_event_dispatcher
+        if dispatcher is None or not dispatcher.sampled():
+            return
+        duration = time.perf_counter() - started
+        gas_consumed = None
+        if raw_result is not None and type(raw_result.get('result')) is dict and (gas := raw_result['result'].get('gasconsumed')):
+            gas_consumed = int(gas)
+        dispatcher.publish(RpcCallEvent(method, len(post_data), self.previous_response_size, duration, status,
+                                        gas_consumed=gas_consumed, fairy_session=session_of_call(method, parameters)))
+
+    def meta_rpc_method_with_raw_result(self, method: str, parameters: List) -> Any:
+        result, post_data, started = self.send_rpc_request(method, parameters)
         if 'error' in result:
+            self.publish_rpc_event(method, parameters, post_data, started, 'rpc_error', result)
             raise ValueError(result['error'])
         self.previous_raw_result = result
         self.previous_result = None
+        self.observe_relayed_result(method, parameters, result)
+        self.publish_rpc_event(method, parameters, post_data, started, 'ok', result)
         if self.hook_function_after_rpc_call:
             self.hook_function_after_rpc_call()
         return result
 
     def meta_rpc_method(self, method: str, parameters: List, relay: bool = None, do_not_raise_on_result=False) -> Any:
-        post_data = self.request_body_builder(method, parameters)
-        self.previous_post_data = post_data
-        result = json.loads(self.requests_session.post(self.target_url, post_data, timeout=self.requests_timeout, verify=self.verify_SSL).text)
+        cache_session = None
+        if self.invocation_cache is not None and is_cacheable_call(method, parameters):
+            cache_session = parameters[0]
+            post_data = self.request_body_builder(method, parameters)
+            started = time.perf_counter()
+            if cached := self.invocation_cache.get(cache_session, post_data):
+                return self.return_cached_result(method, parameters, post_data, started, *cached)
+            result, post_data, started = self.send_rpc_request(method, parameters, post_data)
+        else:
+            result, post_data, started = self.send_rpc_request(method, parameters)
         self.previous_raw_result = result
         if 'error' in result:
+            self.publish_rpc_event(method, parameters, post_data, started, 'rpc_error', result)
             raise ValueError(f"""{result['error']['message']}\r\n{result['error']['data']}""" if 'data' in result['error'] else result['error'])
         if type(result['result']) is dict:
             result_result: dict = result['result']
@@ -208,6 +480,7 @@ class FairyClient:
             if gas_consumed := result_result.get('networkfee'):
                 self.previous_network_fee = int(gas_consumed)
             if 'exception' in result_result and result_result['exception'] is not None:
+                self.publish_rpc_event(method, parameters, post_data, started, 'vm_fault', result)
                 if do_not_raise_on_result:
                     return result_result['exception']
                 else:
@@ -216,6 +489,8 @@ class FairyClient:
                     if 'traceback' in result_result and result_result['traceback']:
                         raise ValueError(result_result['traceback'])
                     raise ValueError(result_result['exception'])
+            self.observe_relayed_result(method, parameters, result)
+            self.publish_rpc_event(method, parameters, post_data, started, 'ok', result)
             if relay or (relay is None and self.function_default_relay):
                 if method in {'invokefunction', 'invokescript'} and 'tx' not in result_result:
                     raise ValueError('No `tx` in response. '
@@ -230,12 +505,66 @@ class FairyClient:
                         self.sendrawtransaction(tx)
                 # else:
                 #     self.previous_txBase64Str = None
+        else:
+            self.publish_rpc_event(method, parameters, post_data, started, 'ok', result)
         self.previous_result = self.parse_stack_from_raw_result(result)
+        if cache_session is not None:
+            self.invocation_cache.put(cache_session, post_data, self.previous_result, result)
         if self.hook_function_after_rpc_call:
             self.hook_function_after_rpc_call()
         if self.verbose_return:
             return self.previous_result, result, post_data
         return self.previous_result
+
+    def observe_relayed_result(self, method: str, parameters: List, raw_result: dict):
+        """
+        Update client-side caches according to what a relayed invocation wrote to its fairy session
+        """
+        if method in DEBUG_RUN_METHODS or method in DEBUG_RESUME_METHODS:
+            self.observe_debug_result(method, parameters, raw_result)
+            return
+        if self.contract_metadata_cache is None or method not in RELAY_FLAG_METHODS \
+                or not sessions_changed_by_call(method, parameters) or type(raw_result.get('result')) is not dict:
+            return
+        self.contract_metadata_cache.observe_notifications(parameters[0], raw_result['result'].get('notifications') or [])
+
+    def observe_debug_result(self, method: str, parameters: List, raw_result: dict):
+        """
+        A debug run started with relay=True writes its session when it finishes,
+        maybe many debugcontinue or step calls later. Drop the cached reads of the session then
+        """
+        if not parameters or type(parameters[0]) is not str:
+            return
+        fairy_session = parameters[0]
+        if method in DEBUG_RUN_METHODS:
+            if not sessions_changed_by_call(method, parameters):
+                self.relayed_debug_sessions.discard(fairy_session)  # replaces any unfinished run of the session
+                return
+            self.relayed_debug_sessions.add(fairy_session)
+        elif fairy_session not in self.relayed_debug_sessions:
+            return
+        result = raw_result.get('result')
+        if type(result) is dict and str(result.get('state')).upper() == 'BREAK':
+            return
+        self.relayed_debug_sessions.discard(fairy_session)
+        if self.invocation_cache is not None:
+            self.invocation_cache.invalidate_session(fairy_session)
+        if self.contract_metadata_cache is not None:
+            self.contract_metadata_cache.invalidate_session(fairy_session)
+
+    def return_cached_result(self, method: str, parameters: List, post_data: str, started: float, parsed_result: Any, raw_result: dict):
+        self.previous_post_data = post_data
+        self.previous_raw_result = raw_result
+        self.previous_result = parsed_result
+        if type(raw_result['result']) is dict and (gas_consumed := raw_result['result'].get('gasconsumed')):
+            self.previous_gas_consumed = int(gas_consumed)
+        self.previous_response_size = 0
+        self.publish_rpc_event(method, parameters, post_data, started, 'cache_hit', raw_result)
+        if self.hook_function_after_rpc_call:
+            self.hook_function_after_rpc_call()
+        if self.verbose_return:
+            return parsed_result, raw_result, post_data
+        return parsed_result
     
     def print_previous_result(self):
         print(self.previous_result)
@@ -252,6 +581,19 @@ class FairyClient:
     def calculatenetworkfee(self, txBase64Str):
         return self.meta_rpc_method("calculatenetworkfee", [txBase64Str], relay=False)
     
+    def estimate_network_fee(self, transactions: Union[Transaction, str, bytes, List[Union[Transaction, str, bytes]]]) -> Union[int, List[int]]:
+        """
+        Network fees estimated locally by the NetworkFeeEstimator of this client,
+        which calls calculatenetworkfee only for signer sets it has not learned yet, in a single batch
+        :param transactions: a transaction or a list of them, as Transaction, base64 encoded or serialized
+        :return: network fee in datoshi, or a list of them
+        """
+        if self.network_fee_estimator is None:
+            self.network_fee_estimator = NetworkFeeEstimator(self)
+        if type(transactions) is list:
+            return self.network_fee_estimator.estimate_many(transactions)
+        return self.network_fee_estimator.estimate(transactions)
+
     @property
     def totalfee(self):
         return self.previous_network_fee + self.previous_gas_consumed
@@ -287,9 +629,9 @@ class FairyClient:
         return close_wallet_result
 
     def traverse_iterator(self, sid: str, iid: str, count=100) -> dict:
-        post_data = self.request_body_builder('traverseiterator', [sid, iid, count])
-        self.previous_post_data = post_data
-        result = json.loads(self.requests_session.post(self.target_url, post_data, timeout=self.requests_timeout, verify=self.verify_SSL).text)['result']
+        raw_result, post_data, started = self.send_rpc_request('traverseiterator', [sid, iid, count])
+        self.publish_rpc_event('traverseiterator', [sid, iid, count], post_data, started, 'rpc_error' if 'error' in raw_result else 'ok', raw_result)
+        result = raw_result['result']
         result_dict = dict()
         for kv in result:
             kv = kv['value']
@@ -792,18 +1134,32 @@ class FairyClient:
         :return:
         """
         fairy_session = fairy_session or self.fairy_session
-        # check manifest
-        manifest_dict = json.loads(manifest)
-        if manifest_dict["permissions"] == [{'contract': '0xacce6fd80d44e1796aa0c2c625e9e4e0ce39efc0', 'methods': ['deserialize', 'serialize']}, {'contract': '0xfffdc93764dbaddd97c48f252a53ea4643faa3fd', 'methods': ['destroy', 'getContract', 'update']}]:
-            print('!!!SERIOUS WARNING: Did you write [ContractPermission("*", "*")] in your contract?!!!')
+        parameters, manifest_dict = self.virtual_deploy_parameters(nef, manifest, data, signers, fairy_session)
         try:
-            return Hash160Str(self.meta_rpc_method("virtualdeploy", [fairy_session, base64.b64encode(nef).decode(), manifest, self.parse_param(data), list(map(lambda signer: signer.to_dict(), to_list(signers or self.signers)))])[fairy_session])
+            contract_hash = Hash160Str(self.meta_rpc_method("virtualdeploy", parameters)[fairy_session])
         except Exception as e:
             print(f'If you have weird exceptions from this method, '
                   f'check if you have written any `null` to contract storage in `_deploy` method. '
                   f'Especially, consider marking your UInt160 properties of class '
                   f'as `static readonly UInt160` in your contract')
             raise e
+        if self.contract_metadata_cache is not None and fairy_session:
+            self.contract_metadata_cache.put(fairy_session, ContractMetadata(contract_hash, manifest_dict, nef=nef))
+        return contract_hash
+
+    def virtual_deploy_parameters(self, nef: bytes, manifest: str, data: Any = None, signers: Union[Signer, List[Signer]] = None,
+                                  fairy_session: str = None, validate: bool = None) -> Tuple[List, dict]:
+        """
+        Check the NEF and manifest and build the parameters of RPC virtualdeploy
+        :param validate: defaults to client.validate_contracts
+        :return: (parameters, parsed manifest)
+        """
+        fairy_session = fairy_session or self.fairy_session
+        manifest_dict = json.loads(manifest)
+        if self.validate_contracts if validate is None else validate:
+            self.check_contract(nef, manifest_dict)
+        return [fairy_session, base64.b64encode(nef).decode(), manifest, self.parse_param(data),
+                list(map(lambda signer: signer.to_dict(), to_list(signers or self.signers)))], manifest_dict
 
     def get_many_blocks(self, indexes_or_hashes: List[Union[int, Hash256Str]]):
         '''
@@ -820,7 +1176,35 @@ class FairyClient:
         if not scripthash:
             raise ValueError("No contract scripthash specified!")
         fairy_session = fairy_session or self.fairy_session
-        return self.meta_rpc_method("getcontract", [fairy_session, scripthash])
+        cache = self.contract_metadata_cache if fairy_session and not self.verbose_return else None
+        if cache is not None and (metadata := cache.get(fairy_session, scripthash)) and metadata.contract_state:
+            contract_state, parameters = copy.deepcopy(metadata.contract_state), [fairy_session, scripthash]
+            return self.return_cached_result('getcontract', parameters, self.request_body_builder('getcontract', parameters),
+                                             time.perf_counter(), contract_state, {'jsonrpc': '2.0', 'id': 1, 'result': contract_state})
+        contract_state = self.meta_rpc_method("getcontract", [fairy_session, scripthash])
+        if cache is not None and type(contract_state) is dict:
+            cache.put(fairy_session, ContractMetadata.from_contract_state(copy.deepcopy(contract_state)))
+        return contract_state
+
+    def get_contract_metadata(self, scripthash: Union[str, int, Hash160Str] = None, fairy_session: str = None) -> ContractMetadata:
+        """
+        :return: ContractMetadata with parsed manifest, ABI method table and NEF checksum,
+            served from client.contract_metadata_cache if possible
+        """
+        scripthash = Hash160Str.from_str_or_int(scripthash) or self.contract_scripthash
+        fairy_session = fairy_session or self.fairy_session
+        if self.contract_metadata_cache is not None and fairy_session \
+                and (metadata := self.contract_metadata_cache.get(fairy_session, scripthash)):
+            return metadata
+        verbose_return, self.verbose_return = self.verbose_return, False
+        try:
+            contract_state = self.get_contract(scripthash, fairy_session=fairy_session)
+        finally:
+            self.verbose_return = verbose_return
+        metadata = ContractMetadata.from_contract_state(contract_state)
+        if self.contract_metadata_cache is not None and fairy_session:
+            self.contract_metadata_cache.put(fairy_session, metadata)
+        return metadata
 
     def save_nef_manifest(self, scripthash: Union[str, int, Hash160Str] = None, nef_path_and_filename: str = None, fairy_session: str = None, auto_dumpnef=True) -> Tuple[bytes, str]:
         scripthash = Hash160Str.from_str_or_int(scripthash) or self.contract_scripthash
@@ -850,6 +1234,20 @@ class FairyClient:
     def await_confirmed_transaction(self, tx_hash: Union[str, int, Hash256Str], verbose=True, wait_block_count = 2):
         return self.meta_rpc_method('awaitconfirmedtransaction', [Hash256Str.from_str_or_int(tx_hash), verbose, wait_block_count])
 
+    def track_transactions(self, tx_hashes: Union[List[Union[str, int, Hash256Str]], str, int, Hash256Str],
+                           timeout: float = None) -> Dict[str, Future]:
+        """
+        Wait for many transactions at once with the TransactionTracker of this client,
+        which polls the block count once for all of them, instead of blocking in await_confirmed_transaction for each
+        :param timeout: seconds; default: client.transaction_tracker.default_timeout
+        :return: {tx hash: future of the application log of the transaction}
+        """
+        if self.transaction_tracker is None:
+            self.transaction_tracker = TransactionTracker(self)
+        if type(tx_hashes) is not list:
+            tx_hashes = [tx_hashes]
+        return self.transaction_tracker.track_many(tx_hashes, timeout)
+
     @staticmethod
     def get_nef_and_manifest_from_path(nef_path_and_filename: str) -> Tuple[bytes, str]:
         path, nef_filename = os.path.split(nef_path_and_filename)  # '../NFTLoan/NFTLoan/bin/sc', 'NFTFlashLoan.nef'
@@ -863,46 +1261,232 @@ class FairyClient:
 
     def virutal_deploy_from_path(self, nef_path_and_filename: str, data: Any = None, fairy_session: str = None,
                                  auto_dumpnef=True, dumpnef_backup=True, auto_set_debug_info=True,
-                                 auto_set_client_contract_scripthash=True) -> Hash160Str:
+                                 auto_set_client_contract_scripthash=True, use_deploy_cache=True) -> Hash160Str:
         """
         auto virtual deploy which also executes dumpnef (on your machine) and SetDebugInfo (with RPC)
         :param nef_path_and_filename: '../NFTLoan/NFTLoan/bin/sc/NFTFlashLoan.nef'
         :param data: Contract parameter sent to _deploy method of contract
+        :param use_deploy_cache: if client.deploy_cache is set, skip deploying, dumpnef and SetDebugInfo
+            for contents already deployed in the session, dumped, or held by the server
         """
         fairy_session = fairy_session or self.fairy_session
-        path, nef_filename = os.path.split(nef_path_and_filename)  # '../NFTLoan/NFTLoan/bin/sc', 'NFTFlashLoan.nef'
-        assert nef_filename.endswith('.nef'), f"File name must end with .nef . Got {nef_filename}"
-        with open(nef_path_and_filename, 'rb') as f:
-            nef = f.read()
-        contract_path_and_filename = nef_path_and_filename[:-4]  # '../NFTLoan/NFTLoan/bin/sc/NFTFlashLoan'
-        with open(contract_path_and_filename+".manifest.json", 'r', encoding='utf-8') as f:
-            manifest = f.read()
-        contract_hash = self.virtual_deploy(nef, manifest, data=data, fairy_session=fairy_session)
-        nefdbgnfo_path_and_filename = contract_path_and_filename + '.nefdbgnfo'
-        dumpnef_path_and_filename = contract_path_and_filename + '.nef.txt'
-        if os.path.exists(nefdbgnfo_path_and_filename):
-            if auto_dumpnef and (not os.path.exists(dumpnef_path_and_filename) or os.path.getmtime(dumpnef_path_and_filename) < os.path.getmtime(nef_path_and_filename)):
-                if dumpnef_backup and os.path.exists(dumpnef_path_and_filename) and not os.path.exists(contract_path_and_filename + '.bk.txt'):
-                    # only backup the .nef.txt file when no backup exists
-                    os.rename(dumpnef_path_and_filename, contract_path_and_filename + '.bk.txt')
-                print(f'dumpnef {nef_filename}', os.popen(f'dumpnef {nef_path_and_filename} > {nef_path_and_filename}.txt').read())
-            if auto_set_debug_info and os.path.exists(dumpnef_path_and_filename) \
-                    and os.path.getmtime(dumpnef_path_and_filename) >= os.path.getmtime(nef_path_and_filename) \
-                    and fairy_session:
-                with open(nefdbgnfo_path_and_filename, 'rb') as f:
-                    nefdbgnfo = f.read()
-                with open(dumpnef_path_and_filename, 'r', encoding='utf-8') as f:
-                    dumpnef = f.read()
-                self.set_debug_info(nefdbgnfo, dumpnef, contract_hash)
-        else:
-            print('WARNING! No .nefdbgnfo found.'
-                  'It is highly recommended to generate .nefdbgnfo for debugging.'
-                  'If you are writing contracts in C#,'
-                  'consider building your project with command `nccs your.csproj --debug`.')
+        deploy_cache = self.deploy_cache if use_deploy_cache else None
+        artifacts = DeployArtifacts.from_path(nef_path_and_filename, auto_dumpnef=auto_dumpnef, dumpnef_backup=dumpnef_backup,
+                                              deploy_cache=deploy_cache, read_debug_info=auto_set_debug_info and bool(fairy_session))
+        contract_hash, deploy_hash = None, None
+        if deploy_cache is not None and fairy_session:
+            deploy_hash = self.deploy_content_hash(artifacts, data)
+            contract_hash = self.find_cached_deployment(deploy_hash, artifacts.nef, artifacts.manifest, fairy_session)
+        if contract_hash is None:
+            contract_hash = self.virtual_deploy(artifacts.nef, artifacts.manifest, data=data, fairy_session=fairy_session)
+            if deploy_hash is not None:
+                deploy_cache.put_deployment(self.url_of_session(fairy_session), fairy_session, deploy_hash, contract_hash)
+        if artifacts.nefdbgnfo is not None and artifacts.dumpnef is not None:
+            if deploy_cache is None or not self.server_holds_debug_info(contract_hash, artifacts):
+                self.set_debug_info(artifacts.nefdbgnfo, artifacts.dumpnef, contract_hash)
+            else:
+                self.register_debug_info(contract_hash, artifacts.nefdbgnfo, artifacts.dumpnef)
         if auto_set_client_contract_scripthash:
             self.contract_scripthash = contract_hash
         return contract_hash
 
+    @staticmethod
+    def validate_contract(nef: bytes, manifest: Union[str, dict]) -> NefFile:
+        """
+        Parse the NEF and validate the manifest locally, printing warnings about risky manifests
+        :raise ValueError: for bad checksums, ABI offsets outside the script, malformed manifests, etc.
+        """
+        nef_file, warnings = validate_contract(nef, manifest)
+        for warning in warnings:
+            print(warning)
+        return nef_file
+
+    def check_contract(self, nef: bytes, manifest: Union[str, dict]) -> Union[NefFile, None]:
+        """
+        validate_contract before a virtual deploy. Invalid contracts raise ValueError if client.reject_invalid_contracts,
+        and are only warned about otherwise
+        :return: the parsed NEF, or None for an invalid contract
+        """
+        try:
+            return self.validate_contract(nef, manifest)
+        except ValueError as e:
+            if self.reject_invalid_contracts:
+                raise
+            print(f'WARNING: deploying a contract failing local validation: {e}')
+            return None
+
+    def predict_contract_hash(self, nef: Union[bytes, NefFile, int], manifest: Union[str, dict], signers: Union[Signer, List[Signer]] = None) -> Hash160Str:
+        """
+        Scripthash of the contract if deployed by virtual_deploy, computed locally without deploying.
+        :param nef: .nef content, parsed NefFile, or its checksum
+        :param manifest: manifest json str, parsed dict, or just the contract name
+        :param signers: the first signer is the sender deploying the contract. Default: client.signers
+        """
+        signers = to_list(signers or self.signers)
+        if not signers:
+            raise ValueError('Cannot predict contract hash without signers')
+        return compute_contract_hash(signers[0].account, nef, manifest)
+
+    def predict_contract_hash_from_path(self, nef_path_and_filename: str, signers: Union[Signer, List[Signer]] = None) -> Hash160Str:
+        """
+        :param nef_path_and_filename: '../NFTLoan/NFTLoan/bin/sc/NFTFlashLoan.nef'; .manifest.json is read from the same path
+        """
+        with open(nef_path_and_filename, 'rb') as f:
+            nef = f.read()
+        with open(nef_path_and_filename[:-4] + '.manifest.json', 'r', encoding='utf-8') as f:
+            manifest = f.read()
+        return self.predict_contract_hash(nef, manifest, signers)
+
+    def virtual_deploy_many(self, nef_paths_and_filenames: List[str], data: Any = None, data_by_path: Dict[str, Any] = None,
+                            dependencies: Dict[str, List[str]] = None, fairy_session: str = None,
+                            auto_dumpnef=True, dumpnef_backup=True, auto_set_debug_info=True, use_deploy_cache=True,
+                            max_workers: int = None) -> Dict[str, Hash160Str]:
+        """
+        Deploy many contracts from paths, like virutal_deploy_from_path.
+        Files are read and dumpnef is executed concurrently in a thread pool.
+        Contracts are deployed in the order of dependencies with a single batched request,
+        which the server executes sequentially.
+        Debug info is set in the same batch at the predicted scripthashes of the contracts,
+        and moved in another batch for contracts deployed elsewhere than predicted,
+        or set in another batch if there is no signer to predict scripthashes with.
+        :param nef_paths_and_filenames: ['../NFTLoan/NFTLoan/bin/sc/NFTFlashLoan.nef', '../NFTLoan/NophtD/bin/sc/TestNophtD.nef']
+        :param data: Contract parameter sent to _deploy method of every contract
+        :param data_by_path: {nef path: parameter sent to _deploy method of the contract}, overriding `data`
+        :param dependencies: {nef path: [nef paths that must be deployed before it]},
+            e.g. because its _deploy method calls them. Use predict_contract_hash_from_path to build `data` referring to other contracts
+        :param max_workers: of the thread pool reading files and executing dumpnef
+        :return: {contract name in manifest: scripthash}
+        """
+        fairy_session = fairy_session or self.fairy_session
+        deploy_cache = self.deploy_cache if use_deploy_cache else None
+        data_by_path = data_by_path or dict()
+        dependencies = dependencies or dict()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            all_artifacts: List[DeployArtifacts] = list(executor.map(
+                lambda path: DeployArtifacts.from_path(path, auto_dumpnef=auto_dumpnef, dumpnef_backup=dumpnef_backup,
+                                                       deploy_cache=deploy_cache, read_debug_info=auto_set_debug_info and bool(fairy_session)),
+                nef_paths_and_filenames))
+        artifacts_by_path: Dict[str, DeployArtifacts] = dict(zip(nef_paths_and_filenames, all_artifacts))
+        if self.validate_contracts:  # check every contract before deploying any: warn, or raise with reject_invalid_contracts
+            for artifacts in all_artifacts:
+                self.check_contract(artifacts.nef, artifacts.manifest)
+
+        order: List[str] = []  # topological order of dependencies
+        remaining = list(nef_paths_and_filenames)
+        while remaining:
+            stage = [path for path in remaining
+                     if all(d in order or d not in artifacts_by_path for d in dependencies.get(path, []))]
+            if not stage:
+                raise ValueError(f'Circular dependencies among {remaining}')
+            order += stage
+            remaining = [path for path in remaining if path not in stage]
+
+        predicted = bool(self.signers)
+        contract_hashes: Dict[str, Hash160Str] = {path: self.predict_contract_hash(artifacts_by_path[path].nef, artifacts_by_path[path].manifest)
+                                                  for path in order} if predicted else dict()
+        to_deploy: List[Tuple[str, Union[str, None]]] = []
+        for path in order:
+            artifacts, deploy_hash = artifacts_by_path[path], None
+            if deploy_cache is not None and fairy_session:
+                deploy_hash = self.deploy_content_hash(artifacts, data_by_path.get(path, data))
+                if cached_hash := self.find_cached_deployment(deploy_hash, artifacts.nef, artifacts.manifest, fairy_session):
+                    contract_hashes[path] = cached_hash
+                    continue
+            to_deploy.append((path, deploy_hash))
+        calls = [('virtualdeploy', self.virtual_deploy_parameters(
+            artifacts_by_path[path].nef, artifacts_by_path[path].manifest, data_by_path.get(path, data), fairy_session=fairy_session, validate=False)[0])
+            for path, _ in to_deploy]
+
+        def debug_info_to_set() -> List[Tuple[Hash160Str, DeployArtifacts]]:
+            with_debug_info = [(contract_hashes[path], artifacts_by_path[path]) for path in nef_paths_and_filenames
+                               if artifacts_by_path[path].nefdbgnfo is not None and artifacts_by_path[path].dumpnef is not None]
+            if deploy_cache is not None and any(deploy_cache.get_debug_info(self.url_of_session(), contract_hash) == content_hash(artifacts.nefdbgnfo, artifacts.dumpnef)
+                                                for contract_hash, artifacts in with_debug_info):
+                held_debug_info = set(self.list_debug_info())
+                with_debug_info = [(contract_hash, artifacts) for contract_hash, artifacts in with_debug_info
+                                   if not self.server_holds_debug_info(contract_hash, artifacts, held_debug_info)]
+            return with_debug_info
+
+        # with predicted scripthashes, debug info is set in the same batch after the deploys
+        with_debug_info = debug_info_to_set() if predicted else []
+        debug_info_calls = [('setdebuginfo', [contract_hash, self.all_to_base64(artifacts.nefdbgnfo), artifacts.dumpnef])
+                            for contract_hash, artifacts in with_debug_info]
+        results = self.meta_rpc_batch(calls + debug_info_calls, raise_on_error=False) if calls or debug_info_calls else []
+        errors = []
+        mispredicted: Dict[Hash160Str, Hash160Str] = dict()  # {predicted scripthash: actual scripthash}
+        for (path, deploy_hash), result in zip(to_deploy, results):
+            if isinstance(result, ValueError):
+                errors.append(f'{path}: {result}')
+                continue
+            contract_hash = Hash160Str(result[fairy_session])
+            if predicted and contract_hash != contract_hashes[path]:
+                print(f'WARNING: {path} deployed at {contract_hash} instead of predicted {contract_hashes[path]}')
+                mispredicted[contract_hashes[path]] = contract_hash
+            contract_hashes[path] = contract_hash
+            artifacts = artifacts_by_path[path]
+            if self.contract_metadata_cache is not None and fairy_session:
+                self.contract_metadata_cache.put(fairy_session, ContractMetadata(contract_hash, artifacts.manifest, nef=artifacts.nef))
+            if deploy_hash is not None:
+                deploy_cache.put_deployment(self.url_of_session(fairy_session), fairy_session, deploy_hash, contract_hash)
+        errors += [f'setdebuginfo {contract_hash}: {result}' for (contract_hash, _), result in zip(with_debug_info, results[len(calls):])
+                   if isinstance(result, ValueError)]
+        # debug info set at wrongly predicted scripthashes is moved to the deployed contracts
+        moved = [(contract_hash, artifacts) for contract_hash, artifacts in with_debug_info if contract_hash in mispredicted]
+        if moved:
+            results = self.meta_rpc_batch(
+                [('deletedebuginfo', [contract_hash for contract_hash, _ in moved])]
+                + [('setdebuginfo', [mispredicted[contract_hash], self.all_to_base64(artifacts.nefdbgnfo), artifacts.dumpnef])
+                   for contract_hash, artifacts in moved], raise_on_error=False)
+            errors += [f'setdebuginfo {mispredicted[contract_hash]}: {result}' for (contract_hash, _), result in zip(moved, results[1:])
+                       if isinstance(result, ValueError)]
+            with_debug_info = [(mispredicted.get(contract_hash, contract_hash), artifacts) for contract_hash, artifacts in with_debug_info]
+        if errors:
+            raise ValueError('Failed to deploy:\n' + '\n'.join(errors))
+
+        if not predicted:
+            with_debug_info = debug_info_to_set()
+            if with_debug_info:
+                self.meta_rpc_batch([('setdebuginfo', [contract_hash, self.all_to_base64(artifacts.nefdbgnfo), artifacts.dumpnef])
+                                     for contract_hash, artifacts in with_debug_info])
+        if self.deploy_cache is not None:
+            for contract_hash, artifacts in with_debug_info:
+                self.deploy_cache.put_debug_info(self.url_of_session(), contract_hash, content_hash(artifacts.nefdbgnfo, artifacts.dumpnef))
+        for path in nef_paths_and_filenames:
+            if artifacts_by_path[path].nefdbgnfo is not None and artifacts_by_path[path].dumpnef is not None:
+                self.register_debug_info(contract_hashes[path], artifacts_by_path[path].nefdbgnfo, artifacts_by_path[path].dumpnef)
+        return {artifacts_by_path[path].name: contract_hashes[path] for path in nef_paths_and_filenames}
+
+    def deploy_content_hash(self, artifacts: DeployArtifacts, data: Any = None) -> str:
+        return content_hash(artifacts.nef, artifacts.manifest, json.dumps(self.parse_param(data)),
+                            json.dumps([signer.to_dict() for signer in self.signers]))
+
+    def server_holds_debug_info(self, contract_hash: Hash160Str, artifacts: DeployArtifacts, held_debug_info: set = None) -> bool:
+        """
+        :return: True if client.deploy_cache remembers setting the same debug info for the contract,
+            and the server still lists the contract in list_debug_info
+        :param held_debug_info: result of list_debug_info, if already fetched
+        """
+        if self.deploy_cache is None \
+                or self.deploy_cache.get_debug_info(self.url_of_session(), contract_hash) != content_hash(artifacts.nefdbgnfo, artifacts.dumpnef):
+            return False
+        return contract_hash in (held_debug_info if held_debug_info is not None else self.list_debug_info())
+
+    def find_cached_deployment(self, deploy_hash: str, nef: bytes, manifest: str, fairy_session: str) -> Union[Hash160Str, None]:
+        """
+        :return: scripthash of the contract if client.deploy_cache remembers deploying the same content in the session,
+            and the session still has the contract with the same NEF and name
+        """
+        cached_hash = self.deploy_cache.get_deployment(self.url_of_session(fairy_session), fairy_session, deploy_hash)
+        if cached_hash is None:
+            return None
+        try:
+            metadata = self.get_contract_metadata(cached_hash, fairy_session=fairy_session)
+        except (ValueError, TypeError, KeyError):
+            return None
+        if metadata.nef != nef or metadata.name != json.loads(manifest)['name']:
+            return None
+        return metadata.contract_hash
+
     @staticmethod
     def all_to_base64(key: Union[str, bytes, int]) -> str:
         if type(key) is str:
@@ -986,7 +1570,31 @@ class FairyClient:
     """debug info and file names"""
     def set_debug_info(self, nefdbgnfo: bytes, dumpnef_content: str, contract_scripthash: Union[str, int, Hash160Str] = None) -> Dict[Hash160Str, bool]:
         contract_scripthash = Hash160Str.from_str_or_int(contract_scripthash) or self.contract_scripthash
-        return {Hash160Str(k): v for k, v in self.meta_rpc_method("setdebuginfo", [contract_scripthash, self.all_to_base64(nefdbgnfo), dumpnef_content]).items()}
+        result = {Hash160Str(k): v for k, v in self.meta_rpc_method("setdebuginfo", [contract_scripthash, self.all_to_base64(nefdbgnfo), dumpnef_content]).items()}
+        if self.deploy_cache is not None:
+            self.deploy_cache.put_debug_info(self.url_of_session(), contract_scripthash, content_hash(nefdbgnfo, dumpnef_content))
+        self.register_debug_info(contract_scripthash, nefdbgnfo, dumpnef_content)
+        return result
+
+    def register_debug_info(self, contract_scripthash: Union[str, int, Hash160Str], nefdbgnfo: bytes, dumpnef_content: str = None):
+        """
+        Keep debug info of a contract for local lookups with get_debug_info_index, without sending it to the server
+        """
+        contract_scripthash = Hash160Str.from_str_or_int(contract_scripthash)
+        self.debug_info_sources[contract_scripthash] = (nefdbgnfo, dumpnef_content)
+        self.debug_info_indexes.pop(contract_scripthash, None)
+
+    def get_debug_info_index(self, contract_scripthash: Union[str, int, Hash160Str] = None) -> Union[DebugInfoIndex, None]:
+        """
+        :return: index of the debug info set or registered by this client for the contract,
+            for instruction pointer, source line and variable name lookups without RPC. None if unknown
+        """
+        contract_scripthash = Hash160Str.from_str_or_int(contract_scripthash) or self.contract_scripthash
+        index = self.debug_info_indexes.get(contract_scripthash)
+        if index is None and contract_scripthash in self.debug_info_sources:
+            index = DebugInfoIndex.from_nefdbgnfo(*self.debug_info_sources[contract_scripthash])
+            self.debug_info_indexes[contract_scripthash] = index
+        return index
 
     def list_debug_info(self) -> List[Hash160Str]:
         return [Hash160Str(i) for i in self.meta_rpc_method("listdebuginfo", [])]
@@ -1000,6 +1608,11 @@ class FairyClient:
             result: Dict[str, bool] = self.meta_rpc_method("deletedebuginfo", [contract_scripthashes])
         else:
             result: Dict[str, bool] = self.meta_rpc_method("deletedebuginfo", contract_scripthashes)
+        for contract_scripthash in to_list(contract_scripthashes):
+            if self.deploy_cache is not None:
+                self.deploy_cache.forget_debug_info(self.url_of_session(), contract_scripthash)
+            self.debug_info_sources.pop(Hash160Str.from_str_or_int(contract_scripthash), None)
+            self.debug_info_indexes.pop(Hash160Str.from_str_or_int(contract_scripthash), None)
         return {Hash160Str(k): v for k, v in result.items()}
 
     """breakpoints"""
@@ -1043,6 +1656,63 @@ class FairyClient:
         filename_and_line_num = filename_and_line_num or []
         return self.meta_rpc_method("deletesourcecodebreakpoints", [contract_scripthash] + filename_and_line_num)
 
+    def sync_breakpoints(self, assembly_breakpoints: Union[List[int], Dict[Union[str, int, Hash160Str], List[int]]] = None,
+                         source_code_breakpoints: Union[List[Tuple[str, int]], Dict[Union[str, int, Hash160Str], List[Tuple[str, int]]]] = None,
+                         contract_scripthash: Union[str, int, Hash160Str] = None, refresh: bool = False) -> Dict[str, int]:
+        """
+        Make the breakpoints on the server exactly the declared ones, sending in a single batch
+        only the breakpoints to add and delete compared with client.breakpoint_cache.
+        Breakpoints of contracts unknown to the cache are listed first, in another single batch.
+        Declaring the same breakpoints again costs no request at all.
+        :param assembly_breakpoints: desired instruction pointers of contract_scripthash, or {contract: instruction pointers}.
+            None to leave assembly breakpoints untouched
+        :param source_code_breakpoints: desired [(filename, line number)] of contract_scripthash, or {contract: [(filename, line number)]}.
+            None to leave source code breakpoints untouched
+        :param contract_scripthash: default: client.contract_scripthash
+        :param refresh: list the breakpoints on the server even if known, in case they were changed by others
+        :return: {'added': count, 'deleted': count, 'batches': count of requests sent}
+        """
+        contract_scripthash = Hash160Str.from_str_or_int(contract_scripthash) or self.contract_scripthash
+
+        def by_contract(declared, normalize) -> Dict[Hash160Str, set]:
+            if declared is None:
+                return dict()
+            if type(declared) is not dict:
+                declared = {contract_scripthash: declared}
+            return {Hash160Str.from_str_or_int(c): {normalize(b) for b in breakpoints} for c, breakpoints in declared.items()}
+
+        desired_assembly = by_contract(assembly_breakpoints, int)
+        desired_source_code = by_contract(source_code_breakpoints, lambda b: (b[0], int(b[1])))
+        cache = self.breakpoint_cache
+        batches = 0
+        list_calls = [('listassemblybreakpoints', [c]) for c in desired_assembly if refresh or str(c) not in cache.assembly] \
+            + [('listsourcecodebreakpoints', [c]) for c in desired_source_code if refresh or str(c) not in cache.source_code]
+        if list_calls:
+            self.meta_rpc_batch(list_calls)
+            batches += 1
+
+        calls, added, deleted = [], 0, 0
+        for c, desired in desired_assembly.items():
+            current = cache.assembly.get(str(c), set())
+            if to_delete := sorted(current - desired):
+                calls.append(('deleteassemblybreakpoints', [c] + to_delete))
+            if to_add := sorted(desired - current):
+                calls.append(('setassemblybreakpoints', [c] + to_add))
+            added, deleted = added + len(to_add), deleted + len(to_delete)
+        for c, desired in desired_source_code.items():
+            current = cache.source_code.get(str(c), set())
+            if to_delete := sorted(current - desired):
+                calls.append(('deletesourcecodebreakpoints', [c] + [i for pair in to_delete for i in pair]))
+            if to_add := sorted(desired - current):
+                calls.append(('setsourcecodebreakpoints', [c] + [i for pair in to_add for i in pair]))
+            added, deleted = added + len(to_add), deleted + len(to_delete)
+        if calls:
+            errors = [e for e in self.meta_rpc_batch(calls, raise_on_error=False) if isinstance(e, ValueError)]
+            batches += 1
+            if errors:
+                raise ValueError(f'Failed to sync breakpoints: {errors}')
+        return {'added': added, 'deleted': deleted, 'batches': batches}
+
     def delete_debug_snapshots(self, fairy_sessions: Union[List[str], str]):
         if type(fairy_sessions) is str:
             return self.meta_rpc_method("deletedebugsnapshots", [fairy_sessions])
@@ -1194,6 +1864,179 @@ class FairyClient:
         result = self.meta_rpc_method_with_raw_result("getvariablenamesandvalues", [fairy_session, invocation_stack_index])
         return self.parse_stack_from_raw_result(result)
     
+    DEBUG_STATE_METHODS = ['getinstructionpointer', 'getlocalvariables', 'getarguments', 'getstaticfields', 'getevaluationstack']
+
+    def debug_state(self, depth: int = 1, with_variable_names_and_values: bool = False,
+                    contract_scripthash: Union[str, int, Hash160Str] = None, fairy_session: str = None) -> DebugState:
+        """
+        Fetch the invocation stack, and the instruction pointer, local variables, arguments, static fields and evaluation stack
+        of the top `depth` contexts, in a single batched request instead of one request for each of them.
+        Frames are resolved to methods, source lines and variable names with the local debug info index if available.
+        :param depth: number of contexts from the current one. Contexts beyond the invocation stack are omitted
+        :param with_variable_names_and_values: also fetch getvariablenamesandvalues for each context
+        :param contract_scripthash: contract of the frames whose scripthash is not found in the invocation stack,
+            for resolving them with local debug info. Default: client.contract_scripthash
+        """
+        fairy_session = fairy_session or self.fairy_session
+        calls = self.debug_state_calls(depth, with_variable_names_and_values, fairy_session)
+        return self.debug_state_from_results(self.meta_rpc_batch(calls, raise_on_error=False), depth,
+                                             with_variable_names_and_values, contract_scripthash)
+
+    def debug_state_calls(self, depth: int = 1, with_variable_names_and_values: bool = False, fairy_session: str = None) -> List[Tuple[str, List]]:
+        """
+        :return: calls of debug_state, for sending in a batch after other calls
+        """
+        fairy_session = fairy_session or self.fairy_session
+        methods = self.DEBUG_STATE_METHODS + (['getvariablenamesandvalues'] if with_variable_names_and_values else [])
+        return [('getinvocationstack', [fairy_session])] + [(method, [fairy_session, i]) for i in range(depth) for method in methods]
+
+    def debug_state_from_results(self, results: List[Any], depth: int = 1, with_variable_names_and_values: bool = False,
+                                 contract_scripthash: Union[str, int, Hash160Str] = None) -> DebugState:
+        """
+        :param results: of meta_rpc_batch(debug_state_calls(...), raise_on_error=False)
+        """
+        contract_scripthash = Hash160Str.from_str_or_int(contract_scripthash) or self.contract_scripthash
+        method_count = len(self.DEBUG_STATE_METHODS) + (1 if with_variable_names_and_values else 0)
+        if isinstance(results[0], ValueError):
+            raise results[0]
+        invocation_stack = results[0]
+        frames = []
+        for i in range(depth):
+            frame_results = results[1 + i * method_count:1 + (i + 1) * method_count]
+            if error := next((r for r in frame_results if isinstance(r, ValueError)), None):
+                if i == 0:
+                    raise error
+                break  # beyond the invocation stack
+            values = [[self.parse_single_item(item) for item in r['stack']] if type(r) is dict and 'stack' in r else r
+                      for r in frame_results]
+            instruction_pointer = values[0][0] if type(values[0]) is list else values[0]
+            scripthash = self.scripthash_of_context(invocation_stack[i]) \
+                if type(invocation_stack) is list and i < len(invocation_stack) else None
+            frame = DebugFrame(i, int(instruction_pointer), *values[1:5],
+                               variable_names_and_values=values[5] if with_variable_names_and_values else None,
+                               scripthash=scripthash or contract_scripthash)
+            if frame.scripthash and (index := self.get_debug_info_index(frame.scripthash)):
+                frame.method = index.method_at(frame.instruction_pointer)
+                frame.source_line = index.source_line_at(frame.instruction_pointer)
+                frame.variable_names = index.variable_names(frame.instruction_pointer)
+            frames.append(frame)
+        return DebugState(invocation_stack, frames)
+
+    @staticmethod
+    def scripthash_of_context(context: Any) -> Union[Hash160Str, None]:
+        """
+        :param context: an item of the result of getinvocationstack
+        """
+        if type(context) is dict:
+            context = context.get('scripthash') or context.get('hash')
+        if type(context) is str and len(context) == 42 and context.startswith('0x'):
+            return Hash160Str(context)
+        return None
+
+    def record_trace(self, operation: str, params: List[Union[List, str, int, dict, Hash160Str, UInt160, bytes, bytearray]] = None,
+                     signers: List[Signer] = None, contract_scripthash: Union[str, int, Hash160Str] = None,
+                     only_source_line_changes: bool = False, record_stack_depth: bool = True,
+                     step_batch_size: int = 64, max_steps: int = None,
+                     exec_fee_factor: int = DEFAULT_EXEC_FEE_FACTOR, relay: bool = False, fairy_session: str = None) -> ExecutionTrace:
+        """
+        Debug the function from its first instruction to the end of execution with step-into,
+        recording (contract, instruction pointer, source line, evaluation stack depth, gas consumed so far) of every step.
+        Steps are sent in batches of step_batch_size, which the server executes in order, so a trace of n steps
+        costs about n / step_batch_size round trips.
+        Gas is the sum of the fixed prices of the executed instructions of contracts whose NEF can be fetched,
+        unless the server reports gasconsumed at each break. Prices of SYSCALLs and CALLTs are not included.
+        :param only_source_line_changes: record only the steps where the contract or source line changes
+        :param record_stack_depth: also fetch getevaluationstack at each step, in the same batches
+        :param max_steps: stop recording after this many steps; the trace has final_state BREAK then
+        :return: the trace, with final_gas consumed by the end of execution or at the break of max_steps
+        :param relay: write the result of the traced execution to the session, as a relayed invocation would
+        """
+        contract_scripthash = Hash160Str.from_str_or_int(contract_scripthash) or self.contract_scripthash
+        fairy_session = fairy_session or self.fairy_session
+        params = params or []
+        abi_method = self.get_contract_metadata(contract_scripthash, fairy_session).get_abi_method(operation, len(params))
+        if abi_method is None:
+            raise ValueError(f'No method {operation} with {len(params)} parameters in contract {contract_scripthash}')
+        entry = abi_method['offset']
+        existing_breakpoints = self.list_assembly_breakpoints(contract_scripthash=contract_scripthash)
+        if entry not in existing_breakpoints:
+            self.set_assembly_breakpoints(entry, contract_scripthash=contract_scripthash)
+        try:
+            rpc_breakpoint = self.debug_any_function_with_session(contract_scripthash, operation, params, signers=signers,
+                                                                  relay=relay, with_print=False, fairy_session=fairy_session)
+        finally:
+            if entry not in existing_breakpoints:
+                self.delete_assembly_breakpoints(entry, contract_scripthash=contract_scripthash)
+
+        trace = ExecutionTrace(operation)
+        if rpc_breakpoint.state != VMState.BREAK:
+            trace.final_state, trace.exception = rpc_breakpoint.state.name, rpc_breakpoint.exception
+            return trace
+        prices: Dict[str, Dict[int, int]] = dict()  # {contract: {instruction pointer: price}}
+        indexes: Dict[str, Union[DebugInfoIndex, None]] = dict()
+
+        def prices_of(contract: str) -> Dict[int, int]:
+            if contract not in prices:
+                try:
+                    nef = self.get_contract_metadata(contract, fairy_session).nef
+                    prices[contract] = instruction_prices(NefFile.from_bytes(nef).script, exec_fee_factor) if nef else dict()
+                except (ValueError, KeyError, TypeError):
+                    prices[contract] = dict()
+            return prices[contract]
+
+        gas, previous_price, previous_line = 0, 0, None
+
+        def record(result: dict, stack_result: Any):
+            nonlocal gas, previous_price, previous_line
+            contract, instruction_pointer = str(result['scripthash']), int(result['instructionpointer'])
+            gas = int(result['gasconsumed']) if result.get('gasconsumed') is not None else gas + previous_price
+            previous_price = prices_of(contract).get(instruction_pointer, 0)
+            filename, line = result.get('sourcefilename'), result.get('sourcelinenum')
+            if not filename or not line:
+                if contract not in indexes:
+                    indexes[contract] = self.get_debug_info_index(contract)
+                if indexes[contract] and (source_line := indexes[contract].source_line_at(instruction_pointer)):
+                    filename, line, _ = source_line
+            if only_source_line_changes:
+                if not filename or (contract, filename, line) == previous_line:
+                    return
+                previous_line = (contract, filename, line)
+            stack_depth = len(stack_result['stack']) if type(stack_result) is dict and 'stack' in stack_result else None
+            trace.append(contract, instruction_pointer, filename, line, stack_depth, gas)
+
+        current = {'scripthash': rpc_breakpoint.scripthash, 'instructionpointer': rpc_breakpoint.instruction_pointer,
+                   'sourcefilename': rpc_breakpoint.source_filename, 'sourcelinenum': rpc_breakpoint.source_line_num}
+        calls_per_step = 2 if record_stack_depth else 1
+        steps = 0
+        first_batch = True
+        while True:
+            calls = [('getevaluationstack', [fairy_session, 0])] if record_stack_depth and first_batch else []
+            batch_steps = step_batch_size if max_steps is None else min(step_batch_size, max_steps - steps)
+            for _ in range(batch_steps):
+                calls.append(('debugstepinto', [fairy_session]))
+                if record_stack_depth:
+                    calls.append(('getevaluationstack', [fairy_session, 0]))
+            results = self.meta_rpc_batch(calls, raise_on_error=False)
+            position = 0
+            if first_batch:
+                record(current, results[0] if record_stack_depth else None)
+                position = 1 if record_stack_depth else 0
+                first_batch = False
+            for _ in range(batch_steps):
+                result = results[position]
+                if isinstance(result, ValueError):
+                    raise result
+                steps += 1
+                if result['state'].upper() != 'BREAK':
+                    trace.final_state, trace.exception = result['state'], result.get('exception')
+                    trace.final_gas = int(result['gasconsumed']) if result.get('gasconsumed') is not None else gas + previous_price
+                    return trace
+                record(result, results[position + 1] if record_stack_depth else None)
+                position += calls_per_step
+            if max_steps is not None and steps >= max_steps:
+                trace.final_state, trace.final_gas = 'BREAK', gas  # the instruction at the break is not executed
+                return trace
+
     def get_contract_opcode_coverage(self, scripthash: UInt160 = None) -> Dict[int, bool]:
         scripthash = scripthash or self.contract_scripthash
         result: Dict[str, bool] = self.meta_rpc_method_with_raw_result("getcontractopcodecoverage", [scripthash])['result']
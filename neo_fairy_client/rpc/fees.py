@@ -0,0 +1,212 @@
+"""
+Local estimation of network fees, learned from a few calculatenetworkfee results.
+
+    estimator = NetworkFeeEstimator(client)
+    fees = estimator.estimate_many(transactions)  # one batch for all signer sets not seen before
+    fee = estimator.estimate(transaction)  # no RPC once the signer set is known
+
+The network fee of a transaction is its size times FeePerByte of the policy contract,
+plus the cost of verifying the witness of each signer, which depends only on the signers
+(and on fee-bearing attributes such as NotaryAssisted). So the witness cost of a signer set
+is learned once from calculatenetworkfee, and fees are computed locally from the size of later
+transactions. Each signer set is checked again with calculatenetworkfee after `revalidate_every`
+estimates or `max_age` seconds, and the policy is read again when a check disagrees.
+"""
+from typing import Dict, List, Tuple, Union
+import threading
+import time
+from neo_fairy_client.utils import PolicyAddress
+from neo_fairy_client.utils.binary import var_int_size
+from neo_fairy_client.utils.transaction import Transaction
+
+SignerSetKey = Tuple[Tuple[str, ...], Tuple[Tuple[str, int], ...]]
+
+
+class SignerSetFee:
+    __slots__ = ('witness_fee', 'fee_per_byte', 'samples', 'estimates', 'learned_at')
+
+    def __init__(self, witness_fee: Union[int, None], fee_per_byte: Union[int, None], samples: List[Tuple[int, int]]):
+        self.witness_fee = witness_fee  # network fee minus FeePerByte * unsigned size, in datoshi
+        self.fee_per_byte = fee_per_byte  # the FeePerByte under which witness_fee was learned; None if not known yet
+        self.samples = samples  # [(unsigned size, network fee)] from calculatenetworkfee
+        self.estimates = 0  # local estimates since the last calculatenetworkfee
+        self.learned_at = time.monotonic()
+
+    def __repr__(self):
+        return f'SignerSetFee witness_fee={self.witness_fee} fee_per_byte={self.fee_per_byte} samples={len(self.samples)}'
+
+
+class NetworkFeeEstimator:
+    def __init__(self, client, revalidate_every: int = 1000, max_age: float = 600, read_policy: bool = True):
+        """
+        :param client: FairyClient to a node of the chain where the transactions are relayed
+        :param revalidate_every: local estimates of a signer set before checking it again with calculatenetworkfee
+        :param max_age: seconds before a signer set is checked again with calculatenetworkfee
+        :param read_policy: read FeePerByte and ExecFeeFactor from the policy contract.
+            Otherwise, or if the policy cannot be read, FeePerByte is learned from two transactions of different sizes
+            with the same signer set; until then, every estimate calls calculatenetworkfee
+        """
+        self.client = client
+        self.revalidate_every = revalidate_every
+        self.max_age = max_age
+        self.read_policy = read_policy
+        self.fee_per_byte: Union[int, None] = None
+        self.exec_fee_factor: Union[int, None] = None
+        self.signer_sets: Dict[SignerSetKey, SignerSetFee] = dict()
+        self.rpc_estimates = 0  # network fees from calculatenetworkfee
+        self.local_estimates = 0
+        self.mismatches = 0  # revalidations that disagreed with the learned fee
+        self._policy_read = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def signer_set_key(tx: Transaction) -> SignerSetKey:
+        """
+        :return: what the witness cost of a transaction depends on: its signer accounts, and its fee-bearing attributes
+        """
+        attributes = tuple(sorted((a['type'], a.get('nkeys', 0)) for a in tx.attributes if a['type'] == 'NotaryAssisted'))
+        return tuple(str(signer.account) for signer in tx.signers), attributes
+
+    @staticmethod
+    def unsigned_size(tx: Transaction) -> int:
+        """
+        :return: the size counted by calculatenetworkfee before adding witnesses: the unsigned transaction and the witness count
+        """
+        return len(tx.unsigned_bytes()) + var_int_size(len(tx.signers))
+
+    def policy_calls(self) -> List[Tuple[str, List]]:
+        return [('invokefunction', [str(PolicyAddress), 'getFeePerByte', [], []]),
+                ('invokefunction', [str(PolicyAddress), 'getExecFeeFactor', [], []])]
+
+    def _apply_policy(self, fee_per_byte_result, exec_fee_factor_result):
+        self._policy_read = True
+        try:
+            fee_per_byte = int(fee_per_byte_result['stack'][0]['value'])
+            exec_fee_factor = int(exec_fee_factor_result['stack'][0]['value'])
+        except (TypeError, KeyError, IndexError, ValueError) as e:
+            print(f'WARNING: NetworkFeeEstimator failed to read the policy: {fee_per_byte_result} {exec_fee_factor_result} {e}')
+            return
+        if (fee_per_byte, exec_fee_factor) != (self.fee_per_byte, self.exec_fee_factor):
+            # witness fees include the cost of witness bytes and of verification, both priced by the policy
+            self.signer_sets.clear()
+        self.fee_per_byte, self.exec_fee_factor = fee_per_byte, exec_fee_factor
+
+    def refresh_policy(self):
+        """
+        Read FeePerByte and ExecFeeFactor again. Learned signer sets are forgotten if they changed
+        """
+        results = self.client.meta_rpc_batch(self.policy_calls(), raise_on_error=False)
+        with self._lock:
+            self._apply_policy(*results)
+
+    def invalidate(self):
+        """
+        Forget the policy and all learned signer sets
+        """
+        with self._lock:
+            self.signer_sets.clear()
+            self.fee_per_byte, self.exec_fee_factor, self._policy_read = None, None, False
+
+    def learn(self, tx: Union[Transaction, str, bytes], network_fee: int):
+        """
+        Record the network fee of a transaction computed by the node, e.g. by calculatenetworkfee
+        """
+        tx = self._parse(tx)
+        with self._lock:
+            self._learn(self.signer_set_key(tx), self.unsigned_size(tx), int(network_fee))
+
+    def _learn(self, key: SignerSetKey, size: int, network_fee: int):
+        self.rpc_estimates += 1
+        learned = self.signer_sets.get(key)
+        fee_per_byte = self.fee_per_byte
+        if learned is not None and learned.fee_per_byte is not None \
+                and learned.witness_fee + learned.fee_per_byte * size != network_fee:
+            # the policy may have changed: read it again with the next batch, and learn this signer set again
+            self.mismatches += 1
+            self._policy_read, fee_per_byte, learned = False, None, None
+        samples = ([s for s in learned.samples if s[0] != size] if learned else []) + [(size, network_fee)]
+        samples = samples[-2:]
+        if fee_per_byte is None and len(samples) >= 2:
+            (size_0, fee_0), (size_1, fee_1) = samples
+            fee_per_byte = (fee_1 - fee_0) // (size_1 - size_0)
+        witness_fee = network_fee - fee_per_byte * size if fee_per_byte is not None else None
+        self.signer_sets[key] = SignerSetFee(witness_fee, fee_per_byte, samples)
+
+    def _local_estimate(self, key: SignerSetKey, size: int, revalidate: bool = True) -> Union[int, None]:
+        """
+        :return: None if calculatenetworkfee is needed
+        """
+        learned = self.signer_sets.get(key)
+        if learned is None:
+            return None
+        if learned.fee_per_byte is None:
+            return next((fee for sample_size, fee in learned.samples if sample_size == size), None)
+        if revalidate and (learned.estimates >= self.revalidate_every or time.monotonic() - learned.learned_at >= self.max_age):
+            return None
+        learned.estimates += 1
+        self.local_estimates += 1
+        return learned.witness_fee + learned.fee_per_byte * size
+
+    @staticmethod
+    def _parse(tx: Union[Transaction, str, bytes]) -> Transaction:
+        if isinstance(tx, Transaction):
+            return tx
+        if type(tx) is str:
+            return Transaction.from_base64(tx)
+        return Transaction.from_bytes(tx)
+
+    def estimate(self, tx: Union[Transaction, str, bytes]) -> int:
+        """
+        :param tx: Transaction, base64 encoded or serialized transaction, with or without witnesses
+        :return: network fee in datoshi
+        """
+        return self.estimate_many([tx])[0]
+
+    def estimate_many(self, transactions: List[Union[Transaction, str, bytes]]) -> List[int]:
+        """
+        Estimate locally the transactions whose signer sets are known, and send calculatenetworkfee for one
+        transaction of each other signer set (and the policy calls, if not read yet) in a single batch
+        :return: network fees in datoshi, in the order of transactions
+        """
+        transactions = [self._parse(tx) for tx in transactions]
+        keys = [self.signer_set_key(tx) for tx in transactions]
+        sizes = [self.unsigned_size(tx) for tx in transactions]
+        fees: List[Union[int, None]] = [None] * len(transactions)
+        with self._lock:
+            for i, (key, size) in enumerate(zip(keys, sizes)):
+                fees[i] = self._local_estimate(key, size)
+            need_policy = self.read_policy and not self._policy_read
+        # one transaction of each signer set to learn; of each size, for signer sets while FeePerByte is unknown
+        unknown: Dict[Tuple[SignerSetKey, Union[int, None]], int] = dict()  # {(signer set, size): index of the transaction}
+        for i, fee in enumerate(fees):
+            if fee is None:
+                learned = self.signer_sets.get(keys[i])
+                fee_per_byte_known = need_policy or self.fee_per_byte is not None \
+                    or (learned is not None and learned.fee_per_byte is not None)
+                unknown.setdefault((keys[i], None if fee_per_byte_known else sizes[i]), i)
+        if not unknown:
+            return fees
+        calls = self.policy_calls() if need_policy else []
+        calls += [('calculatenetworkfee', [transactions[i].to_base64()]) for i in unknown.values()]
+        results = self.client.meta_rpc_batch(calls, raise_on_error=False)
+        with self._lock:
+            if need_policy:
+                self._apply_policy(*results[:2])
+                results = results[2:]
+            for i, result in zip(unknown.values(), results):
+                if isinstance(result, Exception):
+                    raise result
+                fees[i] = int(result['networkfee'])
+                self._learn(keys[i], sizes[i], fees[i])
+            for i, fee in enumerate(fees):
+                if fee is None:
+                    fees[i] = self._local_estimate(keys[i], sizes[i], revalidate=False)
+        missing = [i for i, fee in enumerate(fees) if fee is None]
+        if missing:  # the policy could not be read: send the other sizes of these signer sets
+            for i, fee in zip(missing, self.estimate_many([transactions[i] for i in missing])):
+                fees[i] = fee
+        return fees
+
+    def __repr__(self):
+        return f'NetworkFeeEstimator fee_per_byte={self.fee_per_byte} exec_fee_factor={self.exec_fee_factor} ' \
+               f'{len(self.signer_sets)} signer sets, {self.local_estimates} local / {self.rpc_estimates} rpc estimates'
@@ -0,0 +1,125 @@
+"""
+Classification of the RPC method names used by FairyClient.
+Method names are the lowercase names sent in the "method" field of JSON-RPC requests.
+"""
+
+# methods whose first parameter is the fairy session string (or a list of session strings)
+SESSIONED_METHODS = frozenset({
+    'invokefunctionwithsession', 'invokemanywithsession', 'invokescriptwithsession',
+    'oraclefinish', 'forcesignmessage', 'forcesigntransaction',
+    'newsnapshotsfromcurrentsystem', 'deletesnapshots', 'renamesnapshot', 'copysnapshot',
+    'setsnapshottimestamp', 'getsnapshottimestamp', 'setsnapshotrandom', 'getsnapshotrandom',
+    'setsnapshotcheckwitness', 'getsnapshotcheckwitness',
+    'setsessionfairywalletwithnep2', 'setsessionfairywalletwithwif',
+    'virtualdeploy', 'getcontract', 'listcontracts',
+    'getstoragewithsession', 'findstoragewithsession', 'putstoragewithsession',
+    'setneobalance', 'setgasbalance', 'setnep17balance', 'getmanyunclaimedgas',
+    'debugfunctionwithsession', 'debugscriptwithsession', 'debugcontinue',
+    'debugstepinto', 'debugstepout', 'debugstepover', 'debugstepoversourcecode', 'debugstepoverassembly',
+    'getinvocationstack', 'getlocalvariables', 'getarguments', 'getstaticfields', 'getevaluationstack',
+    'getinstructionpointer', 'getvariablevaluebyname', 'getvariablenamesandvalues',
+    'deletedebugsnapshots',
+})
+
+
+def session_of_call(method: str, parameters: list):
+    """
+    :return: the fairy session string targeted by an RPC call, or None for calls without session
+    """
+    if method in SESSIONED_METHODS and parameters and type(parameters[0]) is str:
+        return parameters[0]
+    return None
+
+
+# methods reading a session without changing it, whose results can be cached until the session changes
+CACHEABLE_METHODS = frozenset({
+    'invokefunctionwithsession', 'invokescriptwithsession', 'invokemanywithsession',
+    'getcontract', 'listcontracts', 'getstoragewithsession', 'findstoragewithsession',
+})
+# methods whose session parameter decides whether the call writes the session
+RELAY_FLAG_METHODS = frozenset({
+    'invokefunctionwithsession', 'invokescriptwithsession', 'invokemanywithsession', 'oraclefinish',
+    'debugfunctionwithsession', 'debugscriptwithsession',
+})
+# methods starting a debug run of the session; a relayed run writes the session when it finishes
+DEBUG_RUN_METHODS = frozenset({'debugfunctionwithsession', 'debugscriptwithsession'})
+# methods resuming the debug run of the session, which may finish it
+DEBUG_RESUME_METHODS = frozenset({
+    'debugcontinue', 'debugstepinto', 'debugstepout', 'debugstepover', 'debugstepoversourcecode', 'debugstepoverassembly',
+})
+# methods changing the state of every session in their parameters
+STATE_CHANGING_METHODS = frozenset({
+    'newsnapshotsfromcurrentsystem', 'deletesnapshots', 'renamesnapshot', 'copysnapshot',
+    'setsnapshottimestamp', 'setsnapshotrandom', 'setsnapshotcheckwitness',
+    'setsessionfairywalletwithnep2', 'setsessionfairywalletwithwif',
+    'virtualdeploy', 'putstoragewithsession', 'setneobalance', 'setgasbalance', 'setnep17balance',
+})
+
+
+# methods replacing whole snapshots of the sessions in their parameters
+SNAPSHOT_LIFECYCLE_METHODS = frozenset({
+    'newsnapshotsfromcurrentsystem', 'deletesnapshots', 'renamesnapshot', 'copysnapshot',
+})
+
+
+def is_cacheable_call(method: str, parameters: list) -> bool:
+    """
+    :return: True if the call reads a fairy session without writing to it
+    """
+    if method not in CACHEABLE_METHODS or not parameters or type(parameters[0]) is not str:
+        return False
+    if method in RELAY_FLAG_METHODS:
+        return parameters[1] is False
+    if method in {'getstoragewithsession', 'findstoragewithsession'}:
+        return parameters[-1] is False  # reading the debug snapshot, which changes during debugging
+    return True
+
+
+def sessions_changed_by_call(method: str, parameters: list) -> list:
+    """
+    :return: fairy sessions whose state may be changed by the call
+    """
+    if method in RELAY_FLAG_METHODS:
+        return [parameters[0]] if len(parameters) > 1 and parameters[1] else []
+    if method not in STATE_CHANGING_METHODS:
+        return []
+    if method in SNAPSHOT_LIFECYCLE_METHODS:
+        return [p for p in parameters if type(p) is str]
+    return [parameters[0]] if parameters and type(parameters[0]) is str else []
+
+
+# methods reading or changing the breakpoints of the contract in their first parameter
+BREAKPOINT_METHODS = frozenset({
+    'setassemblybreakpoints', 'listassemblybreakpoints', 'deleteassemblybreakpoints',
+    'setsourcecodebreakpoints', 'listsourcecodebreakpoints', 'deletesourcecodebreakpoints',
+})
+
+
+# methods without session reading only the blockchain, which any synchronized node answers alike
+READ_ONLY_METHODS = frozenset({
+    'getblockcount', 'getbestblockhash', 'getblock', 'getblockhash', 'getblockheader', 'getblockheadercount',
+    'getmanyblocks', 'getrawtransaction', 'gettransactionheight', 'getapplicationlog',
+    'getcontractstate', 'getstorage', 'findstorage', 'getnativecontracts', 'getversion',
+    'invokefunction', 'invokescript', 'invokecontractverify', 'calculatenetworkfee', 'validateaddress',
+    'getnep17balances', 'getnep17transfers', 'getnep11balances', 'getnep11transfers', 'getnep11properties',
+    'getunclaimedgas', 'getcandidates', 'getcommittee', 'getnextblockvalidators', 'getstateroot', 'getproof',
+    'hellofairy',
+})
+# methods whose first parameter is an iterator session id, created on the node that returned the iterator
+ITERATOR_SESSION_METHODS = frozenset({'traverseiterator', 'terminatesession'})
+# methods of a session reading its state without changing it
+SESSION_READ_METHODS = frozenset({
+    'getcontract', 'listcontracts', 'getstoragewithsession', 'findstoragewithsession', 'getmanyunclaimedgas',
+    'getsnapshottimestamp', 'getsnapshotrandom', 'getsnapshotcheckwitness', 'listsnapshots',
+})
+
+
+def is_idempotent_call(method: str, parameters: list) -> bool:
+    """
+    :return: True if sending the call again cannot change anything, so that it can be retried or hedged
+    """
+    if method in READ_ONLY_METHODS or method in SESSION_READ_METHODS:
+        return True
+    if method in RELAY_FLAG_METHODS and method != 'oraclefinish' and method not in DEBUG_RUN_METHODS:
+        return len(parameters) > 1 and parameters[1] is False
+    return False
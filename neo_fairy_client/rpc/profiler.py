@@ -0,0 +1,192 @@
+"""
+Per source line and per method execution counts and gas, from execution traces.
+
+    profile = ExecutionProfile(client)
+    profile.record('registerRental', [...])
+    profile.record('borrow', [...])  # accumulate as many invocations as a test run makes
+    print(profile.format_hot_spots(20))
+    print(profile.annotate_source('NFTLoan.cs'))
+
+The gas of each step is the difference between the gas consumed before the next step and before the step,
+attributed to the source line and the method of the step. The last step of a trace is charged up to the final gas
+of the trace, or the fixed price of its instruction when the trace does not know its final gas.
+"""
+from typing import Dict, List, Tuple, Union
+import ntpath
+import os
+from neo_fairy_client.utils import Hash160Str
+from neo_fairy_client.utils.debug_info import DebugInfoIndex
+from neo_fairy_client.utils.nef import NefFile
+from neo_fairy_client.utils.opcodes import DEFAULT_EXEC_FEE_FACTOR, instruction_prices
+from neo_fairy_client.rpc.trace import ExecutionTrace
+
+
+class ProfileEntry:
+    __slots__ = ('contract', 'location', 'entries', 'instructions', 'gas')
+
+    def __init__(self, contract: str, location: Union[Tuple[str, int], str]):
+        """
+        :param location: (document, line) of a source line, or name of a method
+        """
+        self.contract = contract
+        self.location = location
+        self.entries = 0  # times execution came into the line or method
+        self.instructions = 0  # steps executed in the line or method
+        self.gas = 0
+
+    def __repr__(self):
+        return f'{self.location} entries={self.entries} instructions={self.instructions} gas={self.gas}'
+
+
+class ExecutionProfile:
+    def __init__(self, client=None, exec_fee_factor: int = DEFAULT_EXEC_FEE_FACTOR):
+        """
+        :param client: FairyClient, for recording traces, for the local debug info index of contracts
+            and for the prices of instructions ending traces without final gas
+        """
+        self.client = client
+        self.exec_fee_factor = exec_fee_factor
+        self.lines: Dict[Tuple[str, str, int], ProfileEntry] = dict()  # {(contract, document, line): entry}
+        self.methods: Dict[Tuple[str, str], ProfileEntry] = dict()  # {(contract, method): entry}
+        self.total_gas = 0
+        self.total_instructions = 0
+        self.traces = 0
+        self._indexes: Dict[str, Union[DebugInfoIndex, None]] = dict()
+        self._prices: Dict[str, Dict[int, int]] = dict()  # {contract: {instruction pointer: price}}
+
+    def index_of(self, contract: str) -> Union[DebugInfoIndex, None]:
+        if contract not in self._indexes:
+            self._indexes[contract] = self.client.get_debug_info_index(Hash160Str(contract)) if self.client else None
+        return self._indexes[contract]
+
+    def price_of(self, contract: str, instruction_pointer: int) -> int:
+        """
+        :return: fixed price of the instruction in the NEF of the contract; 0 if the NEF cannot be fetched
+        """
+        if contract not in self._prices:
+            try:
+                nef = self.client.get_contract_metadata(Hash160Str(contract)).nef if self.client else None
+                self._prices[contract] = instruction_prices(NefFile.from_bytes(nef).script, self.exec_fee_factor) if nef else dict()
+            except (ValueError, KeyError, TypeError):
+                self._prices[contract] = dict()
+        return self._prices[contract].get(instruction_pointer, 0)
+
+    def record(self, operation: str, params: List = None, **kwargs) -> ExecutionTrace:
+        """
+        Record the trace of an invocation with client.record_trace, and add it to the profile
+        :param kwargs: of client.record_trace
+        """
+        kwargs.setdefault('record_stack_depth', False)
+        trace = self.client.record_trace(operation, params, **kwargs)
+        self.add_trace(trace)
+        return trace
+
+    def add_trace(self, trace: ExecutionTrace):
+        self.traces += 1
+        count = len(trace)
+        gas = trace.gas
+        previous_line, previous_method = None, None
+        method_names: Dict[Tuple[int, int], str] = dict()  # {(contract index, instruction pointer): method}
+        for i in range(count):
+            contract_index, instruction_pointer = trace.contract_indexes[i], trace.instruction_pointers[i]
+            contract = trace.contracts[contract_index]
+            if i + 1 < count:
+                step_gas = gas[i + 1] - gas[i]
+            elif trace.final_gas is not None:
+                step_gas = trace.final_gas - gas[i]
+            else:
+                step_gas = self.price_of(contract, instruction_pointer)
+            self.total_gas += step_gas
+            self.total_instructions += 1
+
+            document_index = trace.document_indexes[i]
+            if document_index >= 0:
+                key = (contract, trace.documents[document_index], trace.source_lines[i])
+                entry = self.lines.get(key)
+                if entry is None:
+                    entry = self.lines[key] = ProfileEntry(contract, key[1:])
+                if key != previous_line:
+                    entry.entries += 1
+                entry.instructions += 1
+                entry.gas += step_gas
+                previous_line = key
+
+            method = method_names.get((contract_index, instruction_pointer))
+            if method is None:
+                debug_method = index.method_at(instruction_pointer) if (index := self.index_of(contract)) else None
+                method = method_names[(contract_index, instruction_pointer)] = \
+                    f'{debug_method.namespace}.{debug_method.name}' if debug_method else '(unknown)'
+            key = (contract, method)
+            entry = self.methods.get(key)
+            if entry is None:
+                entry = self.methods[key] = ProfileEntry(contract, method)
+            if key != previous_method:
+                entry.entries += 1
+            entry.instructions += 1
+            entry.gas += step_gas
+            previous_method = key
+
+    def hot_spots(self, n: int = None, by: str = 'gas', methods: bool = False) -> List[ProfileEntry]:
+        """
+        :param by: 'gas', 'instructions' or 'entries'
+        :param methods: rank methods instead of source lines
+        """
+        entries = sorted((self.methods if methods else self.lines).values(), key=lambda e: getattr(e, by), reverse=True)
+        return entries[:n] if n is not None else entries
+
+    def source_of_line(self, contract: str, document: str, line: int, sources: Dict[str, str] = None) -> str:
+        if sources and (text := sources.get(document) or sources.get(ntpath.basename(document))) is not None:
+            lines = text.splitlines()
+            return lines[line - 1].strip() if 0 < line <= len(lines) else ''
+        index = self.index_of(contract)
+        return (index.source_lines.get((ntpath.basename(document), line)) or '') if index else ''
+
+    def format_hot_spots(self, n: int = 20, by: str = 'gas', methods: bool = False, sources: Dict[str, str] = None) -> str:
+        """
+        :param sources: {document or its basename: source code}; default: source code in the dumpnef of the debug info
+        :return: a table sorted from the hottest line or method
+        """
+        rows = [f'{"gas":>12} {"%gas":>6} {"entries":>8} {"instr":>8}  location']
+        for e in self.hot_spots(n, by, methods):
+            share = 100 * e.gas / self.total_gas if self.total_gas else 0
+            if methods:
+                location = e.location
+            else:
+                document, line = e.location
+                location = f'{ntpath.basename(document)}:{line}  {self.source_of_line(e.contract, document, line, sources)}'
+            rows.append(f'{e.gas:>12} {share:>5.1f}% {e.entries:>8} {e.instructions:>8}  {location}')
+        return '\n'.join(rows)
+
+    def annotate_source(self, document: str, source: str = None, contract: Union[str, int, Hash160Str] = None) -> str:
+        """
+        :param document: path or basename of a source document in the debug info
+        :param source: the source code; default: read from the document path, or the lines in the dumpnef of the debug info
+        :param contract: only count lines of this contract
+        :return: each line of source code, prefixed by its entries and gas
+        """
+        contract = str(Hash160Str.from_str_or_int(contract)) if contract else None
+        basename = ntpath.basename(document)
+        counts: Dict[int, List[int]] = dict()  # {line: [entries, gas]}
+        matched: Dict[str, str] = dict()  # {document: contract}
+        for (c, d, line), e in self.lines.items():
+            if (contract is None or c == contract) and (d == document or ntpath.basename(d) == basename):
+                count = counts.setdefault(line, [0, 0])
+                count[0] += e.entries
+                count[1] += e.gas
+                matched[d] = c
+        if source is None:
+            path = next((p for p in list(matched) + [document] if os.path.isfile(p)), None)
+            if path is not None:
+                with open(path, encoding='utf-8', errors='replace') as f:
+                    source = f.read()
+        if source is not None:
+            source_lines = source.splitlines()
+        else:
+            d, c = next(iter(matched.items()), (document, contract))
+            source_lines = [self.source_of_line(c, d, line) if c else '' for line in range(1, max(counts, default=0) + 1)]
+        rows = []
+        for line, text in enumerate(source_lines, 1):
+            entries, gas = counts.get(line, (None, None))
+            prefix = f'{entries:>8} {gas:>12}' if entries is not None else f'{"":>8} {"":>12}'
+            rows.append(f'{prefix} {line:>5}  {text}')
+        return '\n'.join(rows)
@@ -0,0 +1,140 @@
+"""
+Record RPC traffic of FairyClient to a file, and replay it later without any neo-fairy-test node.
+Both RecordingSession and ReplaySession can be used as FairyClient(requests_session=...).
+Scripts opting in with FairyClient(requests_session=requests_session_from_environment())
+are recorded with environment variable FAIRY_RECORD=path, and replayed with FAIRY_REPLAY=path.
+"""
+from typing import Dict, List, Union
+import atexit
+import gzip
+import json
+import threading
+
+RECORD_FILE_VERSION = 1
+
+
+def normalize_request_body(post_data: Union[str, bytes], headers: Dict[str, str] = None) -> str:
+    """
+    Requests that only differ in JSON-RPC id, JSON formatting or compression are regarded as the same request
+    :param headers: of the request; bodies with Content-Encoding gzip (HttpCompression) are decompressed
+    """
+    if headers and headers.get('Content-Encoding') == 'gzip':
+        post_data = gzip.decompress(post_data)
+    body = json.loads(post_data)
+    if type(body) is list:
+        for request in body:
+            request.pop('id', None)
+    else:
+        body.pop('id', None)
+    return json.dumps(body, sort_keys=True, separators=(',', ':'))
+
+
+def load_records(path: str) -> Dict[str, List[str]]:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        content = json.load(f)
+    if content.get('version') != RECORD_FILE_VERSION:
+        raise ValueError(f'Unsupported record file version {content.get("version")} in {path}')
+    return content['records']
+
+
+def save_records(path: str, records: Dict[str, List[str]]):
+    with gzip.open(path, 'wt', encoding='utf-8', compresslevel=6) as f:
+        json.dump({'version': RECORD_FILE_VERSION, 'records': records}, f, separators=(',', ':'))
+
+
+class ReplayResponse:
+    """
+    The subset of requests.Response used by FairyClient
+    """
+    def __init__(self, text: str, status_code: int = 200):
+        self.text = text
+        self.status_code = status_code
+        self.headers = {'Content-Type': 'application/json'}
+
+    @property
+    def content(self) -> bytes:
+        return self.text.encode('utf-8')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class RecordingSession:
+    def __init__(self, path: str, requests_session=None):
+        """
+        Forwards requests to requests_session, and remembers responses keyed by normalized request bodies.
+        Repeated requests (e.g. getblockcount) remember all their responses in order.
+        Call save() or use `with RecordingSession(...) as session:` to write the record file.
+        :param path: where to save the gzip-compressed records
+        :param requests_session: requests.Session or anything with the same `post` method
+        """
+        if requests_session is None:
+            import requests
+            requests_session = requests.Session()
+        self.path = path
+        self.requests_session = requests_session
+        self.records: Dict[str, List[str]] = dict()
+        self._lock = threading.Lock()
+
+    def post(self, url, data=None, timeout=None, verify=True, **kwargs):
+        response = self.requests_session.post(url, data, timeout=timeout, verify=verify, **kwargs)
+        key = normalize_request_body(data, kwargs.get('headers'))
+        with self._lock:
+            self.records.setdefault(key, []).append(response.text)
+        return response
+
+    def save(self, path: str = None):
+        with self._lock:
+            save_records(path or self.path, self.records)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.save()
+
+
+class ReplaySession:
+    def __init__(self, path_or_records: Union[str, Dict[str, List[str]]]):
+        """
+        Serves recorded responses from memory.
+        The n-th identical request gets the n-th recorded response; the last one is repeated when exhausted.
+        :param path_or_records: file written by RecordingSession, or RecordingSession.records
+        """
+        self.records: Dict[str, List[str]] = load_records(path_or_records) if type(path_or_records) is str else path_or_records
+        self.cursors: Dict[str, int] = dict()
+        self._lock = threading.Lock()
+
+    def post(self, url, data=None, timeout=None, verify=True, **kwargs) -> ReplayResponse:
+        key = normalize_request_body(data, kwargs.get('headers'))
+        responses = self.records.get(key)
+        if not responses:
+            raise ValueError(f'No recorded response for request {key}')
+        with self._lock:
+            cursor = self.cursors.get(key, 0)
+            self.cursors[key] = cursor + 1
+        return ReplayResponse(responses[min(cursor, len(responses) - 1)])
+
+    def rewind(self):
+        with self._lock:
+            self.cursors.clear()
+
+
+def requests_session_from_environment(requests_session=None):
+    """
+    Record or replay the traffic of a script according to environment variables:
+        FAIRY_REPLAY=path: a ReplaySession of the record file
+        FAIRY_RECORD=path: a RecordingSession forwarding to requests_session, saved to the file when the process exits
+    :param requests_session: returned when neither variable is set. Default: the shared session of FairyClient
+    """
+    import os
+    if os.environ.get('FAIRY_REPLAY'):
+        return ReplaySession(os.environ['FAIRY_REPLAY'])
+    if requests_session is None:
+        from neo_fairy_client.rpc.fairy_client import default_requests_session
+        requests_session = default_requests_session
+    if os.environ.get('FAIRY_RECORD'):
+        recorder = RecordingSession(os.environ['FAIRY_RECORD'], requests_session)
+        atexit.register(recorder.save)
+        return recorder
+    return requests_session
@@ -0,0 +1,196 @@
+"""
+Pipelined relay of many signed transactions, for load generation against private nets.
+
+    pipeline = RelayPipeline(client, window=32, rate=200)
+    transactions = pipeline.sign_many([script] * 1000, fairy_session='load')
+    report = pipeline.relay(transactions, confirm=True)
+    print(report)  # accepted, rejected, retries, tx/sec
+
+Up to `window` transactions are in flight at any time, submitted no faster than `rate` per second.
+Transactions rejected because the mempool is full are retried with exponential backoff;
+transactions already in the mempool or on chain count as accepted.
+"""
+from typing import Any, Dict, Iterable, List, Union
+from concurrent.futures import ThreadPoolExecutor
+import base64
+import random
+import threading
+import time
+from neo_fairy_client.utils import Hash256Str, Signer, to_list
+from neo_fairy_client.utils.transaction import Transaction, transaction_hash
+
+# texts in errors of sendrawtransaction, for neo-cli before and after 3.6
+RETRYABLE_RELAY_ERRORS = ('-502', 'MempoolCapReached', 'OutOfMemory', 'mempool is full')
+DUPLICATE_RELAY_ERRORS = ('-501', '-503', 'AlreadyExists', 'AlreadyInPool')
+
+
+def classify_relay_error(error: Any) -> str:
+    """
+    :return: 'retry' for transient rejections, 'duplicate' for transactions already relayed, 'reject' otherwise
+    """
+    text = str(error)
+    if any(s in text for s in DUPLICATE_RELAY_ERRORS):
+        return 'duplicate'
+    if any(s in text for s in RETRYABLE_RELAY_ERRORS):
+        return 'retry'
+    return 'reject'
+
+
+class RelayResult:
+    def __init__(self, index: int, tx: str):
+        """
+        :param index: position of the transaction in the input of RelayPipeline.relay
+        :param tx: base64 encoded signed transaction
+        """
+        self.index = index
+        self.tx = tx
+        try:
+            self.tx_hash: Union[Hash256Str, None] = transaction_hash(tx)
+        except ValueError:
+            self.tx_hash = None  # not a valid transaction; the hash returned by the node is used if it is accepted
+        self.status = 'pending'  # accepted, duplicate, rejected
+        self.error: Union[str, None] = None
+        self.attempts = 0
+        self.submitted_at: Union[float, None] = None  # time.perf_counter() of the first submission
+        self.accepted_at: Union[float, None] = None
+        self.application_log: Union[dict, None] = None  # with RelayPipeline.relay(confirm=True)
+
+    @property
+    def accepted(self) -> bool:
+        return self.status in {'accepted', 'duplicate'}
+
+    def __repr__(self):
+        return f'RelayResult {self.index} {self.status} {self.tx_hash or ""} attempts={self.attempts}{" " + self.error if self.error else ""}'
+
+
+class RelayReport:
+    def __init__(self, results: List[RelayResult], started: float, finished: float, confirmed_at: float = None):
+        self.results = results
+        self.duration = finished - started
+        self.accepted = sum(1 for r in results if r.accepted)
+        self.rejected = sum(1 for r in results if r.status == 'rejected')
+        self.retries = sum(max(0, r.attempts - 1) for r in results)
+        self.tx_per_second = self.accepted / self.duration if self.duration > 0 else 0.0
+        self.confirmed = sum(1 for r in results if r.application_log is not None)
+        self.confirmation_duration = confirmed_at - started if confirmed_at is not None else None
+
+    def __repr__(self):
+        confirmed = f', {self.confirmed} confirmed in {self.confirmation_duration:.2f}s' if self.confirmation_duration is not None else ''
+        return f'RelayReport {self.accepted}/{len(self.results)} accepted, {self.rejected} rejected, {self.retries} retries, ' \
+               f'{self.tx_per_second:.1f} tx/s in {self.duration:.2f}s{confirmed}'
+
+
+class RelayPipeline:
+    def __init__(self, client, window: int = 16, rate: float = None, max_attempts: int = 6,
+                 backoff: float = 0.1, max_backoff: float = 5.0):
+        """
+        :param client: FairyClient to the node relaying the transactions.
+            Its requests_session should allow `window` connections (requests.adapters.HTTPAdapter(pool_maxsize=window))
+        :param window: maximum transactions in flight
+        :param rate: maximum submissions per second, including retries. None for no limit
+        :param max_attempts: submissions of a transaction before it is reported as rejected
+        :param backoff: seconds before the first retry, doubled for each retry with jitter, up to max_backoff
+        """
+        if window <= 0:
+            raise ValueError(f'Expected window > 0. Got {window}')
+        self.client = client
+        self.window = window
+        self.rate = rate
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._next_submission = 0.0
+        self._rate_lock = threading.Lock()
+
+    def sign_many(self, scripts: Iterable[Union[str, bytes]], signers: Union[Signer, List[Signer]] = None,
+                  system_fee: int = 1000_0000, network_fee: Union[int, None] = 0, valid_until_block: Union[int, None] = None,
+                  fairy_session: str = None, batch_size: int = 256) -> List[str]:
+        """
+        Build and sign transactions with the fairy wallet of the session, batch_size of them per request.
+        See FairyClient.force_sign_transaction
+        :param scripts: base64 encoded scripts, e.g. result['script'] of invocations with relay=False
+        :param network_fee: None to estimate the fee of each transaction with client.estimate_network_fee
+        :param valid_until_block: None for 5760 blocks after the current block count
+        :return: base64 encoded signed transactions, in the order of scripts
+        """
+        fairy_session = fairy_session or self.client.fairy_session
+        signers = to_list(signers or self.client.signers)
+        if valid_until_block is None:
+            valid_until_block = self.client.get_block_count() + 5760
+        scripts = [script.decode() if type(script) is bytes else script for script in scripts]
+        nonces = [random.randint(1, 2**32 - 1) for _ in scripts]
+        if network_fee is None:
+            network_fees = self.client.estimate_network_fee([
+                Transaction(base64.b64decode(script), signers, system_fee, 0, valid_until_block, nonce)
+                for script, nonce in zip(scripts, nonces)])
+        else:
+            network_fees = [network_fee] * len(scripts)
+        signer_dicts = [signer.to_dict() for signer in signers]
+        calls = [('forcesigntransaction', [fairy_session, script, signer_dicts, system_fee, fee, valid_until_block, nonce])
+                 for script, fee, nonce in zip(scripts, network_fees, nonces)]
+        transactions = []
+        for start in range(0, len(calls), batch_size):
+            transactions += [result['tx'] for result in self.client.meta_rpc_batch(calls[start:start + batch_size])]
+        return transactions
+
+    def _wait_for_rate(self):
+        if not self.rate:
+            return
+        with self._rate_lock:
+            now = time.perf_counter()
+            submission = max(now, self._next_submission)
+            self._next_submission = submission + 1 / self.rate
+        if submission > now:
+            time.sleep(submission - now)
+
+    def _relay_one(self, result: RelayResult) -> RelayResult:
+        delay = self.backoff
+        while result.attempts < self.max_attempts:
+            self._wait_for_rate()
+            result.attempts += 1
+            if result.submitted_at is None:
+                result.submitted_at = time.perf_counter()
+            try:
+                response = self.client.meta_rpc_batch([('sendrawtransaction', [result.tx])], raise_on_error=False)[0]
+                kind = classify_relay_error(response) if isinstance(response, ValueError) else 'accepted'
+            except Exception as e:  # transport errors are transient for a relay
+                response, kind = e, 'retry'
+            if kind == 'accepted':
+                result.status, result.error, result.accepted_at = 'accepted', None, time.perf_counter()
+                if result.tx_hash is None and type(response) is dict and response.get('hash'):
+                    result.tx_hash = Hash256Str(response['hash'])
+                return result
+            if kind == 'duplicate':
+                result.status, result.error, result.accepted_at = 'duplicate', None, time.perf_counter()
+                return result
+            result.error = str(response)
+            if kind == 'reject':
+                break
+            time.sleep(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, self.max_backoff)
+        result.status = 'rejected'
+        return result
+
+    def relay(self, transactions: Iterable[str], confirm: bool = False, confirm_timeout: float = 120) -> RelayReport:
+        """
+        :param transactions: base64 encoded signed transactions
+        :param confirm: also wait for the accepted transactions to be in blocks, with client.track_transactions
+        :return: RelayReport with a RelayResult for each transaction, in the order of transactions
+        """
+        results = [RelayResult(i, tx) for i, tx in enumerate(transactions)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.window) as executor:
+            list(executor.map(self._relay_one, results))
+        finished = time.perf_counter()
+        confirmed_at = None
+        if confirm:
+            confirming = [r for r in results if r.accepted and r.tx_hash is not None]
+            hashes = [r.tx_hash for r in confirming]
+            futures: Dict[str, Any] = self.client.track_transactions(hashes, timeout=confirm_timeout) if hashes else dict()
+            for r in confirming:
+                try:
+                    r.application_log = futures[r.tx_hash.to_str()].result()
+                except TimeoutError as e:
+                    r.error = str(e)
+            confirmed_at = time.perf_counter()
+        return RelayReport(results, started, finished, confirmed_at)
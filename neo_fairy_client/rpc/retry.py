@@ -0,0 +1,133 @@
+"""
+Timeouts, retries and hedging of idempotent RPC calls.
+
+    client = FairyClient(target_url, wallet, retry_policy=RetryPolicy(timeout=5, max_attempts=3, hedge=True))
+
+Idempotent calls (see methods.is_idempotent_call: reading blocks and transactions, invocations with relay=False,
+reading storage) are sent with `timeout`, and sent again after transport errors with exponential backoff.
+With hedging, if a call has not been answered after the `hedge_quantile` of the latencies observed for its method,
+a duplicate is sent, to the next node of the endpoint pool if any, and the first answer is taken.
+Other calls are sent once, with the requests_timeout of the client.
+"""
+from typing import Callable, Deque, Dict, List, Tuple, Union
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import random
+import threading
+import time
+import requests
+from neo_fairy_client.rpc.methods import is_idempotent_call
+
+# function(replica, timeout) -> response text; replica 0 for the first request and 1 for the hedged duplicate
+PostFunction = Callable[[int, Union[float, Tuple[float, float], None]], str]
+
+
+class RetryPolicy:
+    def __init__(self, timeout: Union[float, Tuple[float, float], None] = 20, max_attempts: int = 3,
+                 backoff: float = 0.1, max_backoff: float = 2.0,
+                 hedge: bool = False, hedge_quantile: float = 0.95, hedge_min_samples: int = 20,
+                 min_hedge_delay: float = 0.005, latency_window: int = 200, hedge_workers: int = 8):
+        """
+        :param timeout: seconds for each attempt of an idempotent call, or (connect timeout, read timeout) as in requests
+        :param max_attempts: attempts of an idempotent call before its transport error is raised
+        :param backoff: seconds before the first retry, doubled for each retry with jitter, up to max_backoff
+        :param hedge: send a duplicate of idempotent calls answered later than usual
+        :param hedge_quantile: quantile of the observed latencies of a method after which the duplicate is sent
+        :param hedge_min_samples: observed latencies of a method before hedging it
+        :param latency_window: latest latencies kept for each method
+        """
+        if max_attempts < 1:
+            raise ValueError(f'Expected max_attempts >= 1. Got {max_attempts}')
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.min_hedge_delay = min_hedge_delay
+        self.latency_window = latency_window
+        self.latencies: Dict[str, Deque[float]] = dict()  # {method key: latest latencies of successful requests}
+        self.retries = 0
+        self.hedges = 0  # duplicates sent
+        self.hedges_won = 0  # duplicates answered before the original request
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix='RetryPolicy') if hedge else None
+
+    @staticmethod
+    def applies_to(calls: List[Tuple[str, List]]) -> bool:
+        return bool(calls) and all(is_idempotent_call(method, parameters) for method, parameters in calls)
+
+    @staticmethod
+    def method_key(calls: List[Tuple[str, List]]) -> str:
+        return calls[0][0] if len(calls) == 1 else 'batch:' + ','.join(sorted({method for method, _ in calls}))
+
+    def observe(self, key: str, latency: float):
+        with self._lock:
+            latencies = self.latencies.get(key)
+            if latencies is None:
+                latencies = self.latencies[key] = deque(maxlen=self.latency_window)
+            latencies.append(latency)
+
+    def hedge_delay(self, key: str) -> Union[float, None]:
+        """
+        :return: seconds to wait before sending a duplicate, or None if too few latencies are observed for the method
+        """
+        with self._lock:
+            latencies = sorted(self.latencies.get(key, ()))
+        if len(latencies) < self.hedge_min_samples:
+            return None
+        return max(self.min_hedge_delay, latencies[min(len(latencies) - 1, int(self.hedge_quantile * len(latencies)))])
+
+    def call(self, post: PostFunction, calls: List[Tuple[str, List]]) -> str:
+        """
+        :param post: sends the request body of the calls
+        :return: the response text
+        """
+        key = self.method_key(calls)
+        delay = self.backoff
+        for attempt in range(self.max_attempts):
+            started = time.perf_counter()
+            try:
+                hedge_delay = self.hedge_delay(key) if self.hedge else None
+                response_text = self._hedged(post, hedge_delay) if hedge_delay is not None else post(0, self.timeout)
+            except requests.RequestException:
+                if attempt + 1 >= self.max_attempts:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                time.sleep(delay * random.uniform(0.5, 1.0))
+                delay = min(delay * 2, self.max_backoff)
+                continue
+            self.observe(key, time.perf_counter() - started)
+            return response_text
+
+    def _hedged(self, post: PostFunction, hedge_delay: float) -> str:
+        original = self._executor.submit(post, 0, self.timeout)
+        done, _ = wait([original], timeout=hedge_delay)
+        if done:
+            return original.result()
+        duplicate = self._executor.submit(post, 1, self.timeout)
+        with self._lock:
+            self.hedges += 1
+        pending = {original, duplicate}
+        error: Union[BaseException, None] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                if future is duplicate:
+                    with self._lock:
+                        self.hedges_won += 1
+                return future.result()  # the other request is left to finish in the background
+        raise error
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def __repr__(self):
+        return f'RetryPolicy timeout={self.timeout} max_attempts={self.max_attempts} hedge={self.hedge} ' \
+               f'retries={self.retries} hedges={self.hedges} hedges_won={self.hedges_won}'
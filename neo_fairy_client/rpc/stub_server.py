@@ -0,0 +1,378 @@
+"""
+A lightweight in-process JSON-RPC server imitating the Fairy methods used by FairyClient.
+For load testing and benchmarking the client, and running tests without neo-fairy-test.
+It does not execute any contract. Invocations return canned or scripted results.
+
+    with FairyStubServer(latency=0.001) as server:
+        client = server.client(fairy_session='bench', ...)  # FairyClient(server.url, ..., with_print=False)
+        server.set_response('invokefunctionwithsession', lambda params: server.halt_result(7))
+        server.set_error('sendrawtransaction', 'AlreadyInPool', code=-503)
+"""
+from typing import Any, Callable, Dict, List, Tuple, Union
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from neo_fairy_client.utils.types import Hash160Str
+from neo_fairy_client.utils.nef import compute_contract_hash
+from neo_fairy_client.utils.transaction import transaction_hash
+
+JsonRpcHandler = Callable[[List[Any]], Any]
+DEFAULT_ACCOUNT = Hash160Str('0x' + '22' * 20)
+
+
+class StubRpcError(Exception):
+    def __init__(self, message: str, code: int = -100, data: str = None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.data = data
+
+    def to_dict(self) -> Dict[str, Any]:
+        error = {'code': self.code, 'message': self.message}
+        if self.data is not None:
+            error['data'] = self.data
+        return error
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True  # headers and body are written separately; avoid waiting for delayed ACKs
+    server: '_StubHTTPServer'
+
+    def do_POST(self):
+        stub = self.server.stub
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.headers.get('Content-Encoding') == 'gzip' and stub.accept_compressed_requests:
+            body = gzip.decompress(body)
+        response = stub.handle_body(body).encode()
+        gzipped = stub.compress_responses_above is not None and len(response) > stub.compress_responses_above \
+            and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if gzipped:
+            response = gzip.compress(response)
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            if gzipped:
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+        except (BrokenPipeError, ConnectionResetError):  # the client timed out or hedged, and is gone
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    stub: 'FairyStubServer'
+
+
+class FairyStubServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: Union[float, Callable[[str], float]] = 0.0,
+                 responses: Dict[str, Union[Any, JsonRpcHandler]] = None,
+                 block_count: int = 1000, compress_responses_above: Union[int, None] = None,
+                 accept_compressed_requests: bool = True):
+        """
+        :param port: 0 to pick any free port. Read the actual url from self.url
+        :param latency: seconds to sleep before answering each request,
+            or a function of the RPC method name returning the seconds
+        :param responses: {method: result}, or {method: function(params) -> result}, overriding built-in behaviors.
+            Raise StubRpcError in the function to return a JSON-RPC error
+        :param block_count: returned by getblockcount; getmanyblocks serves blocks below it
+        :param compress_responses_above: gzip responses larger than this many bytes to clients accepting gzip. None to never compress
+        :param accept_compressed_requests: decompress gzip request bodies; otherwise they fail with a JSON-RPC parse error
+        """
+        self.compress_responses_above = compress_responses_above
+        self.accept_compressed_requests = accept_compressed_requests
+        self.latency = latency
+        self.responses: Dict[str, Union[Any, JsonRpcHandler]] = dict(responses or {})
+        self.block_count = block_count
+        self.request_count = 0  # JSON-RPC calls, counting each call in a batch
+        self.body_count = 0  # HTTP requests
+        self.method_counts: Dict[str, int] = dict()
+        # {session: {contract: {base64 key: base64 value}}}
+        self.snapshots: Dict[str, Dict[str, Dict[str, str]]] = dict()
+        # {session: {contract: contract state}}
+        self.contracts: Dict[str, Dict[str, Dict[str, Any]]] = dict()
+        # {(session id, iterator id): [stack items]}
+        self.iterators: Dict[Tuple[str, str], List[Dict[str, Any]]] = dict()
+        self.debug_info: Dict[str, bool] = dict()
+        self._lock = threading.Lock()
+        self._httpd = _StubHTTPServer((host, port), _StubRequestHandler)
+        self._httpd.stub = self
+        self._thread: Union[threading.Thread, None] = None
+        self.handlers: Dict[str, JsonRpcHandler] = {
+            'hellofairy': lambda params: {'hello': 'fairy'},
+            'getblockcount': lambda params: self.block_count,
+            'getmanyblocks': self._get_many_blocks,
+            'newsnapshotsfromcurrentsystem': self._new_snapshots,
+            'deletesnapshots': self._delete_snapshots,
+            'listsnapshots': lambda params: list(self.snapshots),
+            'renamesnapshot': self._rename_snapshot,
+            'copysnapshot': self._copy_snapshot,
+            'setsnapshotcheckwitness': lambda params: {params[0]: params[1]},
+            'setsnapshottimestamp': lambda params: {params[0]: params[1]},
+            'setsnapshotrandom': lambda params: {params[0]: params[1]},
+            'setneobalance': lambda params: {params[0]: params[2]},
+            'setgasbalance': lambda params: {params[0]: params[2]},
+            'setnep17balance': lambda params: {params[0]: params[3]},
+            'putstoragewithsession': self._put_storage,
+            'getstoragewithsession': self._get_storage,
+            'findstoragewithsession': self._find_storage,
+            'invokefunction': lambda params: self.halt_result(0),
+            'invokescript': lambda params: self.halt_result(0),
+            'invokefunctionwithsession': lambda params: self.halt_result(0),
+            'invokescriptwithsession': lambda params: self.halt_result(0),
+            'invokemanywithsession': lambda params: self.halt_result(0),
+            'traverseiterator': self._traverse_iterator,
+            'virtualdeploy': self._virtual_deploy,
+            'getcontract': self._get_contract,
+            'listcontracts': lambda params: [{'hash': h, 'name': c['manifest']['name']} for h, c in self._session_contracts(params[0]).items()],
+            'setdebuginfo': self._set_debug_info,
+            'listdebuginfo': lambda params: [h for h, v in self.debug_info.items() if v],
+            'deletedebuginfo': self._delete_debug_info,
+            'sendrawtransaction': self._send_raw_transaction,
+        }
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'FairyStubServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='fairy-stub-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> 'FairyStubServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def set_response(self, method: str, result_or_handler: Union[Any, JsonRpcHandler]):
+        self.responses[method] = result_or_handler
+
+    def set_error(self, method: str, message: str, code: int = -100, data: str = None):
+        """
+        Answer every later call of the method with a JSON-RPC error
+        """
+        def handler(params: List[Any]):
+            raise StubRpcError(message, code=code, data=data)
+        self.responses[method] = handler
+
+    def client(self, wallet_address_or_scripthash: Union[str, int, Hash160Str] = DEFAULT_ACCOUNT, **kwargs):
+        """
+        :param kwargs: other parameters of FairyClient; with_print defaults to False
+        :return: a FairyClient of this server
+        """
+        from neo_fairy_client.rpc.fairy_client import FairyClient
+        kwargs.setdefault('with_print', False)
+        return FairyClient(self.url, wallet_address_or_scripthash, **kwargs)
+
+    @staticmethod
+    def halt_result(*stack: Union[int, bool, str, bytes, None, Dict[str, Any]], gas_consumed: int = 1_0000_0000) -> Dict[str, Any]:
+        """
+        Build an invocation result with the given stack items.
+        Python values are converted to stack items; dicts are used as stack items directly.
+        """
+        return {
+            'script': '', 'state': 'HALT', 'gasconsumed': str(gas_consumed), 'exception': None,
+            'notifications': [], 'stack': [FairyStubServer.stack_item(i) for i in stack],
+        }
+
+    @staticmethod
+    def fault_result(exception: str, gas_consumed: int = 1_0000_0000) -> Dict[str, Any]:
+        return {'script': '', 'state': 'FAULT', 'gasconsumed': str(gas_consumed), 'exception': exception,
+                'traceback': None, 'notifications': [], 'stack': []}
+
+    @staticmethod
+    def stack_item(value: Union[int, bool, str, bytes, list, tuple, dict, None]) -> Dict[str, Any]:
+        if type(value) is dict:
+            return value
+        if value is None:
+            return {'type': 'Any'}
+        if type(value) is bool:
+            return {'type': 'Boolean', 'value': value}
+        if type(value) is int:
+            return {'type': 'Integer', 'value': str(value)}
+        if type(value) is str:
+            value = value.encode()
+        if type(value) is bytes:
+            return {'type': 'ByteString', 'value': base64.b64encode(value).decode()}
+        if type(value) is list:
+            return {'type': 'Array', 'value': [FairyStubServer.stack_item(i) for i in value]}
+        if type(value) is tuple:
+            return {'type': 'Struct', 'value': [FairyStubServer.stack_item(i) for i in value]}
+        raise ValueError(f'Cannot convert {value} to stack item')
+
+    def handle_body(self, body: Union[bytes, str]) -> str:
+        with self._lock:
+            self.body_count += 1
+        try:
+            request = json.loads(body)
+        except ValueError as e:
+            return json.dumps({'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': f'Parse error: {e}'}})
+        if type(request) is list:
+            return json.dumps([self.handle_request(r) for r in request], separators=(',', ':'))
+        return json.dumps(self.handle_request(request), separators=(',', ':'))
+
+    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        method: str = request.get('method', '')
+        params: List[Any] = request.get('params', [])
+        with self._lock:
+            self.request_count += 1
+            self.method_counts[method] = self.method_counts.get(method, 0) + 1
+        latency = self.latency(method) if callable(self.latency) else self.latency
+        if latency:
+            time.sleep(latency)
+        response: Dict[str, Any] = {'jsonrpc': '2.0', 'id': request.get('id')}
+        try:
+            if method in self.responses:
+                result = self.responses[method]
+                response['result'] = result(params) if callable(result) else result
+            elif method in self.handlers:
+                response['result'] = self.handlers[method](params)
+            else:
+                raise StubRpcError('Method not found', code=-32601)
+        except StubRpcError as e:
+            response['error'] = e.to_dict()
+        except Exception as e:
+            response['error'] = {'code': -32603, 'message': f'{type(e).__name__}: {e}'}
+        return response
+
+    """built-in behaviors"""
+    def _get_many_blocks(self, params: List[Any]) -> List[Dict[str, Any]]:
+        if len(params) == 2 and all(type(p) is int for p in params):
+            indexes = range(params[0], params[1] + 1)
+        else:
+            indexes = [p for p in params if type(p) is int]
+        return [self.fake_block(i) for i in indexes if i < self.block_count]
+
+    @staticmethod
+    def fake_block(index: int) -> Dict[str, Any]:
+        return {
+            'hash': '0x' + hashlib.sha256(index.to_bytes(4, 'little')).hexdigest(),
+            'index': index, 'time': 1_600_000_000_000 + index * 15_000, 'version': 0, 'tx': [],
+        }
+
+    def _new_snapshots(self, params: List[str]) -> Dict[str, bool]:
+        with self._lock:
+            for session in params:
+                self.snapshots[session] = dict()
+                self.contracts[session] = dict()
+        return {session: True for session in params}
+
+    def _delete_snapshots(self, params: List[str]) -> Dict[str, bool]:
+        with self._lock:
+            return {session: self.snapshots.pop(session, None) is not None and self.contracts.pop(session, None) is not None
+                    for session in params}
+
+    def _rename_snapshot(self, params: List[str]) -> Dict[str, str]:
+        old_name, new_name = params
+        with self._lock:
+            self.snapshots[new_name] = self.snapshots.pop(old_name)
+            self.contracts[new_name] = self.contracts.pop(old_name, dict())
+        return {old_name: new_name}
+
+    def _copy_snapshot(self, params: List[str]) -> Dict[str, str]:
+        old_name, new_name = params
+        with self._lock:
+            self.snapshots[new_name] = {contract: dict(storage) for contract, storage in self.snapshots[old_name].items()}
+            self.contracts[new_name] = dict(self.contracts.get(old_name, dict()))
+        return {old_name: new_name}
+
+    def _session_storage(self, session: str, contract: str) -> Dict[str, str]:
+        return self.snapshots.setdefault(session, dict()).setdefault(contract, dict())
+
+    def _session_contracts(self, session: str) -> Dict[str, Dict[str, Any]]:
+        return self.contracts.setdefault(session, dict())
+
+    def _put_storage(self, params: List[Any]) -> Dict[str, str]:
+        session, contract, key, value = params[:4]
+        with self._lock:
+            storage = self._session_storage(session, contract)
+            if value == '':
+                storage.pop(key, None)
+            else:
+                storage[key] = value
+        return {key: value}
+
+    def _get_storage(self, params: List[Any]) -> Dict[str, str]:
+        session, contract, key = params[:3]
+        return {key: self._session_storage(session, contract).get(key, '')}
+
+    def _find_storage(self, params: List[Any]) -> Dict[str, str]:
+        session, contract, prefix = params[:3]
+        prefix = base64.b64decode(prefix)
+        return {k: v for k, v in self._session_storage(session, contract).items() if base64.b64decode(k).startswith(prefix)}
+
+    def _traverse_iterator(self, params: List[Any]) -> List[Dict[str, Any]]:
+        sid, iid, count = params
+        with self._lock:
+            items = self.iterators.get((sid, iid), [])
+            self.iterators[(sid, iid)] = items[count:]
+        return items[:count]
+
+    def _virtual_deploy(self, params: List[Any]) -> Dict[str, str]:
+        session, nef_base64, manifest = params[:3]
+        sender = params[4][0]['account'] if len(params) > 4 and params[4] else Hash160Str.zero()
+        contract_hash = str(compute_contract_hash(sender, base64.b64decode(nef_base64), manifest))
+        with self._lock:
+            contracts = self._session_contracts(session)
+            if contract_hash in contracts:
+                raise StubRpcError(f'Contract Already Exists: {contract_hash}', code=-500)
+            contracts[contract_hash] = {
+                'id': len(contracts) + 1, 'updatecounter': 0, 'hash': contract_hash,
+                'nefFile': nef_base64, 'manifest': json.loads(manifest),
+            }
+        return {session: contract_hash}
+
+    @staticmethod
+    def _send_raw_transaction(params: List[Any]) -> Dict[str, str]:
+        try:
+            return {'hash': transaction_hash(params[0]).to_str()}
+        except ValueError:  # not a transaction; hash whatever it is, for tests relaying fake payloads
+            return {'hash': '0x' + hashlib.sha256(base64.b64decode(params[0])).digest()[::-1].hex()}
+
+    def _get_contract(self, params: List[Any]) -> Dict[str, Any]:
+        session, contract_hash = params[:2]
+        contract = self._session_contracts(session).get(contract_hash)
+        if contract is None:
+            raise StubRpcError(f'Unknown contract {contract_hash}', code=-100)
+        return contract
+
+    def _set_debug_info(self, params: List[Any]) -> Dict[str, bool]:
+        self.debug_info[params[0]] = True
+        return {params[0]: True}
+
+    def _delete_debug_info(self, params: List[Any]) -> Dict[str, bool]:
+        return {h: self.debug_info.pop(h, None) is not None for h in params}
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Serve the Fairy stub in the foreground, e.g. for benchmarking from another process')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=16868)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    args = parser.parse_args()
+    stub = FairyStubServer(args.host, args.port, latency=args.latency_ms / 1000)
+    print(f'Fairy stub server at {stub.url}')
+    try:
+        stub._httpd.serve_forever()
+    except KeyboardInterrupt:
+        stub._httpd.server_close()
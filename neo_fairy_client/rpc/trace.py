@@ -0,0 +1,152 @@
+"""
+Columnar execution traces recorded with FairyClient.record_trace.
+
+    trace = client.record_trace('registerRental', [...])
+    trace.save('registerRental.trace.json.gz')
+    for tag, i1, i2, j1, j2 in ExecutionTrace.load('old.trace.json.gz').diff(trace):
+        ...
+
+Each column is an array of machine integers; contracts and source documents are stored once in tables
+and referred to by index, so that a trace of millions of steps stays small in memory and on disk.
+"""
+from typing import Dict, List, NamedTuple, Tuple, Union
+from array import array
+import difflib
+import gzip
+import json
+import ntpath
+
+
+class TraceRow(NamedTuple):
+    contract: str
+    instruction_pointer: int
+    source_filename: Union[str, None]
+    source_line: Union[int, None]
+    stack_depth: Union[int, None]
+    gas: int
+
+
+class ExecutionTrace:
+    COLUMNS = ('contract_indexes', 'instruction_pointers', 'document_indexes', 'source_lines', 'stack_depths', 'gas')
+
+    def __init__(self, operation: str = None, final_state: str = None, exception: str = None, final_gas: int = None):
+        """
+        :param final_state: HALT or FAULT after recording; BREAK if recording stopped before the end of execution
+        :param final_gas: gas consumed after the last step, in datoshi; None if unknown
+        """
+        self.operation = operation
+        self.final_state = final_state
+        self.exception = exception
+        self.final_gas = final_gas
+        self.contracts: List[str] = []
+        self.documents: List[str] = []
+        self._contract_index: Dict[str, int] = dict()
+        self._document_index: Dict[str, int] = dict()
+        self.contract_indexes = array('H')
+        self.instruction_pointers = array('I')
+        self.document_indexes = array('h')  # -1 for instructions without source code
+        self.source_lines = array('i')  # 0 for instructions without source code
+        self.stack_depths = array('i')  # -1 if not recorded
+        self.gas = array('q')  # gas consumed before the instruction, in datoshi
+
+    def append(self, contract: str, instruction_pointer: int, source_filename: Union[str, None] = None,
+               source_line: Union[int, None] = None, stack_depth: Union[int, None] = None, gas: int = 0):
+        contract_index = self._contract_index.get(contract)
+        if contract_index is None:
+            contract_index = self._contract_index[contract] = len(self.contracts)
+            self.contracts.append(contract)
+        if source_filename:
+            document_index = self._document_index.get(source_filename)
+            if document_index is None:
+                document_index = self._document_index[source_filename] = len(self.documents)
+                self.documents.append(source_filename)
+        else:
+            document_index = -1
+        self.contract_indexes.append(contract_index)
+        self.instruction_pointers.append(instruction_pointer)
+        self.document_indexes.append(document_index)
+        self.source_lines.append(source_line or 0)
+        self.stack_depths.append(-1 if stack_depth is None else stack_depth)
+        self.gas.append(gas)
+
+    def __len__(self):
+        return len(self.instruction_pointers)
+
+    def __getitem__(self, i: int) -> TraceRow:
+        document_index, stack_depth = self.document_indexes[i], self.stack_depths[i]
+        return TraceRow(self.contracts[self.contract_indexes[i]], self.instruction_pointers[i],
+                        self.documents[document_index] if document_index >= 0 else None,
+                        self.source_lines[i] or None, stack_depth if stack_depth >= 0 else None, self.gas[i])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __repr__(self):
+        return f'ExecutionTrace {self.operation} {len(self)} steps {self.final_state}'
+
+    def source_line_keys(self) -> List[Tuple[str, str, int]]:
+        """
+        :return: [(contract, basename of document, line)] of each step, None for steps without source code.
+            Basenames make traces of builds in different directories comparable
+        """
+        contracts = self.contracts
+        basenames = [ntpath.basename(d) for d in self.documents]
+        return [(contracts[c], basenames[d], line) if d >= 0 else None
+                for c, d, line in zip(self.contract_indexes, self.document_indexes, self.source_lines)]
+
+    def source_line_changes(self) -> 'ExecutionTrace':
+        """
+        :return: a trace with only the steps where the contract or source line changes
+        """
+        trace = ExecutionTrace(self.operation, self.final_state, self.exception, self.final_gas)
+        previous = object()
+        for i, key in enumerate(self.source_line_keys()):
+            if key is not None and key != previous:
+                trace.append(*self[i])
+            previous = key if key is not None else previous
+        return trace
+
+    def diff(self, other: 'ExecutionTrace', by_instruction_pointer: bool = False) -> List[Tuple[str, int, int, int, int]]:
+        """
+        Compare the paths of two executions, typically of two versions of a contract.
+        Source lines are compared by default, because instruction pointers change between builds
+        :return: difflib opcodes (tag, i1, i2, j1, j2) that are not 'equal';
+            self[i1:i2] is replaced, deleted or inserted by other[j1:j2]
+        """
+        if by_instruction_pointer:
+            a = [(self.contracts[c], ip) for c, ip in zip(self.contract_indexes, self.instruction_pointers)]
+            b = [(other.contracts[c], ip) for c, ip in zip(other.contract_indexes, other.instruction_pointers)]
+        else:
+            a, b = self.source_line_changes().source_line_keys(), other.source_line_changes().source_line_keys()
+        matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+        return [opcode for opcode in matcher.get_opcodes() if opcode[0] != 'equal']
+
+    def to_dict(self) -> dict:
+        return {
+            'operation': self.operation, 'final_state': self.final_state, 'exception': self.exception, 'final_gas': self.final_gas,
+            'contracts': self.contracts, 'documents': self.documents,
+            **{column: getattr(self, column).tolist() for column in self.COLUMNS},
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> 'ExecutionTrace':
+        trace = cls(d.get('operation'), d.get('final_state'), d.get('exception'), d.get('final_gas'))
+        trace.contracts, trace.documents = list(d['contracts']), list(d['documents'])
+        trace._contract_index = {c: i for i, c in enumerate(trace.contracts)}
+        trace._document_index = {doc: i for i, doc in enumerate(trace.documents)}
+        for column in cls.COLUMNS:
+            getattr(trace, column).extend(d[column])
+        return trace
+
+    def save(self, path: str):
+        """
+        :param path: compressed with gzip if ending with .gz
+        """
+        content = json.dumps(self.to_dict(), separators=(',', ':')).encode()
+        with (gzip.open if path.endswith('.gz') else open)(path, 'wb') as f:
+            f.write(content)
+
+    @classmethod
+    def load(cls, path: str) -> 'ExecutionTrace':
+        with (gzip.open if path.endswith('.gz') else open)(path, 'rb') as f:
+            return cls.from_dict(json.loads(f.read()))
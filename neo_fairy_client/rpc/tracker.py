@@ -0,0 +1,154 @@
+"""
+Confirmation of many transactions by a single poller.
+
+    tracker = TransactionTracker(client)
+    futures = tracker.track_many([client.sendrawtransaction(tx)['hash'] for tx in signed_transactions], timeout=120)
+    for tx_hash, future in futures.items():
+        application_log = future.result()  # raises TimeoutError if not confirmed in time
+
+Whatever the number of waiters, each poll is one getblockcount; when blocks are added, they are read
+with getmanyblocks, and the application logs of the tracked transactions in them with a single batch.
+"""
+from typing import Dict, Iterable, List, Tuple, Union
+from concurrent.futures import Future
+import threading
+import time
+from neo_fairy_client.utils import Hash256Str
+
+
+class TransactionTracker:
+    def __init__(self, client, block_time: float = 15, min_poll_interval: float = 0.5, max_poll_interval: float = 5,
+                 default_timeout: float = 120, with_application_log: bool = True, blocks_per_request: int = 100):
+        """
+        :param client: FairyClient to a node of the chain where the transactions are relayed
+        :param block_time: expected seconds between blocks. After a block is seen, the poller sleeps until
+            the next block is due, then polls every min_poll_interval, backing off to max_poll_interval
+        :param default_timeout: seconds to wait for each transaction, if track is not given a timeout
+        :param with_application_log: resolve futures with the result of getapplicationlog;
+            otherwise with {'txid': ..., 'blockindex': ..., 'blockhash': ...}
+        :param blocks_per_request: maximum blocks of a getmanyblocks call; more blocks are read with more calls in the same batch
+        """
+        self.client = client
+        self.block_time = block_time
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.default_timeout = default_timeout
+        self.with_application_log = with_application_log
+        self.blocks_per_request = blocks_per_request
+        self.pending: Dict[str, Tuple[Future, float]] = dict()  # {tx hash: (future, deadline)}
+        self.block_count: Union[int, None] = None  # block count at the last poll
+        self.polls = 0
+        self.round_trips = 0
+        self._condition = threading.Condition()
+        self._thread: Union[threading.Thread, None] = None
+        self._stopped = False
+
+    def track(self, tx_hash: Union[str, int, Hash256Str], timeout: float = None) -> Future:
+        """
+        :return: a future resolved when the transaction is in a block, or failed with TimeoutError
+        """
+        return self.track_many([tx_hash], timeout)[Hash256Str.from_str_or_int(tx_hash).to_str()]
+
+    def track_many(self, tx_hashes: Iterable[Union[str, int, Hash256Str]], timeout: float = None) -> Dict[str, Future]:
+        """
+        :return: {tx hash str: future}
+        """
+        deadline = time.monotonic() + (self.default_timeout if timeout is None else timeout)
+        futures: Dict[str, Future] = dict()
+        with self._condition:
+            for tx_hash in tx_hashes:
+                tx_hash = Hash256Str.from_str_or_int(tx_hash).to_str()
+                if tx_hash not in self.pending:
+                    self.pending[tx_hash] = (Future(), deadline)
+                futures[tx_hash] = self.pending[tx_hash][0]
+            self._stopped = False
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._poll_loop, name='TransactionTracker', daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+        return futures
+
+    def stop(self):
+        """
+        Stop polling. Pending futures stay unresolved
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __enter__(self) -> 'TransactionTracker':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _poll_loop(self):
+        interval = self.min_poll_interval
+        while True:
+            with self._condition:
+                self._expire(time.monotonic())
+                if self._stopped or not self.pending:
+                    self._thread = None
+                    return
+            try:
+                new_blocks = self.poll()
+            except Exception as e:  # keep serving the waiters through transient errors of the node
+                print(f'WARNING: TransactionTracker failed to poll: {e}')
+                new_blocks = []
+            if new_blocks:
+                latest_block_time = new_blocks[-1].get('time', 0) / 1000
+                interval = max(self.min_poll_interval, latest_block_time + self.block_time - time.time())
+            else:
+                interval = min(interval * 1.5, self.max_poll_interval) if self.polls > 1 else self.min_poll_interval
+            with self._condition:
+                if self.pending and not self._stopped:
+                    earliest_deadline = min(deadline for _, deadline in self.pending.values())
+                    self._condition.wait(max(0.0, min(interval, earliest_deadline - time.monotonic())))
+
+    def _expire(self, now: float):
+        for tx_hash, (future, deadline) in list(self.pending.items()):
+            if future.done():
+                del self.pending[tx_hash]
+            elif deadline <= now:
+                del self.pending[tx_hash]
+                future.set_exception(TimeoutError(f'Transaction {tx_hash} not confirmed before timeout'))
+
+    def poll(self) -> List[dict]:
+        """
+        Poll the block count once, and resolve the tracked transactions in blocks added since the previous poll
+        :return: the blocks added since the previous poll
+        """
+        block_count = self.client.meta_rpc_batch([('getblockcount', [])])[0]
+        self.polls += 1
+        self.round_trips += 1
+        previous_block_count, self.block_count = self.block_count, block_count
+        if previous_block_count is None:
+            # transactions relayed before tracking can be in the latest block already
+            previous_block_count = max(0, block_count - 1)
+        if block_count <= previous_block_count:
+            return []
+        calls = [('getmanyblocks', [start, min(start + self.blocks_per_request, block_count) - 1])
+                 for start in range(previous_block_count, block_count, self.blocks_per_request)]
+        blocks = [block for result in self.client.meta_rpc_batch(calls) for block in result]
+        self.round_trips += 1
+        with self._condition:
+            included = [(tx['hash'], block) for block in blocks for tx in block.get('tx', []) if tx.get('hash') in self.pending]
+        if not included:
+            return blocks
+        if self.with_application_log:
+            logs = self.client.meta_rpc_batch([('getapplicationlog', [tx_hash]) for tx_hash, _ in included], raise_on_error=False)
+            self.round_trips += 1
+        else:
+            logs = [{'txid': tx_hash, 'blockindex': block['index'], 'blockhash': block['hash']} for tx_hash, block in included]
+        with self._condition:
+            for (tx_hash, _), log in zip(included, logs):
+                future, _ = self.pending.pop(tx_hash, (None, None))
+                if future is None or future.done():
+                    continue
+                if isinstance(log, Exception):
+                    future.set_exception(log)
+                else:
+                    future.set_result(log)
+        return blocks
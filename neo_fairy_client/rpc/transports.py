@@ -0,0 +1,260 @@
+"""
+HTTP transports of FairyClient, with the interface of requests.Session.post used by the client.
+
+    client = FairyClient(target_url, wallet, requests_session=make_transport('http.client', pool_maxsize=16))
+
+- 'requests': requests.Session, with a connection pool of pool_maxsize. The most compatible (proxies, auth, hooks)
+- 'urllib3': a urllib3.PoolManager without the per-request work of requests (hooks, adapters, header merging,
+  charset detection of responses)
+- 'http.client': keep-alive connections of the standard library, with the least work per request
+
+Lean transports answer TransportResponse, decoding gzip and deflate bodies (asked for by HttpCompression),
+and decoding text as UTF-8 as JSON-RPC servers send it,
+and raise the exceptions of requests (requests.ConnectionError, requests.ConnectTimeout, requests.ReadTimeout),
+so that retry policies and endpoint pools handle every transport alike.
+All transports set TCP_NODELAY: small requests are not held back by Nagle's algorithm waiting for delayed ACKs.
+"""
+from typing import Dict, List, Tuple, Union
+from urllib.parse import urlsplit
+import http.client
+import json
+import queue
+import select
+import socket
+import ssl
+import threading
+import requests
+import requests.adapters
+import urllib3
+from neo_fairy_client.rpc.compression import decode_content
+
+Timeout = Union[float, Tuple[Union[float, None], Union[float, None]], None]
+DEFAULT_HEADERS = {'Content-Type': 'application/json'}
+
+
+def _split_timeout(timeout: Timeout) -> Tuple[Union[float, None], Union[float, None]]:
+    """
+    :return: (connect timeout, read timeout) from a timeout of requests
+    """
+    if type(timeout) is tuple:
+        return timeout
+    return timeout, timeout
+
+
+class TransportResponse:
+    __slots__ = ('status_code', 'content', 'headers', 'wire_size')
+
+    def __init__(self, status_code: int, content: bytes, headers: Dict[str, str] = None, wire_size: int = None):
+        """
+        :param content: the decoded body
+        :param wire_size: bytes of the body received, before decoding
+        """
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or dict()
+        self.wire_size = len(content) if wire_size is None else wire_size
+
+    @classmethod
+    def decoded(cls, status_code: int, raw: bytes, headers: Dict[str, str]) -> 'TransportResponse':
+        content_encoding = next((v for k, v in headers.items() if k.lower() == 'content-encoding'), None)
+        return cls(status_code, decode_content(content_encoding, raw), headers, len(raw))
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class Urllib3Transport:
+    def __init__(self, pool_maxsize: int = 10, tcp_nodelay: bool = True, headers: Dict[str, str] = None):
+        """
+        :param pool_maxsize: kept-alive connections to each host
+        """
+        self.pool_maxsize = pool_maxsize
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        nodelay = 1 if tcp_nodelay else 0
+        self.socket_options: List[Tuple[int, int, int]] = [(socket.IPPROTO_TCP, socket.TCP_NODELAY, nodelay)]
+        self._pools: Dict[bool, urllib3.PoolManager] = dict()  # {verify: pool}
+        self._lock = threading.Lock()
+
+    def _pool(self, verify: bool) -> urllib3.PoolManager:
+        pool = self._pools.get(verify)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(verify)
+                if pool is None:
+                    pool = self._pools[verify] = urllib3.PoolManager(
+                        maxsize=self.pool_maxsize, retries=False, socket_options=self.socket_options,
+                        cert_reqs='CERT_REQUIRED' if verify else 'CERT_NONE')
+        return pool
+
+    def post(self, url: str, data: Union[str, bytes] = None, timeout: Timeout = None, verify: bool = True, **kwargs) -> TransportResponse:
+        connect_timeout, read_timeout = _split_timeout(timeout)
+        body = data.encode() if type(data) is str else data
+        headers = {**self.headers, **kwargs['headers']} if kwargs.get('headers') else self.headers
+        try:
+            response = self._pool(verify).request('POST', url, body=body, headers=headers,
+                                                  timeout=urllib3.Timeout(connect=connect_timeout, read=read_timeout),
+                                                  retries=False, preload_content=False)
+            raw = response.read(decode_content=False)
+            response.release_conn()
+        except urllib3.exceptions.ConnectTimeoutError as e:
+            raise requests.ConnectTimeout(e)
+        except urllib3.exceptions.ReadTimeoutError as e:
+            raise requests.ReadTimeout(e)
+        except (urllib3.exceptions.HTTPError, OSError) as e:
+            raise requests.ConnectionError(e)
+        return TransportResponse.decoded(response.status, raw, dict(response.headers))
+
+    def close(self):
+        for pool in self._pools.values():
+            pool.clear()
+
+
+class HttpClientTransport:
+    def __init__(self, pool_maxsize: int = 10, tcp_nodelay: bool = True, headers: Dict[str, str] = None):
+        """
+        :param pool_maxsize: idle kept-alive connections kept for each host; more connections are opened when needed
+        """
+        self.pool_maxsize = pool_maxsize
+        self.tcp_nodelay = tcp_nodelay
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        # {(scheme, host, port, verify): idle connections}
+        self._idle: Dict[Tuple[str, str, int, bool], queue.LifoQueue] = dict()
+        self._lock = threading.Lock()
+
+    def _idle_queue(self, key: Tuple[str, str, int, bool]) -> queue.LifoQueue:
+        idle = self._idle.get(key)
+        if idle is None:
+            with self._lock:
+                idle = self._idle.setdefault(key, queue.LifoQueue(maxsize=self.pool_maxsize))
+        return idle
+
+    def _connect(self, key: Tuple[str, str, int, bool], connect_timeout: Union[float, None]) -> http.client.HTTPConnection:
+        scheme, host, port, verify = key
+        if scheme == 'https':
+            context = ssl.create_default_context() if verify else ssl._create_unverified_context()
+            connection = http.client.HTTPSConnection(host, port, timeout=connect_timeout, context=context)
+        else:
+            connection = http.client.HTTPConnection(host, port, timeout=connect_timeout)
+        try:
+            connection.connect()
+        except socket.timeout as e:
+            raise requests.ConnectTimeout(e)
+        except OSError as e:
+            raise requests.ConnectionError(e)
+        if self.tcp_nodelay:
+            connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return connection
+
+    @staticmethod
+    def _is_dropped(connection: http.client.HTTPConnection) -> bool:
+        """
+        :return: True if the server closed the idle connection; an idle connection has nothing to read otherwise
+        """
+        if connection.sock is None:
+            return True
+        try:
+            return bool(select.select([connection.sock], [], [], 0)[0])
+        except (OSError, ValueError):
+            return True
+
+    def _checkout(self, idle: queue.LifoQueue, key: Tuple[str, str, int, bool],
+                  connect_timeout: Union[float, None]) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        :return: (an idle connection still open, or a new connection; whether the connection is reused)
+        """
+        while True:
+            try:
+                connection = idle.get_nowait()
+            except queue.Empty:
+                return self._connect(key, connect_timeout), False
+            if not self._is_dropped(connection):
+                return connection, True
+            connection.close()
+
+    def post(self, url: str, data: Union[str, bytes] = None, timeout: Timeout = None, verify: bool = True, **kwargs) -> TransportResponse:
+        """
+        A request failing on a reused connection is sent again on another connection
+        only if the failure happened while sending it. Once the request is sent, the server may have executed it
+        (e.g. a relayed invocation or sendrawtransaction), so failures reading the response raise requests.ConnectionError
+        """
+        parsed = urlsplit(url)
+        key = (parsed.scheme, parsed.hostname, parsed.port or (443 if parsed.scheme == 'https' else 80), verify)
+        path = (parsed.path or '/') + (f'?{parsed.query}' if parsed.query else '')
+        body = data.encode() if type(data) is str else (data or b'')
+        headers = {**self.headers, **kwargs['headers']} if kwargs.get('headers') else self.headers
+        connect_timeout, read_timeout = _split_timeout(timeout)
+        idle = self._idle_queue(key)
+        while True:
+            connection, reused = self._checkout(idle, key, connect_timeout)
+            try:
+                connection.sock.settimeout(read_timeout)
+                connection.request('POST', path, body, headers)
+            except socket.timeout as e:
+                connection.close()
+                raise requests.ReadTimeout(e)
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                if reused:  # closed by the server before the request was fully sent; send again on another connection
+                    continue
+                raise requests.ConnectionError(e)
+            break
+        try:
+            response = connection.getresponse()
+            content = response.read()
+        except socket.timeout as e:
+            connection.close()
+            raise requests.ReadTimeout(e)
+        except (OSError, http.client.HTTPException) as e:
+            connection.close()
+            raise requests.ConnectionError(e)
+        if response.will_close:
+            connection.close()
+        else:
+            try:
+                idle.put_nowait(connection)
+            except queue.Full:
+                connection.close()
+        return TransportResponse.decoded(response.status, content, dict(response.getheaders()))
+
+    def close(self):
+        for idle in self._idle.values():
+            while True:
+                try:
+                    idle.get_nowait().close()
+                except queue.Empty:
+                    break
+
+
+def requests_transport(pool_maxsize: int = 10) -> requests.Session:
+    """
+    :return: a requests.Session with pool_maxsize connections to each host.
+        urllib3 under requests sets TCP_NODELAY by default
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+TRANSPORTS = ('requests', 'urllib3', 'http.client')
+
+
+def make_transport(name: str = 'requests', pool_maxsize: int = 10, tcp_nodelay: bool = True):
+    """
+    :param name: 'requests', 'urllib3' or 'http.client'
+    :return: an object with the post method of requests.Session, for FairyClient(requests_session=...)
+    """
+    if name == 'requests':
+        if not tcp_nodelay:
+            raise ValueError('The requests transport always sets TCP_NODELAY')
+        return requests_transport(pool_maxsize)
+    if name == 'urllib3':
+        return Urllib3Transport(pool_maxsize, tcp_nodelay)
+    if name == 'http.client':
+        return HttpClientTransport(pool_maxsize, tcp_nodelay)
+    raise ValueError(f'Unknown transport {name}. Expected one of {TRANSPORTS}')
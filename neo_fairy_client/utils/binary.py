@@ -0,0 +1,147 @@
+from typing import Union
+import struct
+
+
+class BinaryReader:
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        """
+        Reads Neo binary serialization (little-endian integers, var-length prefixes)
+        """
+        self.data = memoryview(data)
+        self.position = 0
+
+    def remaining(self) -> int:
+        return len(self.data) - self.position
+
+    def read_bytes(self, length: int) -> bytes:
+        end = self.position + length
+        if length < 0 or end > len(self.data):
+            raise ValueError(f'Unexpected end of data reading {length} bytes at position {self.position}')
+        result = self.data[self.position:end].tobytes()
+        self.position = end
+        return result
+
+    def _read_struct(self, fmt: str, size: int) -> int:
+        if self.position + size > len(self.data):
+            raise ValueError(f'Unexpected end of data reading {size} bytes at position {self.position}')
+        value = struct.unpack_from(fmt, self.data, self.position)[0]
+        self.position += size
+        return value
+
+    def read_uint8(self) -> int:
+        return self._read_struct('<B', 1)
+
+    def read_bool(self) -> bool:
+        value = self.read_uint8()
+        if value > 1:
+            raise ValueError(f'Invalid bool {value} at position {self.position - 1}')
+        return value == 1
+
+    def read_uint16(self) -> int:
+        return self._read_struct('<H', 2)
+
+    def read_uint32(self) -> int:
+        return self._read_struct('<I', 4)
+
+    def read_int64(self) -> int:
+        return self._read_struct('<q', 8)
+
+    def read_uint64(self) -> int:
+        return self._read_struct('<Q', 8)
+
+    def read_var_int(self, max_value: int = 0xFFFFFFFFFFFFFFFF) -> int:
+        prefix = self.read_uint8()
+        if prefix == 0xFD:
+            value = self.read_uint16()
+        elif prefix == 0xFE:
+            value = self.read_uint32()
+        elif prefix == 0xFF:
+            value = self.read_uint64()
+        else:
+            value = prefix
+        if value > max_value:
+            raise ValueError(f'Var int {value} exceeds {max_value}')
+        return value
+
+    def read_var_bytes(self, max_length: int = 0x1000000) -> bytes:
+        return self.read_bytes(self.read_var_int(max_length))
+
+    def read_var_string(self, max_length: int = 0x1000000) -> str:
+        return self.read_var_bytes(max_length).decode('utf-8')
+
+    def read_fixed_string(self, length: int) -> str:
+        """null-padded utf-8 string of fixed length"""
+        data = self.read_bytes(length)
+        end = data.find(b'\x00')
+        if end >= 0:
+            if any(data[end:]):
+                raise ValueError(f'Fixed string {data!r} is not padded with zeros')
+            data = data[:end]
+        return data.decode('utf-8')
+
+
+class BinaryWriter:
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.buffer)
+
+    def write_bytes(self, data: bytes):
+        self.buffer += data
+
+    def write_uint8(self, value: int):
+        self.buffer.append(value)
+
+    def write_bool(self, value: bool):
+        self.buffer.append(1 if value else 0)
+
+    def write_uint16(self, value: int):
+        self.buffer += struct.pack('<H', value)
+
+    def write_uint32(self, value: int):
+        self.buffer += struct.pack('<I', value)
+
+    def write_int64(self, value: int):
+        self.buffer += struct.pack('<q', value)
+
+    def write_uint64(self, value: int):
+        self.buffer += struct.pack('<Q', value)
+
+    def write_var_int(self, value: int):
+        if value < 0:
+            raise ValueError(f'Var int must be >= 0; got {value}')
+        if value < 0xFD:
+            self.buffer.append(value)
+        elif value <= 0xFFFF:
+            self.buffer.append(0xFD)
+            self.buffer += struct.pack('<H', value)
+        elif value <= 0xFFFFFFFF:
+            self.buffer.append(0xFE)
+            self.buffer += struct.pack('<I', value)
+        else:
+            self.buffer.append(0xFF)
+            self.buffer += struct.pack('<Q', value)
+
+    def write_var_bytes(self, data: bytes):
+        self.write_var_int(len(data))
+        self.buffer += data
+
+    def write_var_string(self, value: str):
+        self.write_var_bytes(value.encode('utf-8'))
+
+    def write_fixed_string(self, value: str, length: int):
+        data = value.encode('utf-8')
+        if len(data) > length:
+            raise ValueError(f'String {value} longer than {length} bytes')
+        self.buffer += data + b'\x00' * (length - len(data))
+
+
+def var_int_size(value: int) -> int:
+    if value < 0xFD:
+        return 1
+    if value <= 0xFFFF:
+        return 3
+    if value <= 0xFFFFFFFF:
+        return 5
+    return 9
@@ -0,0 +1,188 @@
+from typing import Dict, List, Tuple, Union
+import bisect
+import io
+import json
+import ntpath
+import re
+import zipfile
+
+_SEQUENCE_POINT = re.compile(r'(\d+)\[(\d+)\](\d+):(\d+)-(\d+):(\d+)')
+_DUMPNEF_INSTRUCTION = re.compile(r'^([0-9A-Fa-f]{4,8}) (\w+)(.*)$')
+_DUMPNEF_CODE = re.compile(r'^# Code (.+) line (\d+): "(.*)"$')
+
+
+class SequencePoint:
+    __slots__ = ('address', 'document', 'start_line', 'start_column', 'end_line', 'end_column')
+
+    def __init__(self, address: int, document: str, start_line: int, start_column: int, end_line: int, end_column: int):
+        self.address = address
+        self.document = document
+        self.start_line = start_line
+        self.start_column = start_column
+        self.end_line = end_line
+        self.end_column = end_column
+
+    def __repr__(self):
+        return f'{self.address} {self.document} line {self.start_line}:{self.start_column}-{self.end_line}:{self.end_column}'
+
+
+class DebugMethod:
+    def __init__(self, id: str, namespace: str, name: str, range_start: int, range_end: int,
+                 parameters: List[Tuple[str, str]], variables: List[Tuple[str, str]], return_type: str,
+                 sequence_points: List[SequencePoint]):
+        """
+        A method in debug info
+        :param parameters: [(name, type)] in the order of argument slots
+        :param variables: [(name, type)] in the order of local variable slots
+        :param range_start: instruction pointer of the first instruction
+        :param range_end: instruction pointer of the last instruction
+        """
+        self.id = id
+        self.namespace = namespace
+        self.name = name
+        self.range_start = range_start
+        self.range_end = range_end
+        self.parameters = parameters
+        self.variables = variables
+        self.return_type = return_type
+        self.sequence_points = sequence_points
+
+    def __repr__(self):
+        return f'{self.namespace}.{self.name} [{self.range_start}-{self.range_end}]'
+
+
+def _parse_slots(declarations: List[str]) -> List[Tuple[str, str]]:
+    """
+    :param declarations: ["name,type"] or ["name,type,slot"]
+    :return: [(name, type)] indexed by slot
+    """
+    slots: Dict[int, Tuple[str, str]] = dict()
+    for i, declaration in enumerate(declarations):
+        fields = declaration.split(',')
+        slot = int(fields[2]) if len(fields) > 2 and fields[2] else i
+        slots[slot] = (fields[0], fields[1] if len(fields) > 1 else 'Any')
+    return [slots.get(i, ('', 'Any')) for i in range(max(slots) + 1)] if slots else []
+
+
+class DebugInfoIndex:
+    def __init__(self, debug_info: dict, dumpnef: str = None):
+        """
+        Local index of contract debug info, for lookups without RPC in O(log n).
+        Build it with DebugInfoIndex.from_nefdbgnfo
+        :param debug_info: the json in .nefdbgnfo
+        :param dumpnef: content of .nef.txt, for instructions and source code contents
+        """
+        self.hash: str = debug_info.get('hash', '')
+        self.documents: List[str] = debug_info.get('documents', [])
+        self.static_variables: List[Tuple[str, str]] = _parse_slots(debug_info.get('static-variables', []))
+        self.methods: List[DebugMethod] = []
+        for method in debug_info.get('methods', []):
+            namespace, _, name = method['name'].rpartition(',')
+            range_start, range_end = (int(i) for i in method['range'].split('-'))
+            sequence_points = []
+            for sequence_point in method.get('sequence-points', []):
+                address, document, start_line, start_column, end_line, end_column = map(int, _SEQUENCE_POINT.match(sequence_point).groups())
+                sequence_points.append(SequencePoint(address, self.documents[document] if document < len(self.documents) else '',
+                                                     start_line, start_column, end_line, end_column))
+            sequence_points.sort(key=lambda s: s.address)
+            self.methods.append(DebugMethod(method.get('id', ''), namespace, name, range_start, range_end,
+                                            _parse_slots(method.get('params', [])), _parse_slots(method.get('variables', [])),
+                                            method.get('return', 'Void'), sequence_points))
+        self.methods.sort(key=lambda m: m.range_start)
+        self._method_starts: List[int] = [m.range_start for m in self.methods]
+        self.sequence_points: List[SequencePoint] = sorted((s for m in self.methods for s in m.sequence_points), key=lambda s: s.address)
+        self._sequence_point_addresses: List[int] = [s.address for s in self.sequence_points]
+        # {(document, line): [instruction pointers of sequence points starting at the line]}
+        self._line_to_ips: Dict[Tuple[str, int], List[int]] = dict()
+        for s in self.sequence_points:
+            self._line_to_ips.setdefault((s.document, s.start_line), []).append(s.address)
+        # {basename of document: [documents]}
+        self._basenames: Dict[str, List[str]] = dict()
+        for document in self.documents:
+            self._basenames.setdefault(ntpath.basename(document), []).append(document)
+
+        # {instruction pointer: (opcode name, operand text)}
+        self.instructions: Dict[int, Tuple[str, str]] = dict()
+        # {(source filename in .nef.txt, line): source code}
+        self.source_lines: Dict[Tuple[str, int], str] = dict()
+        if dumpnef:
+            for line in dumpnef.splitlines():
+                line = line.strip()
+                if match := _DUMPNEF_INSTRUCTION.match(line):
+                    self.instructions[int(match.group(1), 16)] = (match.group(2), match.group(3).strip())
+                elif match := _DUMPNEF_CODE.match(line):
+                    self.source_lines[(ntpath.basename(match.group(1)), int(match.group(2)))] = match.group(3)
+
+    @classmethod
+    def from_nefdbgnfo(cls, nefdbgnfo: bytes, dumpnef: str = None) -> 'DebugInfoIndex':
+        """
+        :param nefdbgnfo: content of .nefdbgnfo, a zip of a single .debug.json; or the json itself
+        """
+        if nefdbgnfo[:2] == b'PK':
+            with zipfile.ZipFile(io.BytesIO(nefdbgnfo)) as z:
+                name = next((n for n in z.namelist() if n.endswith('.json')), z.namelist()[0])
+                nefdbgnfo = z.read(name)
+        return cls(json.loads(nefdbgnfo), dumpnef)
+
+    def method_at(self, instruction_pointer: int) -> Union[DebugMethod, None]:
+        i = bisect.bisect_right(self._method_starts, instruction_pointer) - 1
+        if i >= 0 and instruction_pointer <= self.methods[i].range_end:
+            return self.methods[i]
+        return None
+
+    def sequence_point_at(self, instruction_pointer: int) -> Union[SequencePoint, None]:
+        """
+        :return: the last sequence point at or before the instruction pointer, in the same method
+        """
+        i = bisect.bisect_right(self._sequence_point_addresses, instruction_pointer) - 1
+        if i < 0:
+            return None
+        sequence_point = self.sequence_points[i]
+        method = self.method_at(instruction_pointer)
+        if method is None or sequence_point.address < method.range_start:
+            return None
+        return sequence_point
+
+    def source_line_at(self, instruction_pointer: int) -> Union[Tuple[str, int, str], None]:
+        """
+        :return: (document, line number, source code of the line if known from .nef.txt)
+        """
+        sequence_point = self.sequence_point_at(instruction_pointer)
+        if sequence_point is None:
+            return None
+        return sequence_point.document, sequence_point.start_line, \
+            self.source_lines.get((ntpath.basename(sequence_point.document), sequence_point.start_line))
+
+    def resolve_document(self, filename: str) -> List[str]:
+        """
+        :param filename: full path as in debug info, or just the file name
+        """
+        if filename in self.documents:
+            return [filename]
+        return self._basenames.get(ntpath.basename(filename), [])
+
+    def instruction_pointers_of_line(self, filename: str, line_num: int) -> List[int]:
+        """
+        :return: instruction pointers of sequence points starting at the line, which is where source code breakpoints stop
+        """
+        return sorted(ip for document in self.resolve_document(filename) for ip in self._line_to_ips.get((document, line_num), []))
+
+    def filenames(self) -> List[str]:
+        return list(self.documents)
+
+    def variable_names(self, instruction_pointer: int) -> Dict[str, List[str]]:
+        """
+        :return: {'arguments': [names by slot], 'locals': [names by slot], 'statics': [names by slot]} at the instruction pointer
+        """
+        method = self.method_at(instruction_pointer)
+        return {
+            'arguments': [name for name, _ in method.parameters] if method else [],
+            'locals': [name for name, _ in method.variables] if method else [],
+            'statics': [name for name, _ in self.static_variables],
+        }
+
+    def instruction_at(self, instruction_pointer: int) -> Union[Tuple[str, str], None]:
+        """
+        :return: (opcode name, operand text) from .nef.txt
+        """
+        return self.instructions.get(instruction_pointer)
@@ -0,0 +1,331 @@
+from typing import Any, Dict, List, Tuple, Union
+import base64
+import hashlib
+import json
+from neo_fairy_client.utils.types import Hash160Str, UInt160
+from neo_fairy_client.utils.binary import BinaryReader, BinaryWriter
+from neo_fairy_client.utils.opcodes import BRANCH_OPCODES, OpCode, iterate_instructions, jump_targets
+from neo_fairy_client.utils.script_builder import ScriptBuilder
+from neo_fairy_client.utils.crypto import hash160
+
+NEF_MAGIC = 0x3346454E
+NEF_COMPILER_LENGTH = 64
+NEF_MAX_SOURCE_LENGTH = 256
+NEF_MAX_TOKENS = 128
+NEF_MAX_SCRIPT_LENGTH = 1024 * 1024
+MANIFEST_MAX_LENGTH = 0xFFFF
+CALL_FLAGS_ALL = 0x0F
+
+PARAMETER_TYPES = frozenset({
+    'Any', 'Boolean', 'Integer', 'ByteArray', 'String', 'Hash160', 'Hash256',
+    'PublicKey', 'Signature', 'Array', 'Map', 'InteropInterface',
+})
+RETURN_TYPES = PARAMETER_TYPES | {'Void'}
+
+
+class MethodToken:
+    def __init__(self, hash: Union[str, int, Hash160Str], method: str, parameters_count: int, has_return_value: bool, call_flags: int):
+        """
+        A static call to another contract, executed with CALLT
+        """
+        self.hash = Hash160Str.from_str_or_int(hash)
+        self.method = method
+        self.parameters_count = parameters_count
+        self.has_return_value = has_return_value
+        self.call_flags = call_flags
+
+    def __repr__(self):
+        return f'MethodToken({self.hash}, {self.method}, {self.parameters_count}, {self.has_return_value}, {self.call_flags})'
+
+    def __eq__(self, other):
+        return type(other) is MethodToken and (self.hash, self.method, self.parameters_count, self.has_return_value, self.call_flags) \
+            == (other.hash, other.method, other.parameters_count, other.has_return_value, other.call_flags)
+
+
+class NefFile:
+    def __init__(self, script: bytes, compiler: str = 'neo-fairy-client', source: str = '',
+                 tokens: List[MethodToken] = None, checksum: int = None):
+        """
+        .nef file of a compiled contract
+        :param checksum: computed from the other fields if None
+        """
+        self.compiler = compiler
+        self.source = source
+        self.tokens: List[MethodToken] = tokens or []
+        self.script = script
+        self.checksum = self.compute_checksum() if checksum is None else checksum
+
+    def serialize_without_checksum(self) -> bytes:
+        writer = BinaryWriter()
+        writer.write_uint32(NEF_MAGIC)
+        writer.write_fixed_string(self.compiler, NEF_COMPILER_LENGTH)
+        writer.write_var_string(self.source)
+        writer.write_uint8(0)
+        writer.write_var_int(len(self.tokens))
+        for token in self.tokens:
+            writer.write_bytes(Hash160Str.from_str_or_int(token.hash).to_UInt160()._data)
+            writer.write_var_string(token.method)
+            writer.write_uint16(token.parameters_count)
+            writer.write_bool(token.has_return_value)
+            writer.write_uint8(token.call_flags)
+        writer.write_uint16(0)
+        writer.write_var_bytes(self.script)
+        return writer.to_bytes()
+
+    def compute_checksum(self) -> int:
+        data = self.serialize_without_checksum()
+        return int.from_bytes(hashlib.sha256(hashlib.sha256(data).digest()).digest()[:4], 'little')
+
+    def to_bytes(self) -> bytes:
+        return self.serialize_without_checksum() + self.checksum.to_bytes(4, 'little')
+
+    @classmethod
+    def from_bytes(cls, nef: bytes, verify_checksum: bool = True) -> 'NefFile':
+        """
+        Parse a .nef file as ContractManagement does
+        :raise ValueError: if the file is malformed or the checksum does not match
+        """
+        reader = BinaryReader(nef)
+        magic = reader.read_uint32()
+        if magic != NEF_MAGIC:
+            raise ValueError(f'Wrong NEF magic 0x{magic:08x}; expected 0x{NEF_MAGIC:08x}')
+        compiler = reader.read_fixed_string(NEF_COMPILER_LENGTH)
+        source = reader.read_var_string(NEF_MAX_SOURCE_LENGTH)
+        if reader.read_uint8() != 0:
+            raise ValueError('Reserved byte of NEF must be 0')
+        tokens = []
+        for _ in range(reader.read_var_int(NEF_MAX_TOKENS)):
+            token_hash = Hash160Str.from_UInt160(UInt160(reader.read_bytes(20)))
+            method = reader.read_var_string(32)
+            if method.startswith('_'):
+                raise ValueError(f'Method token cannot call private method {method}')
+            parameters_count = reader.read_uint16()
+            has_return_value = reader.read_bool()
+            call_flags = reader.read_uint8()
+            if call_flags & ~CALL_FLAGS_ALL:
+                raise ValueError(f'Invalid call flags {call_flags} in method token {method}')
+            tokens.append(MethodToken(token_hash, method, parameters_count, has_return_value, call_flags))
+        if reader.read_uint16() != 0:
+            raise ValueError('Reserved bytes of NEF must be 0')
+        script = reader.read_var_bytes(NEF_MAX_SCRIPT_LENGTH)
+        if len(script) == 0:
+            raise ValueError('Empty script in NEF')
+        checksum = reader.read_uint32()
+        if reader.remaining() != 0:
+            raise ValueError(f'{reader.remaining()} unexpected bytes at the end of NEF')
+        nef_file = cls(script, compiler=compiler, source=source, tokens=tokens, checksum=checksum)
+        if verify_checksum:
+            expected = int.from_bytes(hashlib.sha256(hashlib.sha256(nef[:-4]).digest()).digest()[:4], 'little')
+            if checksum != expected:
+                raise ValueError(f'Wrong NEF checksum {checksum}; expected {expected}')
+        return nef_file
+
+    def instruction_offsets(self) -> List[int]:
+        """
+        :raise ValueError: for unknown opcodes, truncated operands, or jumps into the middle of instructions
+        """
+        offsets, targets = [], []
+        for offset, opcode, operand in iterate_instructions(self.script):
+            offsets.append(offset)
+            if opcode in BRANCH_OPCODES:
+                targets += [(offset, target) for target in jump_targets(offset, opcode, operand)]
+        offset_set = set(offsets)
+        for offset, target in targets:
+            if target not in offset_set:
+                raise ValueError(f'Instruction at offset {offset} jumps to {target}, which is not the start of an instruction')
+        return offsets
+
+
+def method_offsets(manifest: Union[str, dict]) -> Dict[Tuple[str, int], int]:
+    """
+    :return: {(method name, parameter count): offset in script}
+    """
+    manifest = json.loads(manifest) if type(manifest) is str else manifest
+    return {(m['name'], len(m['parameters'])): m['offset'] for m in manifest['abi']['methods']}
+
+
+def _is_hash160(s: Any) -> bool:
+    if type(s) is not str or len(s) != 42 or not s.startswith('0x'):
+        return False
+    try:
+        bytes.fromhex(s[2:])
+    except ValueError:
+        return False
+    return True
+
+
+def _is_public_key(s: Any) -> bool:
+    if type(s) is not str or len(s) != 66 or s[:2] not in {'02', '03'}:
+        return False
+    try:
+        bytes.fromhex(s)
+    except ValueError:
+        return False
+    return True
+
+
+def _check_parameters(parameters: Any, where: str, errors: List[str]):
+    if type(parameters) is not list:
+        errors.append(f'{where}: parameters must be a list')
+        return
+    names = [p.get('name') if type(p) is dict else None for p in parameters]
+    for parameter, name in zip(parameters, names):
+        if type(name) is not str or not name:
+            errors.append(f'{where}: parameter {parameter} has no name')
+        elif parameter.get('type') not in PARAMETER_TYPES:
+            errors.append(f'{where}: parameter {name} has invalid type {parameter.get("type")}')
+    if len(set(names)) != len(names):
+        errors.append(f'{where}: duplicate parameter names {names}')
+
+
+def validate_manifest(manifest: Union[str, dict], nef: Union[bytes, NefFile] = None) -> List[str]:
+    """
+    Check a manifest as ContractManagement does on deployment, and check the ABI against the script in the NEF.
+    :param nef: .nef content or parsed NefFile; if given, ABI offsets must be starts of instructions in its script
+    :return: warnings about a valid but risky manifest
+    :raise ValueError: listing all errors, if the manifest or NEF is invalid
+    """
+    errors: List[str] = []
+    warnings: List[str] = []
+    if type(manifest) is str:
+        if len(manifest.encode('utf-8')) > MANIFEST_MAX_LENGTH:
+            errors.append(f'Manifest longer than {MANIFEST_MAX_LENGTH} bytes')
+        try:
+            manifest = json.loads(manifest)
+        except ValueError as e:
+            raise ValueError(f'Manifest is not valid json: {e}')
+    if type(manifest) is not dict:
+        raise ValueError(f'Manifest must be a json object; got {type(manifest).__name__}')
+    if type(nef) is bytes:
+        nef = NefFile.from_bytes(nef)
+
+    name = manifest.get('name')
+    if type(name) is not str or not name:
+        errors.append('Manifest must have a non-empty name')
+    groups = manifest.get('groups', [])
+    if type(groups) is not list or not all(type(g) is dict and _is_public_key(g.get('pubkey')) for g in groups):
+        errors.append(f'Invalid groups {groups}')
+    else:
+        for group in groups:
+            try:
+                if len(base64.b64decode(group.get('signature', ''), validate=True)) != 64:
+                    errors.append(f'Group {group["pubkey"]} signature must be 64 bytes')
+            except ValueError:
+                errors.append(f'Group {group["pubkey"]} signature is not base64')
+        if len({g['pubkey'] for g in groups}) != len(groups):
+            errors.append('Duplicate groups')
+    if manifest.get('features', {}) != {}:
+        errors.append(f'Features must be empty; got {manifest.get("features")}')
+    standards = manifest.get('supportedstandards', [])
+    if type(standards) is not list or not all(type(s) is str and s for s in standards) or len(set(standards)) != len(standards):
+        errors.append(f'Invalid supportedstandards {standards}')
+
+    abi = manifest.get('abi')
+    if type(abi) is not dict or type(abi.get('methods')) is not list:
+        errors.append('Manifest must have abi.methods')
+    else:
+        if not abi['methods']:
+            errors.append('abi.methods is empty')
+        instruction_offsets = None
+        if nef is not None:
+            try:
+                instruction_offsets = set(nef.instruction_offsets())
+            except ValueError as e:
+                errors.append(f'Invalid script: {e}')
+        keys = set()
+        for method in abi['methods']:
+            if type(method) is not dict or type(method.get('name')) is not str or not method['name']:
+                errors.append(f'Invalid abi method {method}')
+                continue
+            where = f'abi method {method["name"]}'
+            _check_parameters(method.get('parameters'), where, errors)
+            if type(method.get('parameters')) is list:
+                key = (method['name'], len(method['parameters']))
+                if key in keys:
+                    errors.append(f'Duplicate {where} with {key[1]} parameters')
+                keys.add(key)
+            if method.get('returntype') not in RETURN_TYPES:
+                errors.append(f'{where}: invalid returntype {method.get("returntype")}')
+            if type(method.get('safe')) is not bool:
+                errors.append(f'{where}: safe must be bool')
+            offset = method.get('offset')
+            if type(offset) is not int or offset < 0:
+                errors.append(f'{where}: invalid offset {offset}')
+            elif nef is not None and offset >= len(nef.script):
+                errors.append(f'{where}: offset {offset} outside script of length {len(nef.script)}')
+            elif instruction_offsets is not None and offset not in instruction_offsets:
+                errors.append(f'{where}: offset {offset} is not the start of an instruction')
+        events = abi.get('events', [])
+        if type(events) is not list:
+            errors.append('abi.events must be a list')
+        else:
+            event_names = [e.get('name') if type(e) is dict else None for e in events]
+            for event, event_name in zip(events, event_names):
+                if type(event_name) is not str or not event_name:
+                    errors.append(f'Invalid abi event {event}')
+                else:
+                    _check_parameters(event.get('parameters'), f'abi event {event_name}', errors)
+            if len(set(event_names)) != len(event_names):
+                errors.append(f'Duplicate abi events {event_names}')
+
+    permissions = manifest.get('permissions', [])
+    if type(permissions) is not list:
+        errors.append('permissions must be a list')
+    else:
+        contracts = []
+        for permission in permissions:
+            contract, methods = (permission.get('contract'), permission.get('methods')) if type(permission) is dict else (None, None)
+            if contract != '*' and not _is_hash160(contract) and not _is_public_key(contract):
+                errors.append(f'Invalid contract in permission {permission}')
+            if methods != '*' and (type(methods) is not list or not all(type(m) is str and m for m in methods) or len(set(methods)) != len(methods)):
+                errors.append(f'Invalid methods in permission {permission}')
+            if contract == '*' and methods == '*':
+                warnings.append('WARNING: wildcard permission: the contract can call any method of any contract, with the witnesses of its callers')
+            elif contract == '*':
+                warnings.append(f'WARNING: wildcard permission: the contract can call {methods} of any contract')
+            contracts.append(contract)
+        if len(set(map(str, contracts))) != len(contracts):
+            errors.append('Duplicate contracts in permissions')
+        if permissions == [{'contract': '0xacce6fd80d44e1796aa0c2c625e9e4e0ce39efc0', 'methods': ['deserialize', 'serialize']}, {'contract': '0xfffdc93764dbaddd97c48f252a53ea4643faa3fd', 'methods': ['destroy', 'getContract', 'update']}]:
+            warnings.append('!!!SERIOUS WARNING: Did you write [ContractPermission("*", "*")] in your contract?!!!')
+    trusts = manifest.get('trusts', [])
+    if trusts != '*' and (type(trusts) is not list or not all(_is_hash160(t) or _is_public_key(t) for t in trusts) or len(set(trusts)) != len(trusts)):
+        errors.append(f'Invalid trusts {trusts}')
+
+    if errors:
+        raise ValueError(f'Invalid contract {name}:\n' + '\n'.join(errors))
+    return warnings
+
+
+def validate_contract(nef: bytes, manifest: Union[str, dict]) -> Tuple[NefFile, List[str]]:
+    """
+    Parse the NEF and validate the manifest against it, without any RPC
+    :return: (parsed NEF, warnings)
+    :raise ValueError: if the NEF or manifest is invalid
+    """
+    nef_file = NefFile.from_bytes(nef)
+    return nef_file, validate_manifest(manifest, nef_file)
+
+
+def compute_contract_hash(sender: Union[str, int, Hash160Str], nef: Union[bytes, NefFile, int], manifest: Union[str, dict]) -> Hash160Str:
+    """
+    Scripthash of a contract deployed by sender, as computed by ContractManagement.
+    It depends only on the sender, NEF checksum and manifest name
+    :param sender: the first signer of the deploying transaction
+    :param nef: .nef content, parsed NefFile, or its checksum
+    :param manifest: manifest json str, parsed dict, or just the contract name
+    """
+    if type(nef) is bytes:
+        checksum = int.from_bytes(nef[-4:], 'little')
+    elif type(nef) is NefFile:
+        checksum = nef.checksum
+    else:
+        checksum = nef
+    if type(manifest) is dict:
+        name = manifest['name']
+    elif manifest.lstrip().startswith('{'):
+        name = json.loads(manifest)['name']
+    else:
+        name = manifest
+    script = ScriptBuilder().emit(OpCode.ABORT).emit_push(Hash160Str.from_str_or_int(sender)).emit_push(checksum).emit_push(name).to_bytes()
+    return Hash160Str.from_UInt160(UInt160(hash160(script)))
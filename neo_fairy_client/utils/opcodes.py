@@ -0,0 +1,306 @@
+from typing import Dict, Iterator, List, Tuple
+from enum import IntEnum
+
+
+class OpCode(IntEnum):
+    PUSHINT8 = 0x00
+    PUSHINT16 = 0x01
+    PUSHINT32 = 0x02
+    PUSHINT64 = 0x03
+    PUSHINT128 = 0x04
+    PUSHINT256 = 0x05
+    PUSHT = 0x08
+    PUSHF = 0x09
+    PUSHA = 0x0A
+    PUSHNULL = 0x0B
+    PUSHDATA1 = 0x0C
+    PUSHDATA2 = 0x0D
+    PUSHDATA4 = 0x0E
+    PUSHM1 = 0x0F
+    PUSH0 = 0x10
+    PUSH1 = 0x11
+    PUSH2 = 0x12
+    PUSH3 = 0x13
+    PUSH4 = 0x14
+    PUSH5 = 0x15
+    PUSH6 = 0x16
+    PUSH7 = 0x17
+    PUSH8 = 0x18
+    PUSH9 = 0x19
+    PUSH10 = 0x1A
+    PUSH11 = 0x1B
+    PUSH12 = 0x1C
+    PUSH13 = 0x1D
+    PUSH14 = 0x1E
+    PUSH15 = 0x1F
+    PUSH16 = 0x20
+    NOP = 0x21
+    JMP = 0x22
+    JMP_L = 0x23
+    JMPIF = 0x24
+    JMPIF_L = 0x25
+    JMPIFNOT = 0x26
+    JMPIFNOT_L = 0x27
+    JMPEQ = 0x28
+    JMPEQ_L = 0x29
+    JMPNE = 0x2A
+    JMPNE_L = 0x2B
+    JMPGT = 0x2C
+    JMPGT_L = 0x2D
+    JMPGE = 0x2E
+    JMPGE_L = 0x2F
+    JMPLT = 0x30
+    JMPLT_L = 0x31
+    JMPLE = 0x32
+    JMPLE_L = 0x33
+    CALL = 0x34
+    CALL_L = 0x35
+    CALLA = 0x36
+    CALLT = 0x37
+    ABORT = 0x38
+    ASSERT = 0x39
+    THROW = 0x3A
+    TRY = 0x3B
+    TRY_L = 0x3C
+    ENDTRY = 0x3D
+    ENDTRY_L = 0x3E
+    ENDFINALLY = 0x3F
+    RET = 0x40
+    SYSCALL = 0x41
+    DEPTH = 0x43
+    DROP = 0x45
+    NIP = 0x46
+    XDROP = 0x48
+    CLEAR = 0x49
+    DUP = 0x4A
+    OVER = 0x4B
+    PICK = 0x4D
+    TUCK = 0x4E
+    SWAP = 0x50
+    ROT = 0x51
+    ROLL = 0x52
+    REVERSE3 = 0x53
+    REVERSE4 = 0x54
+    REVERSEN = 0x55
+    INITSSLOT = 0x56
+    INITSLOT = 0x57
+    LDSFLD0 = 0x58
+    LDSFLD1 = 0x59
+    LDSFLD2 = 0x5A
+    LDSFLD3 = 0x5B
+    LDSFLD4 = 0x5C
+    LDSFLD5 = 0x5D
+    LDSFLD6 = 0x5E
+    LDSFLD = 0x5F
+    STSFLD0 = 0x60
+    STSFLD1 = 0x61
+    STSFLD2 = 0x62
+    STSFLD3 = 0x63
+    STSFLD4 = 0x64
+    STSFLD5 = 0x65
+    STSFLD6 = 0x66
+    STSFLD = 0x67
+    LDLOC0 = 0x68
+    LDLOC1 = 0x69
+    LDLOC2 = 0x6A
+    LDLOC3 = 0x6B
+    LDLOC4 = 0x6C
+    LDLOC5 = 0x6D
+    LDLOC6 = 0x6E
+    LDLOC = 0x6F
+    STLOC0 = 0x70
+    STLOC1 = 0x71
+    STLOC2 = 0x72
+    STLOC3 = 0x73
+    STLOC4 = 0x74
+    STLOC5 = 0x75
+    STLOC6 = 0x76
+    STLOC = 0x77
+    LDARG0 = 0x78
+    LDARG1 = 0x79
+    LDARG2 = 0x7A
+    LDARG3 = 0x7B
+    LDARG4 = 0x7C
+    LDARG5 = 0x7D
+    LDARG6 = 0x7E
+    LDARG = 0x7F
+    STARG0 = 0x80
+    STARG1 = 0x81
+    STARG2 = 0x82
+    STARG3 = 0x83
+    STARG4 = 0x84
+    STARG5 = 0x85
+    STARG6 = 0x86
+    STARG = 0x87
+    NEWBUFFER = 0x88
+    MEMCPY = 0x89
+    CAT = 0x8B
+    SUBSTR = 0x8C
+    LEFT = 0x8D
+    RIGHT = 0x8E
+    INVERT = 0x90
+    AND = 0x91
+    OR = 0x92
+    XOR = 0x93
+    EQUAL = 0x97
+    NOTEQUAL = 0x98
+    SIGN = 0x99
+    ABS = 0x9A
+    NEGATE = 0x9B
+    INC = 0x9C
+    DEC = 0x9D
+    ADD = 0x9E
+    SUB = 0x9F
+    MUL = 0xA0
+    DIV = 0xA1
+    MOD = 0xA2
+    POW = 0xA3
+    SQRT = 0xA4
+    MODMUL = 0xA5
+    MODPOW = 0xA6
+    SHL = 0xA8
+    SHR = 0xA9
+    NOT = 0xAA
+    BOOLAND = 0xAB
+    BOOLOR = 0xAC
+    NZ = 0xB1
+    NUMEQUAL = 0xB3
+    NUMNOTEQUAL = 0xB4
+    LT = 0xB5
+    LE = 0xB6
+    GT = 0xB7
+    GE = 0xB8
+    MIN = 0xB9
+    MAX = 0xBA
+    WITHIN = 0xBB
+    PACKMAP = 0xBE
+    PACKSTRUCT = 0xBF
+    PACK = 0xC0
+    UNPACK = 0xC1
+    NEWARRAY0 = 0xC2
+    NEWARRAY = 0xC3
+    NEWARRAY_T = 0xC4
+    NEWSTRUCT0 = 0xC5
+    NEWSTRUCT = 0xC6
+    NEWMAP = 0xC8
+    SIZE = 0xCA
+    HASKEY = 0xCB
+    KEYS = 0xCC
+    VALUES = 0xCD
+    PICKITEM = 0xCE
+    APPEND = 0xCF
+    SETITEM = 0xD0
+    REVERSEITEMS = 0xD1
+    REMOVE = 0xD2
+    CLEARITEMS = 0xD3
+    POPITEM = 0xD4
+    ISNULL = 0xD8
+    ISTYPE = 0xD9
+    CONVERT = 0xDB
+    ABORTMSG = 0xE0
+    ASSERTMSG = 0xE1
+
+
+# {opcode: size of fixed operand in bytes}
+OPERAND_SIZES: Dict[int, int] = {
+    OpCode.PUSHINT8: 1, OpCode.PUSHINT16: 2, OpCode.PUSHINT32: 4, OpCode.PUSHINT64: 8,
+    OpCode.PUSHINT128: 16, OpCode.PUSHINT256: 32, OpCode.PUSHA: 4,
+    OpCode.CALL: 1, OpCode.CALL_L: 4, OpCode.CALLT: 2, OpCode.TRY: 2, OpCode.TRY_L: 8,
+    OpCode.ENDTRY: 1, OpCode.ENDTRY_L: 4, OpCode.SYSCALL: 4,
+    OpCode.INITSSLOT: 1, OpCode.INITSLOT: 2,
+    OpCode.LDSFLD: 1, OpCode.STSFLD: 1, OpCode.LDLOC: 1, OpCode.STLOC: 1, OpCode.LDARG: 1, OpCode.STARG: 1,
+    OpCode.NEWARRAY_T: 1, OpCode.ISTYPE: 1, OpCode.CONVERT: 1,
+}
+for _jump in range(OpCode.JMP, OpCode.JMPLE_L + 1):
+    OPERAND_SIZES[_jump] = 1 if _jump % 2 == 0 else 4
+# {opcode: size of the length prefix of its operand}
+OPERAND_PREFIX_SIZES: Dict[int, int] = {OpCode.PUSHDATA1: 1, OpCode.PUSHDATA2: 2, OpCode.PUSHDATA4: 4}
+# opcodes whose operands are signed offsets relative to the instruction
+JUMP_OPCODES = frozenset(list(range(OpCode.JMP, OpCode.CALL_L + 1)) + [OpCode.PUSHA, OpCode.ENDTRY, OpCode.ENDTRY_L])
+# opcodes with jump_targets
+BRANCH_OPCODES = frozenset(int(o) for o in JUMP_OPCODES | {OpCode.TRY, OpCode.TRY_L})
+VALID_OPCODES = frozenset(int(o) for o in OpCode)
+# operand size of each byte as opcode; -1 for invalid opcodes, -n for length prefixes of n bytes
+_OPERAND_SIZE_TABLE: List[int] = [
+    -OPERAND_PREFIX_SIZES[o] - 1 if o in OPERAND_PREFIX_SIZES else OPERAND_SIZES.get(o, 0) if o in VALID_OPCODES else -1
+    for o in range(256)
+]
+
+
+def iterate_instructions(script: bytes) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    :return: iterator of (offset, opcode, operand) of each instruction in the script
+    :raise ValueError: for unknown opcodes and truncated operands
+    """
+    position, length = 0, len(script)
+    table = _OPERAND_SIZE_TABLE
+    while position < length:
+        opcode = script[position]
+        size = table[opcode]
+        operand_start = position + 1
+        if size < 0:
+            if size == -1:
+                raise ValueError(f'Unknown opcode 0x{opcode:02x} at offset {position}')
+            operand_start -= size + 1
+            if operand_start > length:
+                raise ValueError(f'Truncated {OpCode(opcode).name} at offset {position}')
+            size = int.from_bytes(script[position + 1:operand_start], 'little')
+        operand_end = operand_start + size
+        if operand_end > length:
+            raise ValueError(f'Truncated {OpCode(opcode).name} at offset {position}')
+        yield position, opcode, script[operand_start:operand_end]
+        position = operand_end
+
+
+def jump_targets(offset: int, opcode: int, operand: bytes) -> List[int]:
+    """
+    :return: absolute offsets that an instruction may jump to
+    """
+    if opcode in JUMP_OPCODES:
+        return [offset + int.from_bytes(operand, 'little', signed=True)]
+    if opcode in {OpCode.TRY, OpCode.TRY_L}:
+        half = len(operand) // 2
+        catch, final = int.from_bytes(operand[:half], 'little', signed=True), int.from_bytes(operand[half:], 'little', signed=True)
+        return [offset + o for o in (catch, final) if o != 0]
+    return []
+
+
+# {opcode: fixed price, to be multiplied by the ExecFeeFactor of the policy contract}, as in ApplicationEngine.OpCodePriceTable.
+# SYSCALL and CALLT are charged by the called interop services and methods, which are not included here
+OPCODE_PRICES: Dict[int, int] = {o: 1 << 1 for o in OpCode}
+OPCODE_PRICES.update({o: 1 for o in range(OpCode.PUSHINT8, OpCode.PUSHINT64 + 1)})
+OPCODE_PRICES.update({o: 1 for o in range(OpCode.PUSHM1, OpCode.NOP + 1)})
+OPCODE_PRICES.update({
+    OpCode.PUSHINT128: 1 << 2, OpCode.PUSHINT256: 1 << 2, OpCode.PUSHT: 1, OpCode.PUSHF: 1, OpCode.PUSHA: 1 << 2,
+    OpCode.PUSHNULL: 1, OpCode.PUSHDATA1: 1 << 3, OpCode.PUSHDATA2: 1 << 9, OpCode.PUSHDATA4: 1 << 12,
+    OpCode.CALL: 1 << 9, OpCode.CALL_L: 1 << 9, OpCode.CALLA: 1 << 9, OpCode.CALLT: 1 << 15,
+    OpCode.ABORT: 0, OpCode.ASSERT: 1, OpCode.THROW: 1 << 9, OpCode.TRY: 1 << 2, OpCode.TRY_L: 1 << 2,
+    OpCode.ENDTRY: 1 << 2, OpCode.ENDTRY_L: 1 << 2, OpCode.ENDFINALLY: 1 << 2, OpCode.RET: 0, OpCode.SYSCALL: 0,
+    OpCode.XDROP: 1 << 4, OpCode.CLEAR: 1 << 4, OpCode.ROLL: 1 << 4, OpCode.REVERSEN: 1 << 4,
+    OpCode.INITSSLOT: 1 << 4, OpCode.INITSLOT: 1 << 6,
+    OpCode.NEWBUFFER: 1 << 8, OpCode.MEMCPY: 1 << 11, OpCode.CAT: 1 << 11, OpCode.SUBSTR: 1 << 11,
+    OpCode.LEFT: 1 << 11, OpCode.RIGHT: 1 << 11,
+    OpCode.INVERT: 1 << 2, OpCode.AND: 1 << 3, OpCode.OR: 1 << 3, OpCode.XOR: 1 << 3,
+    OpCode.EQUAL: 1 << 5, OpCode.NOTEQUAL: 1 << 5,
+    OpCode.SIGN: 1 << 2, OpCode.ABS: 1 << 2, OpCode.NEGATE: 1 << 2, OpCode.INC: 1 << 2, OpCode.DEC: 1 << 2,
+    OpCode.ADD: 1 << 3, OpCode.SUB: 1 << 3, OpCode.MUL: 1 << 3, OpCode.DIV: 1 << 3, OpCode.MOD: 1 << 3,
+    OpCode.POW: 1 << 6, OpCode.SQRT: 1 << 6, OpCode.MODMUL: 1 << 5, OpCode.MODPOW: 1 << 11,
+    OpCode.SHL: 1 << 3, OpCode.SHR: 1 << 3, OpCode.NOT: 1 << 2, OpCode.BOOLAND: 1 << 3, OpCode.BOOLOR: 1 << 3,
+    OpCode.NZ: 1 << 2, OpCode.NUMEQUAL: 1 << 3, OpCode.NUMNOTEQUAL: 1 << 3, OpCode.LT: 1 << 3, OpCode.LE: 1 << 3,
+    OpCode.GT: 1 << 3, OpCode.GE: 1 << 3, OpCode.MIN: 1 << 3, OpCode.MAX: 1 << 3, OpCode.WITHIN: 1 << 3,
+    OpCode.PACKMAP: 1 << 11, OpCode.PACKSTRUCT: 1 << 11, OpCode.PACK: 1 << 11, OpCode.UNPACK: 1 << 11,
+    OpCode.NEWARRAY0: 1 << 4, OpCode.NEWARRAY: 1 << 9, OpCode.NEWARRAY_T: 1 << 9,
+    OpCode.NEWSTRUCT0: 1 << 4, OpCode.NEWSTRUCT: 1 << 9, OpCode.NEWMAP: 1 << 3,
+    OpCode.SIZE: 1 << 2, OpCode.HASKEY: 1 << 6, OpCode.KEYS: 1 << 4, OpCode.VALUES: 1 << 13,
+    OpCode.PICKITEM: 1 << 6, OpCode.APPEND: 1 << 13, OpCode.SETITEM: 1 << 13, OpCode.REVERSEITEMS: 1 << 13,
+    OpCode.REMOVE: 1 << 4, OpCode.CLEARITEMS: 1 << 4, OpCode.POPITEM: 1 << 4,
+    OpCode.ISNULL: 1 << 1, OpCode.ISTYPE: 1 << 1, OpCode.CONVERT: 1 << 13, OpCode.ABORTMSG: 0, OpCode.ASSERTMSG: 1,
+})
+DEFAULT_EXEC_FEE_FACTOR = 30
+
+
+def instruction_prices(script: bytes, exec_fee_factor: int = DEFAULT_EXEC_FEE_FACTOR) -> Dict[int, int]:
+    """
+    :return: {offset: fixed fee of the instruction in datoshi}
+    """
+    return {offset: OPCODE_PRICES.get(opcode, 0) * exec_fee_factor for offset, opcode, _ in iterate_instructions(script)}
@@ -0,0 +1,55 @@
+from typing import Union
+from neo_fairy_client.utils.types import Hash160Str, UInt160
+from neo_fairy_client.utils.opcodes import OpCode
+
+
+class ScriptBuilder:
+    def __init__(self):
+        """
+        Emits NeoVM scripts the way Neo.VM.ScriptBuilder does
+        """
+        self.buffer = bytearray()
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.buffer)
+
+    def emit(self, opcode: OpCode, operand: bytes = b'') -> 'ScriptBuilder':
+        self.buffer.append(opcode)
+        self.buffer += operand
+        return self
+
+    def emit_push_int(self, value: int) -> 'ScriptBuilder':
+        if -1 <= value <= 16:
+            return self.emit(OpCode.PUSH0 + value)
+        length = ((~value if value < 0 else value).bit_length() // 8) + 1  # two's complement with sign bit
+        for opcode, size in ((OpCode.PUSHINT8, 1), (OpCode.PUSHINT16, 2), (OpCode.PUSHINT32, 4),
+                             (OpCode.PUSHINT64, 8), (OpCode.PUSHINT128, 16), (OpCode.PUSHINT256, 32)):
+            if length <= size:
+                return self.emit(opcode, value.to_bytes(size, 'little', signed=True))
+        raise ValueError(f'Integer {value} too large to push')
+
+    def emit_push_bytes(self, data: bytes) -> 'ScriptBuilder':
+        length = len(data)
+        if length < 0x100:
+            return self.emit(OpCode.PUSHDATA1, length.to_bytes(1, 'little') + data)
+        if length < 0x10000:
+            return self.emit(OpCode.PUSHDATA2, length.to_bytes(2, 'little') + data)
+        return self.emit(OpCode.PUSHDATA4, length.to_bytes(4, 'little') + data)
+
+    def emit_push(self, value: Union[int, bool, bytes, str, Hash160Str, UInt160, None]) -> 'ScriptBuilder':
+        """
+        :param value: str is pushed as utf-8, except Hash160Str, which is pushed as UInt160 bytes
+        """
+        if value is None:
+            return self.emit(OpCode.PUSHNULL)
+        if type(value) is bool:
+            return self.emit(OpCode.PUSHT if value else OpCode.PUSHF)
+        if type(value) is int:
+            return self.emit_push_int(value)
+        if isinstance(value, Hash160Str):
+            return self.emit_push_bytes(value.to_UInt160()._data)
+        if isinstance(value, UInt160):
+            return self.emit_push_bytes(value._data)
+        if type(value) is str:
+            return self.emit_push_bytes(value.encode('utf-8'))
+        return self.emit_push_bytes(bytes(value))
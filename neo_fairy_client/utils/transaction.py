@@ -0,0 +1,333 @@
+from typing import Any, Dict, List, Union
+import base64
+from neo_fairy_client.utils.types import Hash160Str, Hash256Str, PublicKeyStr, UInt160, UInt256, Signer, WitnessScope
+from neo_fairy_client.utils.binary import BinaryReader, BinaryWriter
+from neo_fairy_client.utils.crypto import sha256
+
+WITNESS_SCOPE_FLAGS: Dict[WitnessScope, int] = {
+    WitnessScope.NONE: 0x00, WitnessScope.CalledByEntry: 0x01, WitnessScope.CustomContracts: 0x10,
+    WitnessScope.CustomGroups: 0x20, WitnessScope.WitnessRules: 0x40, WitnessScope.Global: 0x80,
+}
+WITNESS_CONDITION_TYPES: Dict[str, int] = {
+    'Boolean': 0x00, 'Not': 0x01, 'And': 0x02, 'Or': 0x03, 'ScriptHash': 0x18, 'Group': 0x19,
+    'CalledByEntry': 0x20, 'CalledByContract': 0x28, 'CalledByGroup': 0x29,
+}
+WITNESS_RULE_ACTIONS: Dict[str, int] = {'Deny': 0x00, 'Allow': 0x01}
+TRANSACTION_ATTRIBUTE_TYPES: Dict[str, int] = {
+    'HighPriority': 0x01, 'OracleResponse': 0x11, 'NotValidBefore': 0x20, 'Conflicts': 0x21, 'NotaryAssisted': 0x22,
+}
+MAX_TRANSACTION_SIZE = 102400
+MAX_TRANSACTION_ATTRIBUTES = 16
+MAX_SUBITEMS = 16  # of signer allowed contracts, groups and rules, and of And/Or conditions
+MAX_NESTING_DEPTH = 3  # of witness conditions
+MAX_WITNESS_SCRIPT_SIZE = 1024
+
+
+def _read_hash160(reader: BinaryReader) -> str:
+    return Hash160Str.from_UInt160(UInt160(reader.read_bytes(20))).to_str()
+
+
+def _write_hash160(writer: BinaryWriter, hash160: Union[str, Hash160Str]):
+    writer.write_bytes(Hash160Str.from_str_or_int(str(hash160)).to_UInt160()._data)
+
+
+def _read_public_key(reader: BinaryReader) -> str:
+    prefix = reader.read_bytes(1)
+    if prefix not in {b'\x02', b'\x03'}:
+        raise ValueError(f'Expected a compressed public key at position {reader.position - 1}; got prefix {prefix.hex()}')
+    return (prefix + reader.read_bytes(32)).hex()
+
+
+def _write_public_key(writer: BinaryWriter, public_key: Union[str, PublicKeyStr]):
+    data = bytes.fromhex(str(public_key))
+    if len(data) != 33:
+        raise ValueError(f'Expected a compressed public key of 33 bytes; got {public_key}')
+    writer.write_bytes(data)
+
+
+def read_witness_condition(reader: BinaryReader, depth: int = MAX_NESTING_DEPTH) -> dict:
+    """
+    :return: the condition as json, the same as WitnessRule.py builds
+    """
+    condition_type = reader.read_uint8()
+    name = next((n for n, t in WITNESS_CONDITION_TYPES.items() if t == condition_type), None)
+    if name is None:
+        raise ValueError(f'Unknown witness condition type 0x{condition_type:02x} at position {reader.position - 1}')
+    if name in {'Not', 'And', 'Or'} and depth <= 0:
+        raise ValueError(f'Witness condition nested deeper than {MAX_NESTING_DEPTH}')
+    if name == 'Boolean':
+        return {'type': name, 'expression': reader.read_bool()}
+    if name == 'Not':
+        return {'type': name, 'expression': read_witness_condition(reader, depth - 1)}
+    if name in {'And', 'Or'}:
+        count = reader.read_var_int(MAX_SUBITEMS)
+        return {'type': name, 'expressions': [read_witness_condition(reader, depth - 1) for _ in range(count)]}
+    if name in {'ScriptHash', 'CalledByContract'}:
+        return {'type': name, 'hash': _read_hash160(reader)}
+    if name in {'Group', 'CalledByGroup'}:
+        return {'type': name, 'group': _read_public_key(reader)}
+    return {'type': name}
+
+
+def write_witness_condition(writer: BinaryWriter, condition: dict):
+    name = condition['type']
+    if name not in WITNESS_CONDITION_TYPES:
+        raise ValueError(f'Unknown witness condition type {name}')
+    writer.write_uint8(WITNESS_CONDITION_TYPES[name])
+    if name == 'Boolean':
+        expression = condition['expression']
+        writer.write_bool(expression if type(expression) is bool else str(expression).lower() == 'true')
+    elif name == 'Not':
+        write_witness_condition(writer, condition['expression'])
+    elif name in {'And', 'Or'}:
+        writer.write_var_int(len(condition['expressions']))
+        for expression in condition['expressions']:
+            write_witness_condition(writer, expression)
+    elif name in {'ScriptHash', 'CalledByContract'}:
+        _write_hash160(writer, condition['hash'])
+    elif name in {'Group', 'CalledByGroup'}:
+        _write_public_key(writer, condition['group'])
+
+
+def read_signer(reader: BinaryReader) -> Signer:
+    account = Hash160Str(_read_hash160(reader))
+    flags = reader.read_uint8()
+    if flags & ~sum(WITNESS_SCOPE_FLAGS.values()) or (flags & WITNESS_SCOPE_FLAGS[WitnessScope.Global] and flags != 0x80):
+        raise ValueError(f'Invalid witness scopes 0x{flags:02x} of signer {account}')
+    scopes = [scope for scope, flag in WITNESS_SCOPE_FLAGS.items() if flag and flags & flag] or [WitnessScope.NONE]
+    allowed_contracts, allowed_groups, rules = None, None, None
+    if flags & WITNESS_SCOPE_FLAGS[WitnessScope.CustomContracts]:
+        allowed_contracts = [Hash160Str(_read_hash160(reader)) for _ in range(reader.read_var_int(MAX_SUBITEMS))]
+    if flags & WITNESS_SCOPE_FLAGS[WitnessScope.CustomGroups]:
+        allowed_groups = [PublicKeyStr(_read_public_key(reader)) for _ in range(reader.read_var_int(MAX_SUBITEMS))]
+    if flags & WITNESS_SCOPE_FLAGS[WitnessScope.WitnessRules]:
+        rules = []
+        for _ in range(reader.read_var_int(MAX_SUBITEMS)):
+            action = reader.read_uint8()
+            name = next((n for n, a in WITNESS_RULE_ACTIONS.items() if a == action), None)
+            if name is None:
+                raise ValueError(f'Unknown witness rule action {action} at position {reader.position - 1}')
+            rules.append({'action': name, 'condition': read_witness_condition(reader)})
+    return Signer(account, scopes[0] if len(scopes) == 1 else scopes, allowed_contracts, allowed_groups, rules)
+
+
+def write_signer(writer: BinaryWriter, signer: Signer):
+    _write_hash160(writer, signer.account)
+    scopes = signer.scope_list()
+    writer.write_uint8(sum(WITNESS_SCOPE_FLAGS[scope] for scope in set(scopes)))
+    if WitnessScope.CustomContracts in scopes:
+        writer.write_var_int(len(signer.allowedcontracts))
+        for contract in signer.allowedcontracts:
+            _write_hash160(writer, contract)
+    if WitnessScope.CustomGroups in scopes:
+        writer.write_var_int(len(signer.allowedgroups))
+        for group in signer.allowedgroups:
+            _write_public_key(writer, group)
+    if WitnessScope.WitnessRules in scopes:
+        writer.write_var_int(len(signer.rules))
+        for rule in signer.rules:
+            writer.write_uint8(WITNESS_RULE_ACTIONS[rule['action']])
+            write_witness_condition(writer, rule['condition'])
+
+
+def read_attribute(reader: BinaryReader) -> dict:
+    """
+    :return: the attribute as json in RPC results, e.g. {'type': 'NotValidBefore', 'height': 100}
+    """
+    attribute_type = reader.read_uint8()
+    name = next((n for n, t in TRANSACTION_ATTRIBUTE_TYPES.items() if t == attribute_type), None)
+    if name is None:
+        raise ValueError(f'Unknown transaction attribute type 0x{attribute_type:02x} at position {reader.position - 1}')
+    if name == 'OracleResponse':
+        return {'type': name, 'id': reader.read_uint64(), 'code': reader.read_uint8(),
+                'result': base64.b64encode(reader.read_var_bytes(0xFFFF)).decode()}
+    if name == 'NotValidBefore':
+        return {'type': name, 'height': reader.read_uint32()}
+    if name == 'Conflicts':
+        return {'type': name, 'hash': Hash256Str.from_UInt256(UInt256(reader.read_bytes(32))).to_str()}
+    if name == 'NotaryAssisted':
+        return {'type': name, 'nkeys': reader.read_uint8()}
+    return {'type': name}
+
+
+def write_attribute(writer: BinaryWriter, attribute: dict):
+    name = attribute['type']
+    if name not in TRANSACTION_ATTRIBUTE_TYPES:
+        raise ValueError(f'Unknown transaction attribute type {name}')
+    writer.write_uint8(TRANSACTION_ATTRIBUTE_TYPES[name])
+    if name == 'OracleResponse':
+        writer.write_uint64(int(attribute['id']))
+        writer.write_uint8(int(attribute['code']))
+        writer.write_var_bytes(base64.b64decode(attribute['result']))
+    elif name == 'NotValidBefore':
+        writer.write_uint32(int(attribute['height']))
+    elif name == 'Conflicts':
+        writer.write_bytes(Hash256Str.from_str_or_int(str(attribute['hash'])).to_UInt256()._data)
+    elif name == 'NotaryAssisted':
+        writer.write_uint8(int(attribute['nkeys']))
+
+
+class Witness:
+    def __init__(self, invocation_script: bytes = b'', verification_script: bytes = b''):
+        self.invocation_script = invocation_script
+        self.verification_script = verification_script
+
+    def to_dict(self) -> Dict[str, str]:
+        return {'invocation': base64.b64encode(self.invocation_script).decode(),
+                'verification': base64.b64encode(self.verification_script).decode()}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, str]) -> 'Witness':
+        return cls(base64.b64decode(d['invocation']), base64.b64decode(d['verification']))
+
+    def __repr__(self):
+        return f'Witness {self.to_dict()}'
+
+
+class Transaction:
+    def __init__(self, script: bytes, signers: List[Signer], system_fee: int = 0, network_fee: int = 0,
+                 valid_until_block: int = 0, nonce: int = 0, attributes: List[dict] = None,
+                 witnesses: List[Witness] = None, version: int = 0):
+        """
+        A Neo N3 transaction, serialized and hashed locally
+        :param attributes: as json in RPC results, e.g. {'type': 'HighPriority'}
+        :param witnesses: one for each signer, in the order of signers. Empty before signing
+        """
+        self.version = version
+        self.nonce = nonce
+        self.system_fee = system_fee
+        self.network_fee = network_fee
+        self.valid_until_block = valid_until_block
+        self.signers = signers
+        self.attributes = attributes or []
+        self.script = script
+        self.witnesses = witnesses or []
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Transaction':
+        """
+        :raise ValueError: for malformed transactions
+        """
+        if len(data) > MAX_TRANSACTION_SIZE:
+            raise ValueError(f'Transaction of {len(data)} bytes exceeds {MAX_TRANSACTION_SIZE} bytes')
+        reader = BinaryReader(data)
+        version = reader.read_uint8()
+        if version > 0:
+            raise ValueError(f'Unknown transaction version {version}')
+        nonce = reader.read_uint32()
+        system_fee, network_fee = reader.read_int64(), reader.read_int64()
+        if system_fee < 0 or network_fee < 0:
+            raise ValueError(f'Negative fees: system fee {system_fee}, network fee {network_fee}')
+        valid_until_block = reader.read_uint32()
+        signer_count = reader.read_var_int(MAX_TRANSACTION_ATTRIBUTES)
+        if signer_count == 0:
+            raise ValueError('Transaction without signers')
+        signers = [read_signer(reader) for _ in range(signer_count)]
+        if len({str(s.account) for s in signers}) != len(signers):
+            raise ValueError('Duplicate signers')
+        attributes = [read_attribute(reader) for _ in range(reader.read_var_int(MAX_TRANSACTION_ATTRIBUTES - signer_count))]
+        script = reader.read_var_bytes(0xFFFF)
+        if not script:
+            raise ValueError('Transaction without script')
+        witnesses = []
+        if reader.remaining():
+            for _ in range(reader.read_var_int(signer_count)):
+                witnesses.append(Witness(reader.read_var_bytes(MAX_WITNESS_SCRIPT_SIZE), reader.read_var_bytes(MAX_WITNESS_SCRIPT_SIZE)))
+            if reader.remaining():
+                raise ValueError(f'{reader.remaining()} unexpected bytes after the transaction')
+        return cls(script, signers, system_fee, network_fee, valid_until_block, nonce, attributes, witnesses, version)
+
+    @classmethod
+    def from_base64(cls, tx: Union[str, bytes]) -> 'Transaction':
+        """
+        :param tx: e.g. result['tx'] of invocations, or the return value of FairyClient.force_sign_transaction
+        """
+        return cls.from_bytes(base64.b64decode(tx))
+
+    def write_unsigned(self, writer: BinaryWriter):
+        writer.write_uint8(self.version)
+        writer.write_uint32(self.nonce)
+        writer.write_int64(self.system_fee)
+        writer.write_int64(self.network_fee)
+        writer.write_uint32(self.valid_until_block)
+        writer.write_var_int(len(self.signers))
+        for signer in self.signers:
+            write_signer(writer, signer)
+        writer.write_var_int(len(self.attributes))
+        for attribute in self.attributes:
+            write_attribute(writer, attribute)
+        writer.write_var_bytes(self.script)
+
+    def unsigned_bytes(self) -> bytes:
+        writer = BinaryWriter()
+        self.write_unsigned(writer)
+        return writer.to_bytes()
+
+    def to_bytes(self) -> bytes:
+        writer = BinaryWriter()
+        self.write_unsigned(writer)
+        writer.write_var_int(len(self.witnesses))
+        for witness in self.witnesses:
+            writer.write_var_bytes(witness.invocation_script)
+            writer.write_var_bytes(witness.verification_script)
+        return writer.to_bytes()
+
+    def to_base64(self) -> str:
+        return base64.b64encode(self.to_bytes()).decode()
+
+    @property
+    def hash(self) -> Hash256Str:
+        """
+        sha256 of the unsigned transaction, the same as txid in RPC results
+        """
+        return Hash256Str.from_UInt256(UInt256(sha256(self.unsigned_bytes())))
+
+    @property
+    def size(self) -> int:
+        return len(self.to_bytes())
+
+    @property
+    def sender(self) -> Hash160Str:
+        """
+        the first signer, who pays the fees
+        """
+        return self.signers[0].account
+
+    def sign_data(self, network: int) -> bytes:
+        """
+        :param network: magic number of the network, e.g. 860833102 for mainnet
+        :return: what the witnesses sign
+        """
+        return network.to_bytes(4, 'little') + UInt256(sha256(self.unsigned_bytes()))._data
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        :return: json in the format of getrawtransaction verbose results
+        """
+        signers = []
+        for signer in self.signers:
+            d: Dict[str, Any] = {'account': str(signer.account), 'scopes': signer.to_dict()['scopes']}
+            scopes = signer.scope_list()
+            if WitnessScope.CustomContracts in scopes:
+                d['allowedcontracts'] = [str(c) for c in signer.allowedcontracts]
+            if WitnessScope.CustomGroups in scopes:
+                d['allowedgroups'] = [str(g) for g in signer.allowedgroups]
+            if WitnessScope.WitnessRules in scopes:
+                d['rules'] = signer.rules
+            signers.append(d)
+        return {
+            'hash': self.hash.to_str(), 'size': self.size, 'version': self.version, 'nonce': self.nonce,
+            'sender': self.sender.to_address(), 'sysfee': str(self.system_fee), 'netfee': str(self.network_fee),
+            'validuntilblock': self.valid_until_block, 'signers': signers, 'attributes': self.attributes,
+            'script': base64.b64encode(self.script).decode(), 'witnesses': [w.to_dict() for w in self.witnesses],
+        }
+
+    def __repr__(self):
+        return f'Transaction {self.hash} from {self.sender} sysfee={self.system_fee} netfee={self.network_fee}'
+
+
+def transaction_hash(tx: Union[str, bytes]) -> Hash256Str:
+    """
+    :param tx: base64 encoded transaction, or its bytes
+    """
+    return Transaction.from_bytes(tx if type(tx) is bytes else base64.b64decode(tx)).hash
@@ -243,26 +243,33 @@ class WitnessScope(Enum):
 
 
 class Signer:
-    def __init__(self, account: Union[Hash160Str, str, int], scopes: WitnessScope = WitnessScope.CalledByEntry,
+    def __init__(self, account: Union[Hash160Str, str, int], scopes: Union[WitnessScope, List[WitnessScope]] = WitnessScope.CalledByEntry,
                  allowedcontracts: Union[List[Hash160Str], Hash160Str] = None,
                  allowedgroups: Union[List[PublicKeyStr], PublicKeyStr] = None,
                  rules: Union[List[dict], dict] = None):
+        """
+        :param scopes: a WitnessScope, or a list of them for combined scopes, e.g. [WitnessScope.CalledByEntry, WitnessScope.CustomContracts]
+        """
         self.account: Hash160Str = Hash160Str.from_str_or_int(account)
-        self.scopes: WitnessScope = scopes
-        if self.scopes == WitnessScope.CustomContracts and not allowedcontracts:
+        self.scopes: Union[WitnessScope, List[WitnessScope]] = scopes
+        scope_list = self.scope_list()
+        if WitnessScope.CustomContracts in scope_list and not allowedcontracts:
             print('WARNING! You did not allow any contract to use your signature.')
-        if self.scopes == WitnessScope.CustomGroups and not allowedgroups:
+        if WitnessScope.CustomGroups in scope_list and not allowedgroups:
             print('WARNING! You did not allow any public key account to use your signature.')
-        if self.scopes == WitnessScope.WitnessRules and not rules:
+        if WitnessScope.WitnessRules in scope_list and not rules:
             raise ValueError('WARNING! No rules written for WitnessRules')
         self.allowedcontracts = to_list(allowedcontracts)
         self.allowedgroups = to_list(allowedgroups)
         self.rules = to_list(rules)
+
+    def scope_list(self) -> List[WitnessScope]:
+        return list(self.scopes) if type(self.scopes) is list else [self.scopes]
     
     def to_dict(self):
         return {
             'account': str(self.account),
-            'scopes': self.scopes.value,
+            'scopes': ', '.join(scope.value for scope in self.scope_list()),
             'allowedcontracts': self.allowedcontracts,
             'allowedgroups': self.allowedgroups,
             'rules': self.rules
@@ -271,7 +278,8 @@ class Signer:
     @classmethod
     def from_dict(cls, d):
         account = Hash160Str(d['account'])
-        scopes = WitnessScope(d['scopes']) if 'scopes' in d else WitnessScope.NONE
+        scopes = [WitnessScope(s.strip()) for s in d['scopes'].split(',')] if 'scopes' in d else [WitnessScope.NONE]
+        scopes = scopes[0] if len(scopes) == 1 else scopes
         allowedcontracts = [Hash160Str(c) for c in d['allowedcontracts']] if 'allowedcontracts' in d else None
         allowedgroups = [PublicKeyStr(g) for g in d['allowedgroups']] if 'allowedgroups' in d else None
         rules = d['rules'] if 'rules' in d else None
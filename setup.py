@@ -20,4 +20,7 @@ setuptools.setup(
         'requests>=2.31.0',
     ],
     python_requires='>=3.8',
+    entry_points={
+        'console_scripts': ['fairy=neo_fairy_client.cli:main'],
+    },
 )
\ No newline at end of file
@@ -1,9 +1,9 @@
 import traceback
 import time
-from neo_fairy_client import FairyClient
+from neo_fairy_client import FairyClient, requests_session_from_environment
 from neo_fairy_client.utils import Hash256Str
 
-client = FairyClient()
+client = FairyClient(requests_session=requests_session_from_environment())
 print(client.await_confirmed_transaction(0x9861ed20088d360d1906e8671634e840e74012050efb2c4aa8b6a9e84b459141))  # exists on mainnet
 print(start_time := time.time())
 try:
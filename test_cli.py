@@ -0,0 +1,98 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from neo_fairy_client.cli import main
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+from neo_fairy_client.utils.nef import NefFile
+
+# importing the package and the command line loads neither the client nor requests
+loaded = subprocess.run([sys.executable, '-c', 'import sys, neo_fairy_client, neo_fairy_client.cli; '
+                                               'print("requests" in sys.modules, "neo_fairy_client.rpc.fairy_client" in sys.modules)'],
+                        capture_output=True, text=True, check=True).stdout.split()
+assert loaded == ['False', 'False'], loaded
+import neo_fairy_client
+assert neo_fairy_client.FairyClient is neo_fairy_client.rpc.fairy_client.FairyClient
+assert neo_fairy_client.types.Hash160Str is neo_fairy_client.Hash160Str  # submodules are still attributes
+assert 'EndpointPool' in dir(neo_fairy_client)
+# star imports bind the submodules they bound before names were imported lazily
+star_namespace = dict()
+exec('from neo_fairy_client import *', star_namespace)
+assert {'rpc', 'utils', 'fairy_client', 'types', 'interpreters', 'misc', 'timers', 'oracle', 'FairyClient'} <= set(star_namespace)
+assert star_namespace['fairy_client'] is neo_fairy_client.rpc.fairy_client and star_namespace['timers'] is neo_fairy_client.utils.timers
+try:
+    neo_fairy_client.NoSuchName
+    raise AssertionError('unknown attribute')
+except AttributeError:
+    pass
+
+wallet = '0x' + '22' * 20
+contract = '0x' + '33' * 20
+directory = tempfile.mkdtemp()
+nef_path = os.path.join(directory, 'Sample.nef')
+with open(nef_path, 'wb') as f:
+    f.write(NefFile(b'\x40').to_bytes())
+with open(os.path.join(directory, 'Sample.manifest.json'), 'w') as f:
+    json.dump({'name': 'Sample', 'abi': {'methods': [{'name': 'main', 'parameters': [], 'returntype': 'Void', 'offset': 0, 'safe': False}],
+                                        'events': []}, 'permissions': []}, f)
+
+
+def fairy(*argv: str, expected_status: int = 0):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        status = main(['--url', server.url, *argv])
+    assert status == expected_status, (argv, status, stderr.getvalue())
+    return json.loads(stdout.getvalue()) if status == 0 else stderr.getvalue()
+
+
+with FairyStubServer() as server:
+    assert fairy('hello') == {'hello': 'fairy'}
+    assert fairy('blockcount') == 1000
+    assert fairy('snapshots', 'new', 'a', 'b') == {'a': True, 'b': True}
+    assert fairy('-s', 'c', 'snapshots', 'new') == {'c': True}
+    assert fairy('snapshots', 'copy', 'a', 'd') == {'a': 'd'}
+    assert fairy('snapshots', 'rename', 'b', 'e') == {'b': 'e'}
+    assert fairy('snapshots', 'delete', 'c') == {'c': True}
+    assert sorted(fairy('snapshots')) == ['a', 'd', 'e']
+    assert 'needs the old and the new name' in fairy('snapshots', 'copy', 'a', expected_status=1)
+
+    server.snapshots['a'][contract] = {'AWs=': 'dg==', 'Ams=': 'dw==', 'Ag==': 'eA=='}  # 016b: 76, 026b: 77, 02: 78
+    assert fairy('-s', 'a', 'storage', contract) == {'016b': '76', '026b': '77', '02': '78'}
+    assert fairy('-s', 'a', 'storage', contract, '--prefix', '02') == {'026b': '77', '02': '78'}
+    assert fairy('-s', 'a', 'storage', contract, '--prefix', 'AQ==', '--encoding', 'base64') == {'AWs=': 'dg=='}
+    assert 'needs a fairy session' in fairy('storage', contract, expected_status=1)
+
+    assert [b['index'] for b in fairy('blocks', '3', '5')] == [3, 4, 5]
+    assert [b['index'] for b in fairy('blocks', '7')] == [7]
+
+    contract_hash = fairy('-s', 'a', '-w', wallet, 'deploy', nef_path, '--no-dumpnef', '--no-debug-info')
+    assert contract_hash in server.contracts['a']
+    # a deploy cache skips deploying again in later runs
+    cache_path = os.path.join(directory, 'deploy_cache.json')
+    assert fairy('-s', 'd', '-w', wallet, 'deploy', nef_path, '--no-dumpnef', '--deploy-cache', cache_path) == contract_hash
+    assert fairy('-s', 'd', '-w', wallet, 'deploy', nef_path, '--no-dumpnef', '--deploy-cache', cache_path) == contract_hash
+    assert server.method_counts['virtualdeploy'] == 2
+    assert 'Contract Already Exists' in fairy('-s', 'a', '-w', wallet, 'deploy', nef_path, '--no-dumpnef', expected_status=1)
+
+    invocations = []
+    server.set_response('invokefunctionwithsession', lambda params: invocations.append(params) or server.halt_result(b'\xff\x01'))
+    assert fairy('-s', 'a', '-w', wallet, 'invoke', contract_hash, 'transfer', wallet, 'NVbGwMfRQVudTjWAUJwj4K68yyfXjmgbPp',
+                 '100', '[1, "x"]', 'text', '--relay') == 'ff01'
+    session, relay, scripthash, method, params, signers = invocations[-1]
+    assert (session, relay, scripthash, method) == ('a', True, contract_hash, 'transfer')
+    assert [p['type'] for p in params] == ['Hash160', 'Hash160', 'Integer', 'Array', 'String']
+    assert signers[0]['account'] == wallet
+    fairy('-s', 'a', '-w', wallet, 'invoke', contract_hash, 'balanceOf', wallet)
+    assert invocations[-1][1] is False
+
+    server.set_response('hellofairy', lambda params: 1 / 0)
+    assert 'ZeroDivisionError' in fairy('hello', expected_status=1)
+
+# the module and the console script entry point run the same command line
+with FairyStubServer() as server:
+    completed = subprocess.run([sys.executable, '-m', 'neo_fairy_client', '--url', server.url, 'blockcount'],
+                               capture_output=True, text=True)
+    assert completed.returncode == 0 and completed.stdout == '1000\n', completed
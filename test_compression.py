@@ -0,0 +1,64 @@
+import base64
+import os
+import tempfile
+import requests
+from neo_fairy_client import FairyClient, Hash160Str, HttpCompression, EndpointPool, make_transport, RecordingSession, ReplaySession
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+
+wallet = Hash160Str('0xd2cefc96ad5cb7b625a0986ef6badde0533731d5')
+value = b'\x01\x02\x03\x04' * 50_000
+
+with FairyStubServer(compress_responses_above=1024) as server:
+    for name in ['requests', 'urllib3', 'http.client']:
+        compression = HttpCompression(compress_requests_above=16 * 1024)
+        client = server.client(wallet, fairy_session='compressed',
+                               requests_session=make_transport(name), compression=compression)
+        # large responses are received compressed
+        blocks = client.get_many_blocks([0, 499])
+        assert len(blocks) == 500 and blocks[499]['index'] == 499
+        assert compression.response_bytes_received * 2 < compression.response_bytes, (name, compression)
+        # small requests and responses are not compressed
+        requests_before, saved_before = compression.compressed_requests, compression.bytes_saved
+        assert client.get_block_count() == 1000
+        assert compression.compressed_requests == requests_before and compression.bytes_saved == saved_before
+        # large requests are sent compressed
+        client.put_storage_with_session(b'key', value, contract_scripthash=wallet)
+        assert compression.compressed_requests == 1
+        assert client.get_storage_with_session(b'key', contract_scripthash=wallet)[base64.b64encode(b'key').decode()] == base64.b64encode(value).decode()
+        assert compression.request_bytes_sent * 100 < compression.request_bytes and compression.bytes_saved > 0
+        # through an endpoint pool too
+        pool_client = FairyClient(EndpointPool([server.url]), wallet, with_print=False, requests_session=make_transport(name), compression=compression)
+        received, decoded = compression.response_bytes_received, compression.response_bytes
+        assert len(pool_client.get_many_blocks([0, 499])) == 500
+        assert (compression.response_bytes_received - received) * 2 < compression.response_bytes - decoded
+
+# servers without support for compressed requests get them again uncompressed, and no more compressed requests
+with FairyStubServer(accept_compressed_requests=False) as server:
+    compression = HttpCompression(compress_requests_above=16 * 1024)
+    client = server.client(wallet, fairy_session='plain', compression=compression, requests_session=requests.Session())
+    server.body_count = 0
+    client.put_storage_with_session(b'key', value, contract_scripthash=wallet)
+    assert server.body_count == 2 and compression.compressed_requests_rejected[server.url]
+    client.put_storage_with_session(b'key', value, contract_scripthash=wallet)
+    assert server.body_count == 3 and compression.compressed_requests == 0
+    assert client.get_storage_with_session(b'key', contract_scripthash=wallet)[base64.b64encode(b'key').decode()] == base64.b64encode(value).decode()
+    # and responses are not compressed by this server
+    assert compression.response_bytes_received == compression.response_bytes
+
+# compressed requests are recorded and replayed by their decompressed bodies
+path = os.path.join(tempfile.mkdtemp(), 'compressed.json.gz')
+with FairyStubServer() as server:
+    with RecordingSession(path, requests.Session()) as recorder:
+        compression = HttpCompression(compress_requests_above=10)
+        client = server.client(wallet, fairy_session='recorded', compression=compression, requests_session=recorder)
+        client.put_storage_with_session(b'key', value, contract_scripthash=wallet)
+        stored = client.get_storage_with_session(b'key', contract_scripthash=wallet)
+        assert compression.compressed_requests >= 2
+compression = HttpCompression(compress_requests_above=10)
+client = FairyClient(wallet_address_or_scripthash=wallet, fairy_session='recorded', with_print=False,
+                     compression=compression, requests_session=ReplaySession(path))
+client.put_storage_with_session(b'key', value, contract_scripthash=wallet)
+assert client.get_storage_with_session(b'key', contract_scripthash=wallet) == stored
+# requests compressed or not are the same request
+client.compression = None
+assert client.get_storage_with_session(b'key', contract_scripthash=wallet) == stored
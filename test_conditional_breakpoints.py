@@ -0,0 +1,103 @@
+import io
+import json
+import zipfile
+from neo_fairy_client import Hash160Str, VMState, ConditionalBreakpoint, ConditionalDebugger
+from neo_fairy_client.rpc.stub_server import FairyStubServer, StubRpcError
+
+contract = Hash160Str('0x' + '11' * 20)
+iterations = 300
+# the contract loops `for (i = 0; i < iterations; i++) { total += i; Log(i); }`, visiting ip 10 and then ip 20 in each iteration
+trace = [(ip, i) for i in range(iterations) for ip in (10, 20)]
+debug_json = {
+    'documents': ['Loop.cs'],
+    'methods': [{'name': 'Loop.Contract,main', 'range': '0-30', 'params': [], 'return': 'Void', 'variables': ['i,Integer,0', 'total,Integer,1'],
+                 'sequence-points': ['0[0]5:5-5:6', '10[0]7:13-7:24', '20[0]8:13-8:20', '30[0]9:5-9:6']}],
+}
+buffer = io.BytesIO()
+with zipfile.ZipFile(buffer, 'w') as z:
+    z.writestr('Loop.debug.json', json.dumps(debug_json))
+
+
+class ScriptedDebugger:
+    def __init__(self):
+        self.breakpoints = set()
+        self.position = -1
+
+    def set_breakpoints(self, params):
+        self.breakpoints |= set(params[1:])
+        return sorted(self.breakpoints)
+
+    def delete_breakpoints(self, params):
+        self.breakpoints -= set(params[1:])
+        return sorted(self.breakpoints)
+
+    def result(self):
+        if self.position >= len(trace):
+            return {'state': 'HALT', 'breakreason': 'None', 'scripthash': str(contract), 'contractname': 'Loop', 'instructionpointer': 30,
+                    'sourcefilename': None, 'sourcelinenum': None, 'sourcecontent': None}
+        ip, i = trace[self.position]
+        return {'state': 'BREAK', 'breakreason': 'AssemblyBreakpoint', 'scripthash': str(contract), 'contractname': 'Loop',
+                'instructionpointer': ip, 'sourcefilename': 'Loop.cs', 'sourcelinenum': 7 if ip == 10 else 8, 'sourcecontent': ''}
+
+    def debug_continue(self, params=None):
+        self.position += 1
+        while self.position < len(trace) and trace[self.position][0] not in self.breakpoints:
+            self.position += 1
+        return self.result()
+
+    def restart(self, params):
+        self.position = -1
+        return {**self.debug_continue(), 'exception': None, 'stack': []}
+
+    def frame(self, field):
+        def handler(params):
+            if self.position >= len(trace) or params[1] > 0:
+                raise StubRpcError('No context')
+            ip, i = trace[self.position]
+            value = {'ip': [ip], 'locals': [i, sum(range(i))], 'empty': []}[field]
+            return {'stack': [FairyStubServer.stack_item(v) for v in value]}
+        return handler
+
+
+vm = ScriptedDebugger()
+with FairyStubServer() as server:
+    server.set_response('setassemblybreakpoints', vm.set_breakpoints)
+    server.set_response('deleteassemblybreakpoints', vm.delete_breakpoints)
+    server.set_response('debugfunctionwithsession', vm.restart)
+    server.set_response('debugcontinue', vm.debug_continue)
+    server.set_response('getinvocationstack', lambda params: [str(contract)])
+    server.set_response('getinstructionpointer', vm.frame('ip'))
+    server.set_response('getlocalvariables', vm.frame('locals'))
+    server.set_response('getarguments', vm.frame('empty'))
+    server.set_response('getstaticfields', vm.frame('empty'))
+    server.set_response('getevaluationstack', vm.frame('empty'))
+    client = server.client(contract_scripthash=contract, fairy_session='conditional')
+    client.register_debug_info(contract, buffer.getvalue())
+
+    logs = []
+    debugger = ConditionalDebugger(client, [
+        ConditionalBreakpoint(('Loop.cs', 7), condition=lambda frame: frame.named_variables()['i'] == 250),
+        ConditionalBreakpoint(20, condition=lambda frame: frame.named_variables()['i'] % 100 == 0, log_message='i={i} total={total}'),
+    ], log=logs.append)
+    debugger.install()
+    assert vm.breakpoints == {10, 20}  # the source line is resolved locally to ip 10
+    bodies_before = server.body_count
+    rpc_breakpoint = debugger.run(client.debug_function_with_session('main', []))
+    assert rpc_breakpoint.instruction_pointer == 10 and debugger.frame.named_variables()['i'] == 250
+    assert logs == ['i=0 total=0', 'i=100 total=4950', 'i=200 total=19900']
+    # 1 round trip for debugfunction, 1 for the state at the first break, 1 per break after it
+    assert server.body_count - bodies_before == 2 + 250 * 2
+    debugger.uninstall()
+    assert vm.breakpoints == set()
+
+    # hit counts
+    debugger = ConditionalDebugger(client, [ConditionalBreakpoint(10, condition=lambda frame: frame.local_variables[0] % 2 == 1, hit_count=3)])
+    debugger.install()
+    rpc_breakpoint = debugger.run(client.debug_function_with_session('main', []), uninstall=True)
+    assert debugger.frame.local_variables[0] == 5 and debugger.breakpoints[0].hits == 3
+    assert vm.breakpoints == set()
+
+    # runs to the end if no condition holds
+    debugger = ConditionalDebugger(client, [ConditionalBreakpoint(20, condition=lambda frame: False)])
+    debugger.install()
+    assert debugger.run(client.debug_function_with_session('main', [])).state == VMState.HALT
@@ -0,0 +1,56 @@
+import base64
+import json
+from neo_fairy_client import Hash160Str, ContractManagementAddress
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+from neo_fairy_client.utils.nef import NefFile
+
+wallet_scripthash = Hash160Str('0x' + '22' * 20)
+nef_file = NefFile(b'\x40' * 16)  # RET
+nef = nef_file.to_bytes()
+manifest = json.dumps({
+    'name': 'Sample', 'groups': [], 'features': {}, 'supportedstandards': [], 'permissions': [], 'trusts': [], 'extra': None,
+    'abi': {'methods': [
+        {'name': 'balanceOf', 'parameters': [{'name': 'owner', 'type': 'Hash160'}], 'returntype': 'Integer', 'offset': 0, 'safe': True},
+        {'name': 'balanceOf', 'parameters': [{'name': 'owner', 'type': 'Hash160'}, {'name': 'tokenId', 'type': 'ByteArray'}], 'returntype': 'Integer', 'offset': 10, 'safe': True},
+    ], 'events': []},
+})
+
+with FairyStubServer() as server:
+    client = server.client(wallet_scripthash, fairy_session='metadata', cache_contract_metadata=True)
+    contract_hash = client.virtual_deploy(nef, manifest)
+    metadata = client.get_contract_metadata(contract_hash)
+    assert server.method_counts.get('getcontract', 0) == 0  # known from the deploy
+    assert metadata.name == 'Sample' and metadata.nef_checksum == nef_file.checksum
+    assert metadata.get_abi_method('balanceOf', 2)['offset'] == 10
+    assert metadata.get_abi_method('balanceOf')['offset'] == 0 and metadata.get_abi_method('transfer') is None
+
+    assert client.get_contract(contract_hash)['manifest']['name'] == 'Sample'
+    client.previous_raw_result = None
+    assert client.get_contract(contract_hash)['manifest']['name'] == 'Sample'
+    assert server.method_counts['getcontract'] == 1
+    assert client.previous_raw_result['result']['hash'] == str(contract_hash)  # cache hits set previous results too
+
+    # without opting in, contract states are always read from the server, e.g. after another client updates them
+    plain_client = server.client(wallet_scripthash, fairy_session='metadata', auto_preparation=False)
+    assert plain_client.contract_metadata_cache is None
+    plain_client.get_contract(contract_hash)
+    server.contracts['metadata'][str(contract_hash)]['updatecounter'] = 1
+    assert plain_client.get_contract(contract_hash)['updatecounter'] == 1
+    assert server.method_counts['getcontract'] == 3
+
+    # relayed invocations updating the contract drop its metadata
+    update_notification = {'contract': str(ContractManagementAddress), 'eventname': 'Update', 'state': {
+        'type': 'Array', 'value': [{'type': 'ByteString', 'value': base64.b64encode(contract_hash.to_UInt160()._data).decode()}]}}
+    halt = server.halt_result(None)
+    halt['notifications'] = [update_notification]
+    server.set_response('invokefunctionwithsession', halt)
+    client.invokefunction_of_any_contract(contract_hash, 'balanceOf', [wallet_scripthash], relay=False)
+    client.get_contract(contract_hash)
+    assert server.method_counts['getcontract'] == 3
+    client.invokefunction_of_any_contract(contract_hash, 'update', [nef, manifest], relay=True)
+    client.get_contract(contract_hash)
+    assert server.method_counts['getcontract'] == 4
+
+    # renewing the snapshot drops everything of the session
+    client.new_snapshots_from_current_system()
+    assert client.contract_metadata_cache.get('metadata', contract_hash) is None
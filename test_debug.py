@@ -2,7 +2,7 @@
 # because the assembly instructions can differ from compilers and optimizers
 from neo_fairy_client.rpc import FairyClient
 from neo_fairy_client.utils.types import Hash160Str, Signer, WitnessScope
-from neo_fairy_client import VMState
+from neo_fairy_client import VMState, requests_session_from_environment
 
 target_url = 'http://127.0.0.1:16868'
 wallet_address = 'Nb2CHYY5wTh2ac58mTue5S3wpG6bQv5hSY'
@@ -15,7 +15,8 @@ lender = Signer(wallet_scripthash, scopes=WitnessScope.Global)
 borrower = Signer(borrower_scripthash, scopes=WitnessScope.Global)
 
 fairy_session = 'debug'
-client = FairyClient(target_url, wallet_address, with_print=True, fairy_session=fairy_session, signers=lender)
+client = FairyClient(target_url, wallet_address, with_print=True, fairy_session=fairy_session, signers=lender,
+                     requests_session=requests_session_from_environment())
 client.new_snapshots_from_current_system()
 client.set_gas_balance(100_0000_0000)
 test_nopht_d_hash = Hash160Str('0x9ffb143877c7a0776f3b0dc88f55c4ad16c689c6')
@@ -0,0 +1,92 @@
+import io
+import json
+import os
+import tempfile
+import time
+import zipfile
+from neo_fairy_client import NefFile, DebugInfoIndex
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+
+debug_json = {
+    'hash': '0x' + '00' * 20,
+    'documents': ['C:\\contracts\\Sample\\Sample.cs', '/home/dev/Sample/Helper.cs'],
+    'static-variables': ['owner,Hash160,0', 'counter,Integer,1'],
+    'methods': [
+        {'id': '0', 'name': 'Sample.Contract,add', 'range': '0-12', 'params': ['a,Integer,0', 'b,Integer,1'], 'return': 'Integer',
+         'variables': ['sum,Integer,0'],
+         'sequence-points': ['0[0]10:5-10:6', '3[0]11:9-11:25', '8[0]12:9-12:20', '11[0]13:5-13:6']},
+        {'id': '1', 'name': 'Sample.Helper,double', 'range': '13-20', 'params': ['x,Integer'], 'return': 'Integer',
+         'variables': [], 'sequence-points': ['13[1]5:5-5:30', '18[1]5:5-5:30']},
+    ],
+    'events': [],
+}
+buffer = io.BytesIO()
+with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as z:
+    z.writestr('Sample.debug.json', json.dumps(debug_json))
+nefdbgnfo = buffer.getvalue()
+dumpnef = '''# Method Start Sample.Contract.add
+# Code Sample.cs line 10: "{"
+0000 INITSLOT 01-02 # 1 local variables, 2 arguments
+# Code Sample.cs line 11: "var sum = a + b;"
+0003 LDARG0
+0004 LDARG1
+0005 ADD
+0006 STLOC0
+0007 NOP
+# Code Sample.cs line 12: "return sum;"
+0008 LDLOC0
+0009 NOP
+000A NOP
+# Code Sample.cs line 13: "}"
+000B NOP
+000C RET
+'''
+
+index = DebugInfoIndex.from_nefdbgnfo(nefdbgnfo, dumpnef)
+assert index.method_at(5).name == 'add' and index.method_at(5).namespace == 'Sample.Contract'
+assert index.method_at(13).name == 'double' and index.method_at(21) is None
+assert index.sequence_point_at(5).start_line == 11 and index.sequence_point_at(8).start_line == 12
+assert index.source_line_at(6) == ('C:\\contracts\\Sample\\Sample.cs', 11, 'var sum = a + b;')
+assert index.source_line_at(15)[1] == 5
+assert index.instruction_pointers_of_line('Sample.cs', 11) == [3]
+assert index.instruction_pointers_of_line('/home/dev/Sample/Helper.cs', 5) == [13, 18]
+assert index.instruction_pointers_of_line('Sample.cs', 99) == []
+assert index.variable_names(4) == {'arguments': ['a', 'b'], 'locals': ['sum'], 'statics': ['owner', 'counter']}
+assert index.variable_names(14)['arguments'] == ['x']
+assert index.instruction_at(5) == ('ADD', '')
+assert index.filenames() == debug_json['documents']
+assert DebugInfoIndex.from_nefdbgnfo(json.dumps(debug_json).encode()).method_at(0).name == 'add'
+
+# lookups are local and O(log n)
+many_methods = {'documents': ['a.cs'], 'methods': [
+    {'name': f'A,m{i}', 'range': f'{i * 10}-{i * 10 + 9}', 'params': [], 'variables': [],
+     'sequence-points': [f'{i * 10 + j}[0]{i * 10 + j}:1-{i * 10 + j}:2' for j in range(0, 10, 2)]}
+    for i in range(10000)]}
+big_index = DebugInfoIndex(many_methods)
+start = time.perf_counter()
+for ip in range(0, 100000, 7):
+    assert big_index.method_at(ip).name == f'm{ip // 10}'
+    big_index.sequence_point_at(ip)
+assert time.perf_counter() - start < 1
+
+directory = tempfile.mkdtemp()
+nef_path = os.path.join(directory, 'Sample.nef')
+with open(nef_path, 'wb') as f:
+    f.write(NefFile(b'\x21' * 12 + b'\x40').to_bytes())
+with open(os.path.join(directory, 'Sample.manifest.json'), 'w') as f:
+    json.dump({'name': 'Sample', 'abi': {'methods': [{'name': 'add', 'parameters': [{'name': 'a', 'type': 'Integer'}, {'name': 'b', 'type': 'Integer'}],
+                                                      'returntype': 'Integer', 'offset': 0, 'safe': False}], 'events': []}, 'permissions': []}, f)
+with open(os.path.join(directory, 'Sample.nefdbgnfo'), 'wb') as f:
+    f.write(nefdbgnfo)
+time.sleep(0.01)
+with open(f'{nef_path}.txt', 'w') as f:
+    f.write(dumpnef)
+
+with FairyStubServer() as server:
+    client = server.client(fairy_session='debug-info')
+    contract_hash = client.virutal_deploy_from_path(nef_path)
+    index = client.get_debug_info_index()
+    assert index is client.get_debug_info_index(contract_hash)
+    assert index.method_at(5).name == 'add'
+    client.delete_debug_info(contract_hash)
+    assert client.get_debug_info_index(contract_hash) is None
@@ -0,0 +1,63 @@
+import io
+import json
+import zipfile
+from neo_fairy_client import Hash160Str
+from neo_fairy_client.rpc.stub_server import FairyStubServer, StubRpcError
+
+contract = Hash160Str('0x' + '11' * 20)
+caller = Hash160Str('0x' + '33' * 20)
+debug_json = {
+    'documents': ['Sample.cs'], 'static-variables': ['owner,Hash160,0'],
+    'methods': [{'name': 'Sample.Contract,add', 'range': '0-12', 'params': ['a,Integer,0', 'b,Integer,1'], 'return': 'Integer',
+                 'variables': ['sum,Integer,0'], 'sequence-points': ['0[0]10:5-10:6', '3[0]11:9-11:25', '8[0]12:9-12:20']}],
+}
+buffer = io.BytesIO()
+with zipfile.ZipFile(buffer, 'w') as z:
+    z.writestr('Sample.debug.json', json.dumps(debug_json))
+
+frames = [  # (scripthash, instruction pointer, locals, arguments)
+    (contract, 5, [7], [3, 4]),
+    (caller, 40, [], [b'caller']),
+]
+
+
+def frame_handler(field):
+    def handler(params):
+        session, index = params
+        if index >= len(frames):
+            raise StubRpcError(f'Invocation stack index {index} out of range')
+        value = {'ip': [frames[index][1]], 'locals': frames[index][2], 'args': frames[index][3], 'statics': [b'\x01' * 20], 'eval': [1, 2]}[field]
+        return {'stack': [FairyStubServer.stack_item(v) for v in value]}
+    return handler
+
+
+with FairyStubServer() as server:
+    server.set_response('getinvocationstack', lambda params: [{'scripthash': str(f[0]), 'instructionpointer': f[1]} for f in frames])
+    server.set_response('getinstructionpointer', lambda params: [frames[params[1]][1]])
+    server.set_response('getlocalvariables', frame_handler('locals'))
+    server.set_response('getarguments', frame_handler('args'))
+    server.set_response('getstaticfields', frame_handler('statics'))
+    server.set_response('getevaluationstack', frame_handler('eval'))
+    server.set_response('getvariablenamesandvalues', lambda params: {'sum': 7})
+    client = server.client(fairy_session='debug-state')
+    client.register_debug_info(contract, buffer.getvalue())
+    owner = client.parse_single_item(FairyStubServer.stack_item(b'\x01' * 20))
+
+    bodies_before = server.body_count
+    state = client.debug_state(depth=3, with_variable_names_and_values=True)
+    assert server.body_count - bodies_before == 1
+    assert len(state) == 2  # only 2 contexts in the invocation stack
+    top = state[0]
+    assert top.scripthash == contract and top.instruction_pointer == 5
+    assert top.local_variables == [7] and top.arguments == [3, 4] and top.evaluation_stack == [1, 2]
+    assert top.method.name == 'add' and top.source_line[:2] == ('Sample.cs', 11)
+    assert top.named_variables() == {'owner': owner, 'a': 3, 'b': 4, 'sum': 7}
+    assert top.variable_names_and_values == {'sum': 7}
+    assert state[1].scripthash == caller and state[1].method is None and state[1].arguments == [client.parse_single_item(FairyStubServer.stack_item(b'caller'))]
+
+    frames.clear()
+    try:
+        client.debug_state()
+        raise AssertionError('errors of the current context should be raised')
+    except ValueError:
+        pass
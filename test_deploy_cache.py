@@ -0,0 +1,51 @@
+import json
+import os
+import tempfile
+import time
+from neo_fairy_client import Hash160Str, DeployCache
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+from neo_fairy_client.utils.nef import NefFile
+
+wallet_scripthash = Hash160Str('0x' + '22' * 20)
+main_method = {'name': 'main', 'parameters': [], 'returntype': 'Void', 'offset': 0, 'safe': False}
+directory = tempfile.mkdtemp()
+nef_path = os.path.join(directory, 'Sample.nef')
+with open(nef_path, 'wb') as f:
+    f.write(NefFile(b'\x40').to_bytes())
+with open(os.path.join(directory, 'Sample.manifest.json'), 'w') as f:
+    json.dump({'name': 'Sample', 'abi': {'methods': [main_method], 'events': []}, 'permissions': []}, f)
+with open(os.path.join(directory, 'Sample.nefdbgnfo'), 'wb') as f:
+    f.write(b'PK debug info')
+time.sleep(0.01)
+with open(os.path.join(directory, 'Sample.nef.txt'), 'w') as f:
+    f.write('0 RET')
+index_path = os.path.join(directory, 'deploy_cache.json')
+
+with FairyStubServer() as server:
+    client = server.client(wallet_scripthash, fairy_session='deploy-cache',
+                           deploy_cache=DeployCache(index_path))
+    contract_hash = client.virutal_deploy_from_path(nef_path)
+    assert server.method_counts['virtualdeploy'] == 1 and server.method_counts['setdebuginfo'] == 1
+    assert client.virutal_deploy_from_path(nef_path) == contract_hash
+    assert server.method_counts['virtualdeploy'] == 1 and server.method_counts['setdebuginfo'] == 1
+
+    # another run with the same index file and the same live session
+    client = server.client(wallet_scripthash, fairy_session='deploy-cache',
+                           deploy_cache=DeployCache(index_path), auto_preparation=False)
+    assert client.virutal_deploy_from_path(nef_path) == contract_hash
+    assert server.method_counts['virtualdeploy'] == 1 and server.method_counts['setdebuginfo'] == 1
+
+    # a rebuilt .nef with identical content does not trigger dumpnef, which would overwrite .nef.txt
+    os.utime(nef_path, (time.time() + 10, time.time() + 10))
+    client.virutal_deploy_from_path(nef_path)
+    with open(os.path.join(directory, 'Sample.nef.txt')) as f:
+        assert f.read() == '0 RET'
+
+    # the renewed snapshot does not have the contract anymore
+    client.new_snapshots_from_current_system()
+    assert client.virutal_deploy_from_path(nef_path) == contract_hash
+    assert server.method_counts['virtualdeploy'] == 2 and server.method_counts['setdebuginfo'] == 1
+
+    client.delete_debug_info(contract_hash)
+    client.virutal_deploy_from_path(nef_path)
+    assert server.method_counts['setdebuginfo'] == 2
@@ -1,8 +1,8 @@
 from typing import Dict, List, Tuple, Union
 import base64
-from neo_fairy_client import FairyClient, NeoAddress, GasAddress, Hash160Str, PublicKeyStr
+from neo_fairy_client import FairyClient, NeoAddress, GasAddress, Hash160Str, PublicKeyStr, requests_session_from_environment
 
-client = FairyClient()
+client = FairyClient(requests_session=requests_session_from_environment())
 
 gas_storage: Dict[str, str] = client.find_storage_with_session('', contract_scripthash=GasAddress)
 gas_storage: List[Tuple[Hash160Str, str]] = [
@@ -0,0 +1,70 @@
+import requests
+from neo_fairy_client import FairyClient, EndpointPool, Hash160Str
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+
+wallet = Hash160Str('0xd2cefc96ad5cb7b625a0986ef6badde0533731d5')
+slow, fast, medium = FairyStubServer(latency=0.03).start(), FairyStubServer().start(), FairyStubServer(latency=0.01).start()
+servers = [slow, fast, medium]
+try:
+    pool = EndpointPool([s.url for s in servers], retry_after=60)
+    client = FairyClient(pool, wallet, fairy_session='affine', with_print=False, requests_session=requests.Session())
+    # the session is created on the primary node, and stays there
+    assert slow.method_counts['newsnapshotsfromcurrentsystem'] == 1 and pool.url_of_session('affine') == slow.url
+    for _ in range(30):
+        client.get_block_count()
+    # each node is measured once, then the fastest one takes the read-only calls
+    assert fast.method_counts['getblockcount'] >= 27, [s.method_counts.get('getblockcount') for s in servers]
+    client.invokefunction_of_any_contract(wallet, 'balanceOf', [wallet])
+    assert slow.method_counts['invokefunctionwithsession'] == 1
+    assert 'invokefunctionwithsession' not in fast.method_counts and 'invokefunctionwithsession' not in medium.method_counts
+    client.meta_rpc_batch([('copysnapshot', ['affine', 'copied']), ('invokefunctionwithsession', ['copied', False, str(wallet), 'symbol', [], []])])
+    assert pool.url_of_session('copied') == slow.url and slow.method_counts['invokefunctionwithsession'] == 2
+    # calls without session changing the node go to the primary node
+    client.meta_rpc_batch([('listdebuginfo', [])])
+    assert slow.method_counts['listdebuginfo'] == 1
+
+    # failover of read-only calls
+    fast.stop()
+    client.requests_session.close()  # drop kept-alive connections, still served after stop
+    assert client.get_block_count() == 1000
+    assert not pool.endpoints[1].healthy and pool.endpoints[1].failures == 1
+    count = medium.method_counts['getblockcount']
+    client.get_block_count()
+    assert medium.method_counts['getblockcount'] == count + 1 and pool.endpoints[1].failures == 1  # the node down is not tried again
+
+    # iterators are traversed on the node that created them
+    medium.set_response('invokefunction', lambda params: {**medium.halt_result(0), 'session': 'iterator-session'})
+    slow.set_response('traverseiterator', lambda params: ['slow'])
+    medium.set_response('traverseiterator', lambda params: ['medium'])
+    client.meta_rpc_batch([('invokefunction', [str(wallet), 'tokens', [], []])])
+    assert client.meta_rpc_batch([('traverseiterator', ['iterator-session', 'id', 10])])[0] == ['medium']
+
+    # health checks mark lagging nodes down, and nodes back in sync up
+    medium.block_count = 900
+    assert pool.check_health() == [pool.endpoints[0]]
+    assert pool.endpoints[0].block_count == 1000 and pool.endpoints[1].block_count is None and not pool.endpoints[2].healthy
+    medium.block_count = 1000
+    assert pool.check_health() == [pool.endpoints[0], pool.endpoints[2]]
+
+    # sessions do not fail over: their snapshots are on the node down
+    slow.stop()
+    client.requests_session.close()
+    try:
+        client.invokefunction_of_any_contract(wallet, 'balanceOf', [wallet])
+        raise AssertionError('session call sent to another node')
+    except requests.RequestException:
+        pass
+    assert pool.primary is pool.endpoints[2]
+    # until the session is created again, on the new primary node
+    client.new_snapshots_from_current_system('affine')
+    assert pool.url_of_session('affine') == medium.url
+    client.invokefunction_of_any_contract(wallet, 'balanceOf', [wallet])
+    assert medium.method_counts['invokefunctionwithsession'] == 1
+    client.delete_snapshots('affine')
+    assert 'affine' not in pool.sessions
+finally:
+    for s in servers:
+        try:
+            s.stop()
+        except Exception:
+            pass
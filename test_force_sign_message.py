@@ -1,7 +1,8 @@
 import neo_fairy_client
-from neo_fairy_client import FairyClient, NamedCurveHash
+from neo_fairy_client import FairyClient, NamedCurveHash, requests_session_from_environment
 
-c = FairyClient(target_url='http://localhost:16868', fairy_session='force sign message', auto_preparation=False)
+c = FairyClient(target_url='http://localhost:16868', fairy_session='force sign message', auto_preparation=False,
+                requests_session=requests_session_from_environment())
 msg = b'a'
 for namedCurveHash in NamedCurveHash.secp256r1SHA256, NamedCurveHash.secp256r1Keccak256:
     print(sig := c.force_sign_message(msg, namedCurveHash))
@@ -1,5 +1,6 @@
 from neo_fairy_client.rpc.fairy_client import FairyClient, ContractManagementAddress, Hash160Str
+from neo_fairy_client import requests_session_from_environment
 
-client = FairyClient(function_default_relay=False)
+client = FairyClient(function_default_relay=False, requests_session=requests_session_from_environment())
 print(result := client.invokefunction_of_any_contract(ContractManagementAddress, 'getContract', [Hash160Str("0xef4073a0f2b305a38ec4050e4d3d28bc40ea63f5")]))
 print(result_fairy_contract := client.get_contract(Hash160Str("0xef4073a0f2b305a38ec4050e4d3d28bc40ea63f5")))
\ No newline at end of file
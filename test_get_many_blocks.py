@@ -1,6 +1,6 @@
-from neo_fairy_client import FairyClient, Hash160Str
+from neo_fairy_client import FairyClient, Hash160Str, requests_session_from_environment
 
-client = FairyClient()
+client = FairyClient(requests_session=requests_session_from_environment())
 start, end = 3080019, 3080932
 results = client.get_many_blocks([start, end])
 assert len(results) == end - start + 1
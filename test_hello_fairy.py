@@ -1,4 +1,4 @@
-from neo_fairy_client import FairyClient
+from neo_fairy_client import FairyClient, requests_session_from_environment
 
-c = FairyClient()
+c = FairyClient(requests_session=requests_session_from_environment())
 print(c.hello_fairy())
\ No newline at end of file
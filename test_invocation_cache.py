@@ -0,0 +1,68 @@
+from neo_fairy_client import Hash160Str, InvocationCache, Signer
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+
+wallet_scripthash = Hash160Str('0x' + '22' * 20)
+contract = Hash160Str('0x' + '11' * 20)
+
+with FairyStubServer() as server:
+    balances = {'value': 100}
+    server.set_response('invokefunctionwithsession', lambda params: server.halt_result([balances['value']]))
+    client = server.client(wallet_scripthash, fairy_session='cache',
+                           invocation_cache=InvocationCache(maxsize=16))
+
+    def count():
+        return server.method_counts.get('invokefunctionwithsession', 0)
+
+    before = count()
+    assert client.invokefunction_of_any_contract(contract, 'balanceOf', [wallet_scripthash], relay=False) == [100]
+    result = client.invokefunction_of_any_contract(contract, 'balanceOf', [wallet_scripthash], relay=False)
+    assert result == [100] and count() == before + 1
+    result.append('modifying the returned list does not modify the cache')
+    assert client.invokefunction_of_any_contract(contract, 'balanceOf', [wallet_scripthash], relay=False) == [100]
+    assert client.invocation_cache.hits == 2
+    # different params, signers or session are different keys
+    client.invokefunction_of_any_contract(contract, 'balanceOf', [contract], relay=False)
+    client.invokefunction_of_any_contract(contract, 'balanceOf', [wallet_scripthash], relay=False, signers=Signer(contract))
+    assert count() == before + 3
+
+    balances['value'] = 50
+    client.invokefunction_of_any_contract(contract, 'transfer', [wallet_scripthash, contract, 50, None], relay=True)
+    assert client.invokefunction_of_any_contract(contract, 'balanceOf', [wallet_scripthash], relay=False) == [50]
+    balances['value'] = 0
+    client.put_storage_with_session(b'\x01', 1, contract_scripthash=contract)
+    assert client.invokefunction_of_any_contract(contract, 'balanceOf', [wallet_scripthash], relay=False) == [0]
+    balances['value'] = 1
+    client.set_gas_balance(1)
+    assert client.invokefunction_of_any_contract(contract, 'balanceOf', [wallet_scripthash], relay=False) == [1]
+
+    client.get_storage_with_session(b'\x01', contract_scripthash=contract)
+    client.get_storage_with_session(b'\x01', contract_scripthash=contract)
+    assert server.method_counts['getstoragewithsession'] == 1
+    client.get_storage_with_session(b'\x01', contract_scripthash=contract, debug=True)
+    client.get_storage_with_session(b'\x01', contract_scripthash=contract, debug=True)
+    assert server.method_counts['getstoragewithsession'] == 3
+
+    # a relayed debug run writes the session when it finishes, after debugcontinue
+    def debug_result(state):
+        return {'state': state, 'breakreason': 'AssemblyBreakpoint' if state == 'BREAK' else 'None', 'scripthash': str(contract),
+                'contractname': 'Token', 'instructionpointer': 0, 'sourcefilename': None, 'sourcelinenum': None,
+                'sourcecontent': None, 'exception': None, 'stack': []}
+
+    def finish_debug_run(params):
+        balances['value'] = 77
+        return debug_result('HALT')
+
+    assert client.invokefunction_of_any_contract(contract, 'balanceOf', [wallet_scripthash], relay=False) == [1]
+    server.set_response('debugfunctionwithsession', lambda params: debug_result('BREAK'))
+    server.set_response('debugcontinue', finish_debug_run)
+    client.debug_any_function_with_session(contract, 'transfer', [wallet_scripthash, contract, 1, None], relay=True)
+    assert client.invokefunction_of_any_contract(contract, 'balanceOf', [wallet_scripthash], relay=False) == [1]
+    client.debug_continue()
+    assert client.invokefunction_of_any_contract(contract, 'balanceOf', [wallet_scripthash], relay=False) == [77]
+    assert not client.relayed_debug_sessions
+    # debug runs without relay change nothing
+    before = count()
+    client.debug_any_function_with_session(contract, 'transfer', [wallet_scripthash, contract, 1, None], relay=False)
+    client.debug_continue()
+    assert client.invokefunction_of_any_contract(contract, 'balanceOf', [wallet_scripthash], relay=False) == [77]
+    assert count() == before
@@ -1,5 +1,5 @@
-from neo_fairy_client import FairyClient, ContractManagementAddress, Hash160Str
+from neo_fairy_client import FairyClient, ContractManagementAddress, Hash160Str, requests_session_from_environment
 
-c = FairyClient(contract_scripthash=ContractManagementAddress)
+c = FairyClient(contract_scripthash=ContractManagementAddress, requests_session=requests_session_from_environment())
 print(c.list_contracts())
 # print(c.list_contracts(verbose=True))
\ No newline at end of file
@@ -0,0 +1,104 @@
+import json
+import time
+from neo_fairy_client import Hash160Str, NefFile, MethodToken, validate_manifest, validate_contract
+from neo_fairy_client.utils.nef import method_offsets
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+
+# INITSLOT 0 1; LDARG0; JMPIFNOT +3; PUSH1; RET; PUSH0; RET
+script = bytes([0x57, 0x00, 0x01, 0x78, 0x26, 0x04, 0x11, 0x40, 0x10, 0x40])
+nef_file = NefFile(script, compiler='neo-fairy-client test', source='https://github.com/Hecate2/neo-fairy-client',
+                   tokens=[MethodToken('0xd2a4cff31913016155e38e474a2c06d08be276cf', 'transfer', 4, True, 0x0F)])
+nef = nef_file.to_bytes()
+parsed = NefFile.from_bytes(nef)
+assert parsed.compiler == 'neo-fairy-client test' and parsed.source == 'https://github.com/Hecate2/neo-fairy-client'
+assert parsed.tokens == nef_file.tokens and parsed.script == script and parsed.checksum == nef_file.checksum
+assert parsed.to_bytes() == nef
+assert parsed.instruction_offsets() == [0, 3, 4, 6, 7, 8, 9]
+
+
+def manifest_with(**changes) -> dict:
+    manifest = {
+        'name': 'Sample', 'groups': [], 'features': {}, 'supportedstandards': ['NEP-17'], 'trusts': [], 'extra': None,
+        'permissions': [{'contract': '0xd2a4cff31913016155e38e474a2c06d08be276cf', 'methods': ['transfer']}],
+        'abi': {'methods': [
+            {'name': 'isPositive', 'parameters': [{'name': 'n', 'type': 'Integer'}], 'returntype': 'Boolean', 'offset': 0, 'safe': True},
+            {'name': 'zero', 'parameters': [], 'returntype': 'Integer', 'offset': 8, 'safe': True},
+        ], 'events': [{'name': 'Transfer', 'parameters': [{'name': 'from', 'type': 'Hash160'}]}]},
+    }
+    manifest.update(changes)
+    return manifest
+
+
+def rejected(nef: bytes, manifest: dict, reason: str):
+    try:
+        validate_contract(nef, json.dumps(manifest))
+    except ValueError as e:
+        assert reason in str(e), e
+        return
+    raise AssertionError(f'not rejected: {reason}')
+
+
+parsed, warnings = validate_contract(nef, json.dumps(manifest_with()))
+assert warnings == []
+assert method_offsets(manifest_with()) == {('isPositive', 1): 0, ('zero', 0): 8}
+
+corrupted = bytearray(nef)
+corrupted[-6] ^= 0xFF
+rejected(bytes(corrupted), manifest_with(), 'checksum')
+rejected(b'NEF2' + nef[4:], manifest_with(), 'magic')
+rejected(nef[:-1], manifest_with(), 'end of data')
+rejected(NefFile(b'\xFF').to_bytes(), manifest_with(), 'Unknown opcode')
+rejected(NefFile(bytes([0x22, 0x01, 0x40])).to_bytes(), manifest_with(), 'jumps to')
+
+abi = manifest_with()['abi']
+abi['methods'][1]['offset'] = 10
+rejected(nef, manifest_with(abi=abi), 'outside script')
+abi['methods'][1]['offset'] = 1
+rejected(nef, manifest_with(abi=abi), 'not the start of an instruction')
+abi['methods'][1] = dict(abi['methods'][0])
+rejected(nef, manifest_with(abi=abi), 'Duplicate abi method isPositive')
+rejected(nef, manifest_with(abi={'methods': [], 'events': []}), 'abi.methods is empty')
+rejected(nef, manifest_with(name=''), 'non-empty name')
+rejected(nef, manifest_with(features={'storage': True}), 'Features')
+rejected(nef, manifest_with(permissions=[{'contract': 'NeoToken', 'methods': '*'}]), 'Invalid contract in permission')
+
+warnings = validate_manifest(manifest_with(permissions=[{'contract': '*', 'methods': '*'}]), nef)
+assert len(warnings) == 1 and 'wildcard' in warnings[0]
+
+# fast enough for every deploy
+big_nef = NefFile(b'\x21' * 100_000 + b'\x40').to_bytes()
+start = time.perf_counter()
+validate_contract(big_nef, json.dumps(manifest_with()))
+assert time.perf_counter() - start < 1
+
+# invalid contracts are sent with a warning by default, and rejected before any RPC on request
+with FairyStubServer() as server:
+    server.set_response('virtualdeploy', lambda params: {params[0]: '0x' + '44' * 20})
+    client = server.client(fairy_session='nef')
+    client.virtual_deploy(bytes(corrupted), json.dumps(manifest_with()))
+    assert server.method_counts['virtualdeploy'] == 1
+    client = server.client(fairy_session='nef', reject_invalid_contracts=True)
+    try:
+        client.virtual_deploy(bytes(corrupted), json.dumps(manifest_with()))
+        raise AssertionError('invalid NEF deployed')
+    except ValueError:
+        pass
+    assert server.method_counts['virtualdeploy'] == 1
+    client.virtual_deploy(nef, json.dumps(manifest_with()))
+    assert server.method_counts['virtualdeploy'] == 2
+
+# native contracts are deployed by the zero sender with checksum 0
+from neo_fairy_client import compute_contract_hash, NeoAddress, GasAddress, StdLibAddress, Signer
+from neo_fairy_client.utils.crypto import _ripemd160_python, hash160
+assert compute_contract_hash(Hash160Str.zero(), 0, 'NeoToken') == NeoAddress
+assert compute_contract_hash(Hash160Str.zero(), 0, 'GasToken') == GasAddress
+assert compute_contract_hash(Hash160Str.zero(), 0, {'name': 'StdLib'}) == StdLibAddress
+assert _ripemd160_python(b'abc').hex() == '8eb208f7e05d987a9b044a8e98c6b087f15a0bfc'
+assert hash160(b'') == _ripemd160_python(bytes.fromhex('e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855'))
+
+with FairyStubServer() as server:
+    client = server.client(fairy_session='predict')
+    predicted = client.predict_contract_hash(nef, json.dumps(manifest_with()))
+    assert predicted == compute_contract_hash(client.wallet_scripthash, nef_file, 'Sample')
+    assert client.predict_contract_hash(nef, 'Sample', signers=Signer(Hash160Str('0x' + '33' * 20))) != predicted
+    assert client.virtual_deploy(nef, json.dumps(manifest_with())) == predicted
@@ -0,0 +1,72 @@
+import base64
+from neo_fairy_client import NetworkFeeEstimator, RelayPipeline, Transaction, Signer, Hash160Str
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+
+alice = Hash160Str('0xd2cefc96ad5cb7b625a0986ef6badde0533731d5')
+bob = Hash160Str('0x' + '11' * 20)
+witness_costs = {str(alice): 1_0000 * 108 + 30 * 32784, str(bob): 1_0000 * 300 + 30 * 100_000}
+policy = {'getFeePerByte': 1_0000, 'getExecFeeFactor': 30}
+
+
+def calculate_network_fee(params):
+    # as the node does: size of the transaction without witnesses, plus the witnesses of each signer
+    tx = Transaction.from_base64(params[0])
+    size = len(tx.unsigned_bytes()) + 1
+    notary = sum((a['nkeys'] + 1) * 1000_0000 for a in tx.attributes if a['type'] == 'NotaryAssisted')
+    return {'networkfee': str(policy['getFeePerByte'] * size + sum(witness_costs[str(s.account)] for s in tx.signers) + notary)}
+
+
+def expected(tx: Transaction) -> int:
+    return int(calculate_network_fee([tx.to_base64()])['networkfee'])
+
+
+with FairyStubServer() as server:
+    server.set_response('calculatenetworkfee', calculate_network_fee)
+    server.set_response('invokefunction', lambda params: server.halt_result(policy[params[1]]))
+    client = server.client(alice)
+    transactions = [Transaction(bytes([0x11]) * n, [Signer(alice)], 1000_0000, 0, 5000, n) for n in range(1, 301)] \
+        + [Transaction(bytes([0x12]) * n, [Signer(alice), Signer(bob)], 0, 0, 5000, n) for n in range(1, 101)] \
+        + [Transaction(b'\x11', [Signer(alice)], attributes=[{'type': 'NotaryAssisted', 'nkeys': 2}])]
+    server.body_count = 0
+    assert client.estimate_network_fee(transactions) == [expected(tx) for tx in transactions]
+    # one request: the policy, and one calculatenetworkfee for each of the 3 signer sets
+    assert server.body_count == 1 and server.method_counts['calculatenetworkfee'] == 3
+    estimator = client.network_fee_estimator
+    assert estimator.fee_per_byte == 1_0000 and estimator.exec_fee_factor == 30
+    assert estimator.local_estimates == len(transactions) - 3 and estimator.rpc_estimates == 3
+    tx = Transaction(bytes([0x11]) * 1000, [Signer(alice)], nonce=7)
+    assert client.estimate_network_fee(tx.to_base64()) == expected(tx) and server.body_count == 1
+
+    # revalidation after revalidate_every estimates, and reading the policy again when it disagrees
+    estimator = NetworkFeeEstimator(client, revalidate_every=5)
+    for tx in transactions[:6]:
+        assert estimator.estimate(tx) == expected(tx)
+    assert estimator.rpc_estimates == 1 and estimator.local_estimates == 5
+    policy['getFeePerByte'] = 2_0000
+    assert estimator.estimate(transactions[6]) == expected(transactions[6])  # revalidated
+    assert estimator.mismatches == 1 and estimator.rpc_estimates == 2
+    assert estimator.estimate(transactions[7]) == expected(transactions[7])  # policy read again, signer set learned again
+    assert estimator.fee_per_byte == 2_0000 and estimator.rpc_estimates == 3
+    assert estimator.estimate(transactions[8]) == expected(transactions[8]) and estimator.rpc_estimates == 3
+
+    # without the policy, FeePerByte is learned from two sizes
+    estimator = NetworkFeeEstimator(client, read_policy=False)
+    assert estimator.estimate_many(transactions[:50]) == [expected(tx) for tx in transactions[:50]]
+    assert estimator.rpc_estimates == 50 and estimator.fee_per_byte is None
+    assert estimator.signer_sets[estimator.signer_set_key(transactions[0])].fee_per_byte == 2_0000
+    assert estimator.estimate_many(transactions[50:100]) == [expected(tx) for tx in transactions[50:100]]
+    assert estimator.rpc_estimates == 50
+    estimator = NetworkFeeEstimator(client, read_policy=False)
+    estimator.learn(transactions[0], expected(transactions[0]))
+    estimator.learn(transactions[1].to_base64(), expected(transactions[1]))
+    assert estimator.estimate(transactions[2]) == expected(transactions[2]) and estimator.rpc_estimates == 2
+
+    # signing many transactions with estimated fees
+    server.set_response('forcesigntransaction', lambda params: {'tx': params[1], 'networkfee': params[4], 'txHash': '0x' + '00' * 32})
+    client.network_fee_estimator = None
+    client.fairy_session = 'load'
+    scripts = [base64.b64encode(bytes([0x11]) * n).decode() for n in range(1, 20)]
+    server.body_count = 0
+    transactions = RelayPipeline(client).sign_many(scripts, network_fee=None, valid_until_block=100)
+    assert transactions == scripts and server.body_count == 2
+    assert client.network_fee_estimator.rpc_estimates == 1 and client.network_fee_estimator.local_estimates == 18
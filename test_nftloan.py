@@ -2,6 +2,7 @@ import json
 from neo_fairy_client.rpc import FairyClient
 from neo_fairy_client.utils.types import Hash160Str, Signer, WitnessScope
 from neo_fairy_client.utils.timers import gen_timestamp_and_date_str_in_seconds
+from neo_fairy_client import requests_session_from_environment
 
 target_url = 'http://127.0.0.1:16868'
 wallet_address = 'Nb2CHYY5wTh2ac58mTue5S3wpG6bQv5hSY'
@@ -33,8 +34,9 @@ with open('../NFTLoan/NFTLoan/bin/sc/NFTFlashLoan.manifest.json', 'r') as f:
 FAULT_MESSAGE = 'ASSERTMSG is executed with false result.'
 
 fairy_session = 'NophtD'
-lender_client = FairyClient(target_url, wallet_address, fairy_session=fairy_session, signers=lender, with_print=True)
-borrower_client = FairyClient(target_url, borrower_address, fairy_session=fairy_session, signers=borrower, with_print=True)
+requests_session = requests_session_from_environment()  # shared, so that both clients are recorded in one file
+lender_client = FairyClient(target_url, wallet_address, fairy_session=fairy_session, signers=lender, with_print=True, requests_session=requests_session)
+borrower_client = FairyClient(target_url, borrower_address, fairy_session=fairy_session, signers=borrower, with_print=True, requests_session=requests_session)
 print('#### CHECKLIST BEFORE TEST')
 print(lender_client.delete_snapshots(lender_client.list_snapshots()))
 print(lender_client.new_snapshots_from_current_system())
@@ -5,13 +5,15 @@ from neo_fairy_client.rpc import FairyClient
 from neo_fairy_client.utils.types import Hash160Str, Signer, WitnessScope
 from neo_fairy_client.utils.interpreters import Interpreter
 from neo_fairy_client.utils.oracle import OracleRequest
+from neo_fairy_client import requests_session_from_environment
 
 target_url = 'http://127.0.0.1:16868'
 wallet_address = 'Nb2CHYY5wTh2ac58mTue5S3wpG6bQv5hSY'
 wallet_scripthash = Hash160Str.from_address(wallet_address)
 
 fairy_session = 'oracle'
-client = FairyClient(target_url, wallet_address, fairy_session=fairy_session, with_print=True)
+client = FairyClient(target_url, wallet_address, fairy_session=fairy_session, with_print=True,
+                     requests_session=requests_session_from_environment())
 
 client.delete_snapshots(client.list_snapshots())
 client.new_snapshots_from_current_system()
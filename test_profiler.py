@@ -0,0 +1,89 @@
+import io
+import json
+import os
+import tempfile
+import zipfile
+from neo_fairy_client import Hash160Str, ExecutionTrace, ExecutionProfile, ScriptBuilder
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+from neo_fairy_client.utils.nef import NefFile
+from neo_fairy_client.utils.opcodes import OpCode
+
+contract = Hash160Str('0x' + '11' * 20)
+debug_json = {'documents': ['/src/Loop.cs'], 'methods': [
+    {'name': 'Loop.Contract,main', 'range': '0-7', 'params': [], 'return': 'Void', 'sequence-points': ['0[0]1:9-1:18', '1[0]2:13-2:17', '3[0]3:18-3:23', '7[0]4:5-4:6']},
+    {'name': 'Loop.Contract,helper', 'range': '8-9', 'params': [], 'return': 'Void', 'sequence-points': ['8[0]6:9-6:18']},
+]}
+buffer = io.BytesIO()
+with zipfile.ZipFile(buffer, 'w') as z:
+    z.writestr('Loop.debug.json', json.dumps(debug_json))
+dumpnef = '# Code Loop.cs line 2: "i++;"\n0001 INC\n# Code Loop.cs line 3: "while (i < 3);"\n0003 PUSH3'
+lines = {0: 1, 1: 2, 2: 2, 3: 3, 4: 3, 5: 3, 7: 4, 8: 6, 9: 6}
+prices = {0: 30, 1: 120, 2: 60, 3: 30, 4: 240, 5: 60, 7: 0, 8: 30, 9: 0}
+
+
+def trace_of(path):
+    trace = ExecutionTrace('main', 'HALT')
+    gas = 0
+    for ip in path:
+        trace.append(str(contract), ip, '/src/Loop.cs', lines[ip], None, gas)
+        gas += prices[ip]
+    trace.final_gas = gas
+    return trace
+
+
+with FairyStubServer() as server:
+    client = server.client(contract_scripthash=contract)
+    client.register_debug_info(contract, buffer.getvalue(), dumpnef)
+    profile = ExecutionProfile(client)
+    profile.add_trace(trace_of([0] + [1, 2, 3, 4, 5] * 3 + [8, 9, 7]))
+    profile.add_trace(trace_of([0, 1, 2, 3, 4, 5, 8, 9, 7]))
+
+    line_2 = profile.lines[(str(contract), '/src/Loop.cs', 2)]
+    assert (line_2.entries, line_2.instructions, line_2.gas) == (4, 8, 4 * 180)
+    line_3 = profile.lines[(str(contract), '/src/Loop.cs', 3)]
+    assert (line_3.entries, line_3.instructions, line_3.gas) == (4, 12, 4 * 330)
+    assert profile.total_gas == 2 * 30 + 4 * 180 + 4 * 330 + 2 * 30
+    assert profile.total_instructions == 28 and profile.traces == 2
+
+    main = profile.methods[(str(contract), 'Loop.Contract.main')]
+    helper = profile.methods[(str(contract), 'Loop.Contract.helper')]
+    # main is entered at the start, and again when helper returns
+    assert (main.entries, helper.entries) == (4, 2)
+    assert helper.gas == 2 * 30 and main.gas + helper.gas == profile.total_gas
+
+    assert [e.location[1] for e in profile.hot_spots()] == [3, 2, 1, 6, 4]
+    assert profile.hot_spots(1, by='instructions', methods=True)[0] is main
+    table = profile.format_hot_spots(3)
+    assert table.splitlines()[1].split() == ['1320', '61.1%', '4', '12', 'Loop.cs:3', 'while', '(i', '<', '3);']
+    assert 'Loop.Contract.helper' in profile.format_hot_spots(methods=True)
+
+    # source code from dumpnef, from an argument, or from the file
+    annotated = profile.annotate_source('Loop.cs').splitlines()
+    assert annotated[1].split() == ['4', '720', '2', 'i++;'] and annotated[0].split() == ['2', '60', '1']
+    source = 'int i = 0;\ndo { i++;\n} while (i < 3);\nreturn;\n\nhelper();'
+    annotated = profile.annotate_source('/src/Loop.cs', source=source).splitlines()
+    assert len(annotated) == 6 and annotated[4].split() == ['5'] and annotated[5].split() == ['2', '60', '6', 'helper();']
+    path = os.path.join(tempfile.mkdtemp(), 'Loop.cs')
+    with open(path, 'w') as f:
+        f.write(source)
+    assert profile.annotate_source(path).splitlines() == annotated
+
+    # the last step of a trace is charged up to the final gas of the trace
+    profile = ExecutionProfile(client)
+    profile.add_trace(trace_of([0, 1, 2, 3, 4]))
+    assert profile.total_gas == 30 + 120 + 60 + 30 + 240
+    assert profile.lines[(str(contract), '/src/Loop.cs', 3)].gas == 30 + 240
+
+    # or with the price of its instruction, from the NEF of the contract
+    session_client = server.client(fairy_session='profile')
+    script = ScriptBuilder().emit(OpCode.PUSH0).emit(OpCode.INC).emit(OpCode.RET).to_bytes()
+    manifest = {'name': 'Inc', 'abi': {'methods': [{'name': 'main', 'parameters': [], 'returntype': 'Void', 'offset': 0, 'safe': False}],
+                                       'events': []}, 'permissions': []}
+    inc = session_client.virtual_deploy(NefFile(script).to_bytes(), json.dumps(manifest))
+    trace = ExecutionTrace('main', 'BREAK')
+    trace.append(str(inc), 0, gas=0)
+    trace.append(str(inc), 1, gas=30)
+    profile = ExecutionProfile(session_client)
+    profile.add_trace(trace)
+    assert profile.total_gas == 30 + 4 * 30
+    assert profile.methods[(str(inc), '(unknown)')].gas == 150
@@ -1,6 +1,7 @@
 import json
 from neo_fairy_client.rpc import FairyClient
 from neo_fairy_client.utils.types import Hash160Str
+from neo_fairy_client import requests_session_from_environment
 
 target_url = 'http://127.0.0.1:16868'
 wallet_address = 'Nb2CHYY5wTh2ac58mTue5S3wpG6bQv5hSY'
@@ -14,7 +15,8 @@ with open('getRandomContract.manifest.json', 'r') as f:
     manifest = json.dumps(manifest_dict, separators=(',', ':'))
 
 fairy_session = 'random'
-client = FairyClient(target_url, wallet_address, fairy_session=fairy_session, with_print=False)
+client = FairyClient(target_url, wallet_address, fairy_session=fairy_session, with_print=False,
+                     requests_session=requests_session_from_environment())
 client.new_snapshots_from_current_system()
 client.set_gas_balance(100_0000_0000)
 client.contract_scripthash = client.virtual_deploy(nef_file, manifest)
@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+from neo_fairy_client import FairyClient, RecordingSession, ReplaySession, Hash160Str
+
+
+class CountingSession:
+    """pretends to be a Fairy server whose block count grows on every call"""
+    def __init__(self):
+        self.block_count = 0
+
+    def post(self, url, data=None, timeout=None, verify=True):
+        self.block_count += 1
+        request = json.loads(data)
+        if request['method'] == 'getblockcount':
+            result = self.block_count
+        else:
+            result = {'state': 'HALT', 'gasconsumed': '1000', 'exception': None, 'stack': [{'type': 'Integer', 'value': '7'}]}
+        return type('Response', (), {'text': json.dumps({'jsonrpc': '2.0', 'id': request['id'], 'result': result})})
+
+
+path = os.path.join(tempfile.mkdtemp(), 'traffic.json.gz')
+with RecordingSession(path, CountingSession()) as recorder:
+    client = FairyClient(requests_session=recorder, with_print=False, function_default_relay=False)
+    assert client.get_block_count() == 1
+    assert client.get_block_count() == 2
+    assert client.invokefunction_of_any_contract(Hash160Str.zero(), 'balanceOf', [Hash160Str.zero()]) == 7
+
+client = FairyClient(requests_session=ReplaySession(path), with_print=False, function_default_relay=False)
+assert client.invokefunction_of_any_contract(Hash160Str.zero(), 'balanceOf', [Hash160Str.zero()]) == 7
+assert client.get_block_count() == 1
+assert client.get_block_count() == 2
+assert client.get_block_count() == 2  # the last response repeats
+assert client.previous_gas_consumed == 1000
+try:
+    client.invokefunction_of_any_contract(Hash160Str.zero(), 'totalSupply')
+    raise AssertionError('unrecorded requests should not be served')
+except ValueError:
+    pass
+
+# recording and replaying by environment variables is opt-in: importing the client changes nothing
+import subprocess
+import sys
+from neo_fairy_client import requests_session_from_environment
+from neo_fairy_client.rpc import fairy_client
+
+environment_path = os.path.join(tempfile.mkdtemp(), 'environment.json.gz')
+loaded = subprocess.run([sys.executable, '-c', 'import requests; from neo_fairy_client.rpc import fairy_client; '
+                                               'print(type(fairy_client.default_requests_session) is requests.Session)'],
+                        env={**os.environ, 'FAIRY_RECORD': environment_path}, capture_output=True, text=True, check=True)
+assert loaded.stdout.split() == ['True'] and not os.path.exists(environment_path)
+os.environ.pop('FAIRY_RECORD', None)
+os.environ.pop('FAIRY_REPLAY', None)
+assert requests_session_from_environment() is fairy_client.default_requests_session
+os.environ['FAIRY_RECORD'] = environment_path
+recorder = requests_session_from_environment(CountingSession())
+assert type(recorder) is RecordingSession and type(recorder.requests_session) is CountingSession
+os.environ['FAIRY_REPLAY'] = path
+assert type(requests_session_from_environment()) is ReplaySession
+del os.environ['FAIRY_RECORD'], os.environ['FAIRY_REPLAY']
@@ -0,0 +1,114 @@
+import io
+import json
+import os
+import tempfile
+import zipfile
+from neo_fairy_client import ExecutionTrace, ScriptBuilder
+from neo_fairy_client.rpc.stub_server import FairyStubServer, StubRpcError
+from neo_fairy_client.utils.nef import NefFile
+from neo_fairy_client.utils.opcodes import OpCode
+
+# i = 0; do { i++; } while (i < 3);
+script = ScriptBuilder().emit(OpCode.PUSH0).emit(OpCode.INC).emit(OpCode.DUP).emit(OpCode.PUSH3).emit(OpCode.LT) \
+    .emit(OpCode.JMPIF, (-4).to_bytes(1, 'little', signed=True)).emit(OpCode.RET).to_bytes()
+manifest = {'name': 'Loop', 'abi': {'methods': [{'name': 'main', 'parameters': [], 'returntype': 'Void', 'offset': 0, 'safe': False}], 'events': []},
+            'permissions': []}
+debug_json = {'documents': ['/src/Loop.cs'], 'methods': [{'name': 'Loop.Contract,main', 'range': '0-7', 'params': [], 'return': 'Void',
+                                                          'sequence-points': ['0[0]5:9-5:18', '1[0]6:13-6:17', '3[0]7:18-7:23', '7[0]8:5-8:6']}]}
+buffer = io.BytesIO()
+with zipfile.ZipFile(buffer, 'w') as z:
+    z.writestr('Loop.debug.json', json.dumps(debug_json))
+stack_depths = {0: 0, 1: 1, 2: 1, 3: 2, 4: 3, 5: 2, 7: 1}
+
+
+class SteppingVM:
+    def __init__(self, loops: int):
+        self.path = [0] + [1, 2, 3, 4, 5] * loops + [7]
+        self.breakpoints = set()
+        self.position = 0
+
+    def result(self):
+        if self.position >= len(self.path):
+            return {'state': 'HALT', 'breakreason': 'None', 'scripthash': str(self.contract), 'contractname': 'Loop', 'instructionpointer': 8,
+                    'sourcefilename': None, 'sourcelinenum': None, 'sourcecontent': None, 'exception': None}
+        return {'state': 'BREAK', 'breakreason': 'None', 'scripthash': str(self.contract), 'contractname': 'Loop',
+                'instructionpointer': self.path[self.position], 'sourcefilename': None, 'sourcelinenum': None, 'sourcecontent': None}
+
+    def debug_function(self, params):
+        assert 0 in self.breakpoints
+        self.position = 0
+        return {**self.result(), 'breakreason': 'AssemblyBreakpoint', 'exception': None, 'stack': []}
+
+    def step_into(self, params):
+        if self.position >= len(self.path):
+            raise StubRpcError('Execution ended')
+        self.position += 1
+        return self.result()
+
+    def evaluation_stack(self, params):
+        if self.position >= len(self.path):
+            raise StubRpcError('No context')
+        return {'stack': [FairyStubServer.stack_item(1)] * stack_depths[self.path[self.position]]}
+
+
+def serve(server: FairyStubServer, vm: SteppingVM):
+    server.set_response('listassemblybreakpoints', lambda params: sorted(vm.breakpoints))
+    server.set_response('setassemblybreakpoints', lambda params: vm.breakpoints.update(params[1:]) or sorted(vm.breakpoints))
+    server.set_response('deleteassemblybreakpoints', lambda params: vm.breakpoints.difference_update(params[1:]) or sorted(vm.breakpoints))
+    server.set_response('debugfunctionwithsession', vm.debug_function)
+    server.set_response('debugstepinto', vm.step_into)
+    server.set_response('getevaluationstack', vm.evaluation_stack)
+
+
+with FairyStubServer() as server:
+    client = server.client(fairy_session='trace', cache_contract_metadata=True)
+    contract = client.virtual_deploy(NefFile(script).to_bytes(), json.dumps(manifest))
+    client.register_debug_info(contract, buffer.getvalue())
+    client.contract_scripthash = contract
+    vm = SteppingVM(loops=3)
+    vm.contract = contract
+    serve(server, vm)
+
+    bodies_before = server.body_count
+    trace = client.record_trace('main', step_batch_size=8)
+    assert trace.final_state == 'HALT' and len(trace) == len(vm.path)
+    assert list(trace.instruction_pointers) == vm.path
+    assert [row.stack_depth for row in trace] == [stack_depths[ip] for ip in vm.path]
+    assert trace[0] == (str(contract), 0, '/src/Loop.cs', 5, 0, 0)
+    assert [row.source_line for row in trace][:6] == [5, 6, 6, 7, 7, 7]
+    # fixed prices of PUSH0, INC, DUP, PUSH3, LT, JMPIF times the default ExecFeeFactor
+    assert trace[6].gas == (1 + 4 + 2 + 1 + 8 + 2) * 30
+    # RET is free, so the execution ends with the gas consumed before it
+    assert trace.final_gas == trace[-1].gas == (1 + 3 * (4 + 2 + 1 + 8 + 2)) * 30
+    assert vm.breakpoints == set()
+    # list + set + debugfunction + delete breakpoints, and ceil(17 / 8) batches of steps
+    assert server.body_count - bodies_before == 4 + 3
+
+    lines = client.record_trace('main', only_source_line_changes=True, record_stack_depth=False)
+    assert [row.source_line for row in lines] == [5, 6, 7, 6, 7, 6, 7, 8]
+    assert lines[1].stack_depth is None and lines[-1].gas == trace[-1].gas
+
+    partial = client.record_trace('main', max_steps=5)
+    assert partial.final_state == 'BREAK' and len(partial) == 6
+    assert partial.final_gas == partial[-1].gas  # the instruction at the break is not executed
+
+    # recording a trace does not write the session, unless asked to
+    relay_flags = []
+    server.set_response('debugfunctionwithsession', lambda params: relay_flags.append(params[1]) or vm.debug_function(params))
+    client.function_default_relay = True
+    client.record_trace('main', max_steps=1)
+    client.record_trace('main', max_steps=1, relay=True)
+    assert relay_flags == [False, True]
+    server.set_response('debugfunctionwithsession', vm.debug_function)
+
+    directory = tempfile.mkdtemp()
+    trace.save(os.path.join(directory, 'v1.trace.json.gz'))
+    loaded = ExecutionTrace.load(os.path.join(directory, 'v1.trace.json.gz'))
+    assert list(loaded) == list(trace) and loaded.final_state == 'HALT' and loaded.final_gas == trace.final_gas
+    assert loaded.diff(trace) == []
+
+    # another version of the contract loops once more
+    vm.path = [0] + [1, 2, 3, 4, 5] * 4 + [7]
+    v2 = client.record_trace('main')
+    assert loaded.diff(v2) == [('insert', 7, 7, 7, 9)]
+    assert loaded.diff(v2, by_instruction_pointer=True) == [('insert', 16, 16, 16, 21)]
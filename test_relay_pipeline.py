@@ -0,0 +1,76 @@
+import base64
+import hashlib
+import threading
+import time
+from neo_fairy_client import RelayPipeline
+from neo_fairy_client.rpc.relay import classify_relay_error
+from neo_fairy_client.rpc.stub_server import FairyStubServer, StubRpcError
+
+transactions = [base64.b64encode(b'tx' + i.to_bytes(4, 'little')).decode() for i in range(100)]
+mempool_full_once = set(transactions[10:20])  # the mempool is full at their first submission
+insufficient_funds = transactions[30]
+already_in_pool = transactions[40]
+in_flight, max_in_flight = 0, 0
+lock = threading.Lock()
+
+
+def send_raw_transaction(params):
+    global in_flight, max_in_flight
+    tx = params[0]
+    with lock:
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+    try:
+        time.sleep(0.01)
+        with lock:
+            if tx in mempool_full_once:
+                mempool_full_once.remove(tx)
+                raise StubRpcError('MempoolCapReached', code=-502)
+        if tx == insufficient_funds:
+            raise StubRpcError('InsufficientFunds', code=-511)
+        if tx == already_in_pool:
+            raise StubRpcError('AlreadyInPool', code=-503)
+        return {'hash': '0x' + hashlib.sha256(base64.b64decode(tx)).digest()[::-1].hex()}
+    finally:
+        with lock:
+            in_flight -= 1
+
+
+assert classify_relay_error(ValueError({'code': -502, 'message': 'MempoolCapReached'})) == 'retry'
+assert classify_relay_error(ValueError('OutOfMemory')) == 'retry'
+assert classify_relay_error(ValueError({'code': -501, 'message': 'AlreadyExists'})) == 'duplicate'
+assert classify_relay_error(ValueError({'code': -511, 'message': 'InsufficientFunds'})) == 'reject'
+
+with FairyStubServer() as server:
+    server.set_response('sendrawtransaction', send_raw_transaction)
+    client = server.client()
+
+    pipeline = RelayPipeline(client, window=8, backoff=0.01)
+    report = pipeline.relay(transactions)
+    assert report.accepted == 99 and report.rejected == 1 and report.retries == 10
+    assert max_in_flight <= 8 and max_in_flight > 1
+    assert report.results[30].status == 'rejected' and 'InsufficientFunds' in report.results[30].error
+    assert report.results[30].attempts == 1  # not retried
+    assert report.results[40].status == 'duplicate' and report.results[40].accepted
+    assert all(r.attempts == 2 and r.status == 'accepted' for r in report.results[10:20])
+    assert report.results[0].tx_hash.to_str() == '0x' + hashlib.sha256(b'tx' + bytes(4)).digest()[::-1].hex()
+    assert report.tx_per_second > 0 and 'tx/s' in repr(report)
+
+    # the rate limit applies to all submissions
+    max_in_flight = 0
+    mempool_full_once = set()
+    started = time.perf_counter()
+    report = RelayPipeline(client, window=4, rate=100).relay(transactions[:20])
+    assert time.perf_counter() - started >= 0.18 and report.accepted == 20
+
+    # retries give up after max_attempts
+    mempool_full_once = {transactions[0]}
+    server.set_error('sendrawtransaction', 'MempoolCapReached', code=-502)
+    report = RelayPipeline(client, max_attempts=3, backoff=0.001).relay(transactions[:2])
+    assert report.rejected == 2 and all(r.attempts == 3 for r in report.results)
+
+    # signing in bulk is batched
+    server.set_response('forcesigntransaction', lambda params: {'tx': 'signed ' + params[1], 'txHash': '0x' + '00' * 32})
+    bodies_before = server.body_count
+    signed = RelayPipeline(client).sign_many(['c2NyaXB0'] * 300, valid_until_block=2000, batch_size=128)
+    assert signed == ['signed c2NyaXB0'] * 300 and server.body_count - bodies_before == 3
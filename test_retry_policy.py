@@ -0,0 +1,69 @@
+import time
+import requests
+from neo_fairy_client import FairyClient, EndpointPool, RetryPolicy, Hash160Str
+from neo_fairy_client.rpc.methods import is_idempotent_call
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+
+wallet = Hash160Str('0xd2cefc96ad5cb7b625a0986ef6badde0533731d5')
+assert is_idempotent_call('getblockcount', []) and is_idempotent_call('invokefunctionwithsession', ['s', False, 'c', 'op', [], []])
+assert not is_idempotent_call('invokefunctionwithsession', ['s', True, 'c', 'op', [], []])
+assert not is_idempotent_call('sendrawtransaction', ['AA==']) and not is_idempotent_call('putstoragewithsession', ['s', 'c', 'k', 'v', False])
+
+stuck = {'getblockcount': 2, 'sendrawtransaction': 1}
+
+
+def latency(method):
+    # the first requests of these methods are stuck
+    if stuck.get(method):
+        stuck[method] -= 1
+        return 0.5
+    return 0.0
+
+
+with FairyStubServer(latency=latency) as server:
+    policy = RetryPolicy(timeout=0.1, max_attempts=3, backoff=0.01)
+    client = server.client(wallet, requests_timeout=0.1, retry_policy=policy, requests_session=requests.Session())
+    # idempotent calls time out and are sent again
+    assert client.get_block_count() == 1000
+    assert policy.retries == 2 and server.method_counts['getblockcount'] == 3
+    # other calls are sent once
+    try:
+        client.sendrawtransaction('AA==')
+        raise AssertionError('sendrawtransaction retried')
+    except requests.Timeout:
+        pass
+    time.sleep(0.5)
+    assert server.method_counts['sendrawtransaction'] == 1 and policy.retries == 2
+    # the error of the last attempt is raised
+    stuck['getblockcount'] = 3
+    try:
+        client.get_block_count()
+        raise AssertionError('expected a timeout after 3 attempts')
+    except requests.Timeout:
+        pass
+    assert policy.retries == 4
+    time.sleep(0.5)
+
+slow_once = {'fast': False}
+fast = FairyStubServer(latency=lambda method: 0.4 if slow_once['fast'] and not slow_once.update(fast=False) else 0.001).start()
+other = FairyStubServer(latency=0.01).start()
+try:
+    policy = RetryPolicy(timeout=2, hedge=True, hedge_min_samples=10)
+    client = FairyClient(EndpointPool([fast.url, other.url]), wallet, with_print=False, retry_policy=policy, requests_session=requests.Session())
+    for _ in range(20):
+        client.get_block_count()
+    assert policy.hedge_delay('getblockcount') is not None and policy.hedge_delay('getblockcount') < 0.1
+    # an occasional slow answer of the fastest node is hedged on the other node
+    slow_once['fast'] = True
+    started = time.perf_counter()
+    assert client.get_block_count() == 1000
+    assert time.perf_counter() - started < 0.3, time.perf_counter() - started
+    assert policy.hedges >= 1 and policy.hedges_won == 1
+    # a batch is hedged as a whole
+    blocks = client.meta_rpc_batch([('getblockcount', []), ('getmanyblocks', [0, 1])])
+    assert blocks[0] == 1000 and len(blocks[1]) == 2
+    time.sleep(0.5)
+finally:
+    policy.close()
+    fast.stop()
+    other.stop()
@@ -0,0 +1,101 @@
+import contextlib
+import io
+import threading
+from neo_fairy_client import Hash160Str, RpcCallEvent, RpcEventDispatcher
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+
+wallet_scripthash = Hash160Str('0x' + '22' * 20)
+contract = Hash160Str('0x' + '11' * 20)
+
+
+def event(method: str = 'getblockcount') -> RpcCallEvent:
+    return RpcCallEvent(method, 10, 20, 0.001, 'ok')
+
+
+try:
+    RpcEventDispatcher(sample_rate=1.5)
+    raise AssertionError('sample_rate above 1')
+except ValueError:
+    pass
+
+# synchronous delivery in the calling thread, in the order of subscription
+delivered = []
+dispatcher = RpcEventDispatcher([lambda e: delivered.append(('first', e.method, threading.current_thread()))])
+dispatcher.subscribe(lambda e: delivered.append(('second', e.method, threading.current_thread())))
+dispatcher.publish(event())
+assert delivered == [('first', 'getblockcount', threading.current_thread()), ('second', 'getblockcount', threading.current_thread())]
+
+
+def broken(e: RpcCallEvent):
+    raise RuntimeError('broken subscriber')
+
+
+# exceptions of subscribers are printed and do not stop the other subscribers
+dispatcher = RpcEventDispatcher([broken, lambda e: delivered.append(e.method)])
+stderr = io.StringIO()
+with contextlib.redirect_stderr(stderr):
+    dispatcher.publish(event('getmanyblocks'))
+assert delivered[-1] == 'getmanyblocks' and 'broken subscriber' in stderr.getvalue()
+dispatcher.unsubscribe(broken)
+assert len(dispatcher.subscribers) == 1
+
+# sampling
+assert not RpcEventDispatcher().sampled()  # nothing to build events for without subscribers
+assert not any(RpcEventDispatcher(print, sample_rate=0.0).sampled() for _ in range(100))
+assert all(RpcEventDispatcher(print).sampled() for _ in range(100))
+sampled = sum(RpcEventDispatcher(print, sample_rate=0.5).sampled() for _ in range(2000))
+assert 700 < sampled < 1300, sampled
+
+# asynchronous delivery in a background thread; flush waits for the queued events
+delivered = []
+dispatcher = RpcEventDispatcher(lambda e: delivered.append((e.method, threading.current_thread())), asynchronous=True)
+for i in range(10):
+    dispatcher.publish(event(f'method{i}'))
+dispatcher.flush()
+assert [method for method, _ in delivered] == [f'method{i}' for i in range(10)]
+assert all(thread is not threading.current_thread() for _, thread in delivered)
+
+# a full queue drops events instead of blocking the caller
+release, started = threading.Event(), threading.Event()
+delivered = []
+
+
+def slow(e: RpcCallEvent):
+    started.set()
+    release.wait()
+    delivered.append(e.method)
+
+
+dispatcher = RpcEventDispatcher(slow, asynchronous=True, queue_size=2)
+dispatcher.publish(event('delivering'))
+started.wait(5)
+for i in range(5):
+    dispatcher.publish(event(f'queued{i}'))
+assert dispatcher.dropped == 3
+release.set()
+# close delivers what is queued, and stops the thread
+dispatcher.close()
+assert delivered == ['delivering', 'queued0', 'queued1'] and not dispatcher._thread.is_alive()
+dispatcher.close()
+
+# events of a client, delivered asynchronously with sampling
+with FairyStubServer() as server:
+    events = []
+    dispatcher = RpcEventDispatcher(events.append, asynchronous=True)
+    client = server.client(wallet_scripthash, fairy_session='events', rpc_event_dispatcher=dispatcher)
+    client.list_snapshots()
+    dispatcher.flush()
+    events_before = len(events)
+    server.set_response('invokefunctionwithsession', server.halt_result(7))
+    assert client.invokefunction_of_any_contract(contract, 'balanceOf', [wallet_scripthash], relay=False) == 7
+    dispatcher.flush()
+    assert len(events) == events_before + 1
+    invocation = events[-1]
+    assert (invocation.method, invocation.status, invocation.fairy_session) == ('invokefunctionwithsession', 'ok', 'events')
+    assert invocation.params_size > 0 and invocation.response_size > 0 and invocation.duration >= 0
+    assert invocation.gas_consumed == 1_0000_0000
+    dispatcher.sample_rate = 0.0
+    client.get_block_count()
+    dispatcher.flush()
+    assert len(events) == events_before + 1
+    dispatcher.close()
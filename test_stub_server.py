@@ -0,0 +1,39 @@
+from neo_fairy_client import Hash160Str, RpcEventDispatcher
+from neo_fairy_client.rpc.stub_server import FairyStubServer, StubRpcError
+
+wallet_scripthash = Hash160Str('0x' + '22' * 20)
+contract = Hash160Str('0x' + '11' * 20)
+
+with FairyStubServer() as server:
+    events = []
+    client = server.client(wallet_scripthash, fairy_session='stub',
+                           rpc_event_dispatcher=RpcEventDispatcher(events.append))
+    assert 'stub' in client.list_snapshots()
+    client.copy_snapshot('stub', 'stub-copy')
+    assert set(client.list_snapshots()) == {'stub', 'stub-copy'}
+    client.delete_snapshots('stub-copy')
+
+    client.put_storage_with_session(b'\x01a', 1, contract_scripthash=contract)
+    client.put_storage_with_session(b'\x01b', 2, contract_scripthash=contract)
+    client.put_storage_with_session(b'\x02c', 3, contract_scripthash=contract)
+    assert len(client.find_storage_with_session(b'\x01', contract_scripthash=contract)) == 2
+    client.put_storage_with_session(b'\x01a', '', contract_scripthash=contract)
+    assert len(client.find_storage_with_session(b'\x01', contract_scripthash=contract)) == 1
+
+    server.set_response('invokefunctionwithsession', lambda params: server.halt_result([params[3], (1, b'\xff')]))
+    assert client.invokefunction_of_any_contract(contract, 'symbol') == ['symbol', (1, b'\xff')]
+    server.set_response('invokefunctionwithsession', server.fault_result('ASSERT is executed with false result.'))
+    assert 'ASSERT' in client.invokefunction_of_any_contract(contract, 'mint', do_not_raise_on_result=True)
+
+    def reject(params):
+        raise StubRpcError('Invalid params', code=-32602)
+    server.set_response('getblockcount', reject)
+    try:
+        client.get_block_count()
+        raise AssertionError('expected an error')
+    except ValueError:
+        pass
+
+    assert len(client.get_many_blocks([0, 9])) == 10
+    assert [e.status for e in events[-3:]] == ['vm_fault', 'rpc_error', 'ok']
+    assert events[-1].method == 'getmanyblocks' and events[-4].fairy_session == 'stub'
@@ -0,0 +1,84 @@
+from neo_fairy_client import Hash160Str
+from neo_fairy_client.rpc.stub_server import FairyStubServer, StubRpcError
+
+contract = Hash160Str('0x' + '11' * 20)
+other_contract = Hash160Str('0x' + '33' * 20)
+assembly, source_code = dict(), dict()  # breakpoints on the server: {contract: set}
+
+
+def set_assembly(params):
+    if 1 in params[1:]:
+        raise StubRpcError('No instruction at InstructionPointer=1')
+    assembly.setdefault(params[0], set()).update(params[1:])
+    return sorted(assembly[params[0]])
+
+
+def delete_assembly(params):
+    if len(params) == 1:
+        assembly[params[0]] = set()
+    else:
+        assembly.setdefault(params[0], set()).difference_update(params[1:])
+    return sorted(assembly[params[0]])
+
+
+def set_source_code(params):
+    pairs = [(params[i], params[i + 1]) for i in range(1, len(params), 2)]
+    source_code.setdefault(params[0], set()).update(pairs)
+    return [{'filename': f, 'line': l} for f, l in pairs]
+
+
+def delete_source_code(params):
+    if len(params) == 1:
+        source_code[params[0]] = set()
+    else:
+        source_code.setdefault(params[0], set()).difference_update((params[i], params[i + 1]) for i in range(1, len(params), 2))
+    return [{'filename': f, 'line': l} for f, l in sorted(source_code[params[0]])]
+
+
+with FairyStubServer() as server:
+    server.set_response('setassemblybreakpoints', set_assembly)
+    server.set_response('listassemblybreakpoints', lambda params: sorted(assembly.get(params[0], set())))
+    server.set_response('deleteassemblybreakpoints', delete_assembly)
+    server.set_response('setsourcecodebreakpoints', set_source_code)
+    server.set_response('listsourcecodebreakpoints', lambda params: [{'filename': f, 'line': l} for f, l in sorted(source_code.get(params[0], set()))])
+    server.set_response('deletesourcecodebreakpoints', delete_source_code)
+    assembly[str(contract)] = {0, 3, 7}  # left by a previous run of the debug script
+    client = server.client(contract_scripthash=contract)
+
+    # first sync lists what is set, then adds and deletes only the differences
+    bodies_before = server.body_count
+    assert client.sync_breakpoints([3, 7, 10], [('NFTLoan.cs', 88), ('NFTLoan.cs', 253)]) == {'added': 3, 'deleted': 1, 'batches': 2}
+    assert server.body_count - bodies_before == 2
+    assert assembly[str(contract)] == {3, 7, 10} and source_code[str(contract)] == {('NFTLoan.cs', 88), ('NFTLoan.cs', 253)}
+    assert server.method_counts['setassemblybreakpoints'] == 1 and server.method_counts['deleteassemblybreakpoints'] == 1
+
+    # declaring the same breakpoints again sends nothing
+    bodies_before = server.body_count
+    assert client.sync_breakpoints([10, 7, 3], [('NFTLoan.cs', 253), ('NFTLoan.cs', 88)]) == {'added': 0, 'deleted': 0, 'batches': 0}
+    assert server.body_count == bodies_before
+
+    # the cache follows the breakpoint methods of the client, single or batched
+    client.set_assembly_breakpoints(20)
+    client.delete_source_code_breakpoint('NFTLoan.cs', 88)
+    assert client.breakpoint_cache.assembly[str(contract)] == {3, 7, 10, 20}
+    assert client.breakpoint_cache.source_code[str(contract)] == {('NFTLoan.cs', 253)}
+    assert client.sync_breakpoints({contract: [3], other_contract: [5]}) == {'added': 1, 'deleted': 3, 'batches': 2}
+    assert assembly[str(contract)] == {3} and assembly[str(other_contract)] == {5}
+    assert source_code[str(contract)] == {('NFTLoan.cs', 253)}  # untouched
+    assert client.sync_breakpoints(source_code_breakpoints=[]) == {'added': 0, 'deleted': 1, 'batches': 1}
+    assert source_code[str(contract)] == set()
+
+    # failures make the contract unknown, so the next sync lists it again
+    try:
+        client.sync_breakpoints([1, 3])
+        raise AssertionError('invalid instruction pointers should be rejected')
+    except ValueError:
+        pass
+    assert str(contract) not in client.breakpoint_cache.assembly
+    assert client.sync_breakpoints([3, 4]) == {'added': 1, 'deleted': 0, 'batches': 2}
+
+    # changes by others are seen with refresh=True
+    assembly[str(contract)].add(99)
+    assert client.sync_breakpoints([3, 4]) == {'added': 0, 'deleted': 0, 'batches': 0}
+    assert client.sync_breakpoints([3, 4], refresh=True) == {'added': 0, 'deleted': 1, 'batches': 2}
+    assert assembly[str(contract)] == {3, 4}
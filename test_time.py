@@ -2,6 +2,7 @@ import json
 import time
 from neo_fairy_client.rpc import FairyClient
 from neo_fairy_client.utils.types import Hash160Str, Signer, WitnessScope
+from neo_fairy_client import requests_session_from_environment
 
 target_url = 'http://127.0.0.1:16868'
 wallet_address = 'Nb2CHYY5wTh2ac58mTue5S3wpG6bQv5hSY'
@@ -30,7 +31,7 @@ with open('getTimeContract.manifest.json', 'r') as f:
 
 session = 'Runtime.Time'
 client = FairyClient(target_url, wallet_address, signers=signer,
-                     with_print=True, fairy_session=session)
+                     with_print=True, fairy_session=session, requests_session=requests_session_from_environment())
 print(client.new_snapshots_from_current_system())
 print(client.list_snapshots())
 
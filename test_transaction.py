@@ -0,0 +1,77 @@
+import base64
+import hashlib
+from neo_fairy_client import Transaction, Witness, transaction_hash, Signer, WitnessScope, Hash160Str, PublicKeyStr
+from neo_fairy_client.utils import WitnessRule
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+from neo_fairy_client.rpc.relay import RelayPipeline
+
+account = Hash160Str('0xd2cefc96ad5cb7b625a0986ef6badde0533731d5')
+contract = Hash160Str('0xef4073a0f2b305a38ec4050e4d3d28bc40ea63f5')
+group = PublicKeyStr('0262cafcd9cba9463c868e6f9e3cbe490d658941cee3523d4011090a344287e2e1')
+script = bytes.fromhex('11c01f0c0873796d626f6c0c14f563ea40bc283d4d0e05c48ea305b3f2a07340ef41627d5b52')
+
+# the wire format, written by hand
+tx = Transaction(script, [Signer(account)], system_fee=1000_0000, network_fee=123_4567, valid_until_block=5000, nonce=0x01020304)
+unsigned = bytes([0]) + bytes.fromhex('04030201') + (1000_0000).to_bytes(8, 'little') + (123_4567).to_bytes(8, 'little') \
+    + (5000).to_bytes(4, 'little') + b'\x01' + account.to_UInt160()._data + b'\x01' + b'\x00' + bytes([len(script)]) + script
+assert tx.unsigned_bytes() == unsigned
+assert tx.to_bytes() == unsigned + b'\x00'
+assert tx.hash.to_str() == '0x' + hashlib.sha256(unsigned).digest()[::-1].hex()
+assert tx.sign_data(860833102) == (860833102).to_bytes(4, 'little') + hashlib.sha256(unsigned).digest()
+assert tx.sender == account and tx.size == len(unsigned) + 1
+
+# every kind of signer scope, witness condition and attribute
+rules = [
+    WitnessRule.Allow(WitnessRule.And(WitnessRule.CalledByEntry(), WitnessRule.Not(WitnessRule.ScriptHash(contract)))),
+    WitnessRule.Deny(WitnessRule.Or(WitnessRule.Group(group), WitnessRule.CalledByContract(contract), WitnessRule.CalledByGroup(group))),
+    WitnessRule.Allow(WitnessRule.True_()),
+]
+signers = [
+    Signer(account, [WitnessScope.CalledByEntry, WitnessScope.CustomContracts, WitnessScope.CustomGroups],
+           allowedcontracts=[contract], allowedgroups=[group]),
+    Signer(contract, WitnessScope.WitnessRules, rules=rules),
+    Signer(Hash160Str('0x' + '11' * 20), WitnessScope.Global),
+    Signer(Hash160Str('0x' + '22' * 20), WitnessScope.NONE),
+]
+attributes = [
+    {'type': 'HighPriority'}, {'type': 'NotValidBefore', 'height': 100}, {'type': 'Conflicts', 'hash': '0x' + 'ab' * 32},
+    {'type': 'OracleResponse', 'id': 7, 'code': 0, 'result': base64.b64encode(b'{"price": 1}').decode()}, {'type': 'NotaryAssisted', 'nkeys': 3},
+]
+witnesses = [Witness(b'\x0c\x40' + bytes(64), b'\x0c\x21' + bytes.fromhex(str(group)) + b'\x41\x56\xe7\xb3\x27')] * 4
+tx = Transaction(script, signers, 1, 2, 3, 4, attributes, witnesses)
+parsed = Transaction.from_base64(tx.to_base64())
+assert parsed.to_bytes() == tx.to_bytes() and parsed.hash == tx.hash
+assert parsed.signers[0].scope_list() == [WitnessScope.CalledByEntry, WitnessScope.CustomContracts, WitnessScope.CustomGroups]
+assert parsed.signers[0].allowedcontracts == [contract] and parsed.signers[0].allowedgroups == [group]
+assert parsed.signers[1].rules == rules and parsed.signers[2].scopes == WitnessScope.Global and parsed.signers[3].scopes == WitnessScope.NONE
+assert parsed.attributes == attributes
+assert parsed.witnesses[0].verification_script == witnesses[0].verification_script
+assert parsed.to_dict()['signers'][0]['scopes'] == 'CalledByEntry, CustomContracts, CustomGroups'
+assert Signer.from_dict(parsed.to_dict()['signers'][0]).scope_list() == parsed.signers[0].scope_list()
+assert transaction_hash(tx.to_base64()) == tx.hash == transaction_hash(tx.to_bytes())
+# witnesses do not change the hash
+tx.witnesses = []
+assert tx.hash == parsed.hash
+
+# malformed transactions
+data = parsed.to_bytes()
+for malformed in [data[:-1], data + b'\x00', b'\x01' + data[1:], data[:25] + b'\x00' + data[26:]]:
+    try:
+        Transaction.from_bytes(malformed)
+        raise AssertionError(f'accepted malformed transaction {malformed.hex()}')
+    except ValueError:
+        pass
+global_and_entry = Transaction(script, [Signer(account)]).to_bytes().replace(account.to_UInt160()._data + b'\x01', account.to_UInt160()._data + b'\x81')
+try:
+    Transaction.from_bytes(global_and_entry)
+    raise AssertionError('Global cannot be combined with other scopes')
+except ValueError:
+    pass
+
+# relay pipelines and the stub server know the hash before the node answers
+with FairyStubServer() as server:
+    client = server.client(account)
+    assert client.sendrawtransaction(parsed.to_base64())['hash'] == parsed.hash.to_str()
+    server.set_error('sendrawtransaction', 'AlreadyInPool')
+    report = RelayPipeline(client).relay([parsed.to_base64()])
+    assert report.results[0].status == 'duplicate' and report.results[0].tx_hash == parsed.hash
@@ -0,0 +1,58 @@
+import hashlib
+import threading
+import time
+from neo_fairy_client import TransactionTracker
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+
+tx_hashes = ['0x' + hashlib.sha256(i.to_bytes(4, 'little')).hexdigest() for i in range(200)]
+blocks = dict()  # {index: [tx hashes]}
+mempool = list(tx_hashes)
+
+
+def get_many_blocks(params):
+    return [{**FairyStubServer.fake_block(i), 'tx': [{'hash': h} for h in blocks.get(i, [])]} for i in range(params[0], params[1] + 1)]
+
+
+def mine(server: FairyStubServer, count: int):
+    for _ in range(count):
+        time.sleep(0.2)
+        blocks[server.block_count] = [mempool.pop() for _ in range(min(50, len(mempool)))]
+        server.block_count += 1
+
+
+with FairyStubServer() as server:
+    server.block_count = 10
+    server.set_response('getmanyblocks', get_many_blocks)
+    server.set_response('getapplicationlog', lambda params: {'txid': params[0], 'executions': [{'vmstate': 'HALT'}]})
+    client = server.client()
+    client.transaction_tracker = TransactionTracker(client, block_time=0.2, min_poll_interval=0.05, max_poll_interval=0.2)
+
+    miner = threading.Thread(target=mine, args=(server, 5))
+    miner.start()
+    futures = client.track_transactions(tx_hashes, timeout=10)
+    missing = '0x' + 'ff' * 32
+    missing_future = client.track_transactions(missing, timeout=0.5)[missing]
+    logs = {tx_hash: future.result(timeout=10) for tx_hash, future in futures.items()}
+    miner.join()
+    assert all(logs[h]['txid'] == h for h in tx_hashes)
+    try:
+        missing_future.result(timeout=5)
+        raise AssertionError('the transaction was never included')
+    except TimeoutError:
+        pass
+
+    tracker = client.transaction_tracker
+    # one poller for all 201 waiters; blocks and application logs are read in batches
+    assert server.method_counts['getblockcount'] == tracker.polls < 100
+    assert server.method_counts['getapplicationlog'] == 200
+    assert tracker.round_trips == tracker.polls + server.method_counts['getmanyblocks'] + 4
+    assert not tracker.pending
+    time.sleep(0.3)
+    assert tracker._thread is None  # no poller without waiters
+
+    # transactions included before tracking started are found in the latest block
+    blocks[server.block_count] = [missing]
+    server.block_count += 1
+    tracker.block_count = None
+    assert tracker.track(missing, timeout=2).result(timeout=5)['txid'] == missing
+    tracker.stop()
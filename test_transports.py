@@ -0,0 +1,90 @@
+import socket
+import threading
+import requests
+from neo_fairy_client import FairyClient, Hash160Str, RetryPolicy, EndpointPool, HttpClientTransport, make_transport
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+
+wallet = Hash160Str('0xd2cefc96ad5cb7b625a0986ef6badde0533731d5')
+
+with FairyStubServer(latency=lambda method: 0.5 if method == 'hellofairy' else 0.0) as server:
+    for name in ['requests', 'urllib3', 'http.client']:
+        transport = make_transport(name, pool_maxsize=4)
+        client = server.client(wallet, requests_session=transport, fairy_session='transport')
+        assert client.get_block_count() == 1000
+        assert client.meta_rpc_batch([('getblockcount', []), ('getmanyblocks', [0, 2])])[1][2]['index'] == 2
+        client.put_storage_with_session(b'key', b'value', contract_scripthash=wallet)
+        assert client.get_storage_with_session(b'key', contract_scripthash=wallet) == {'a2V5': 'dmFsdWU='}
+        # errors of every transport are those of requests
+        client.requests_timeout = 0.1
+        try:
+            client.hello_fairy()
+            raise AssertionError(f'{name} did not time out')
+        except requests.Timeout:
+            pass
+        client.requests_timeout = None
+        assert client.get_block_count() == 1000  # the timed out connection is not reused
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            closed_url = f'http://127.0.0.1:{s.getsockname()[1]}'
+        try:
+            transport.post(closed_url, '{}', timeout=1)
+            raise AssertionError(f'{name} connected to a closed port')
+        except requests.ConnectionError:
+            pass
+        # and they work with retry policies and endpoint pools
+        pool_client = FairyClient(EndpointPool([closed_url, server.url]), wallet, with_print=False,
+                                  requests_session=transport, retry_policy=RetryPolicy(timeout=1))
+        assert pool_client.get_block_count() == 1000
+
+    transport = HttpClientTransport(pool_maxsize=2)
+    transport.post(server.url, '{"jsonrpc":"2.0","method":"getblockcount","params":[],"id":1}')
+    connection = next(iter(transport._idle.values())).get_nowait()
+    assert connection.sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+    # an idle connection closed by the server is replaced
+    connection.sock.shutdown(socket.SHUT_RDWR)
+    next(iter(transport._idle.values())).put_nowait(connection)
+    assert transport.post(server.url, '{"jsonrpc":"2.0","method":"getblockcount","params":[],"id":1}').json()['result'] == 1000
+    transport.close()
+
+# a request is never sent again once the server may have executed it
+received = []
+
+
+def answer_once_then_hang_up(listener: socket.socket):
+    connection, _ = listener.accept()
+    with connection:
+        stream = connection.makefile('rb')
+        while True:
+            headers = [line for line in iter(stream.readline, b'\r\n')]
+            if not headers:
+                return
+            length = next(int(line.split(b':')[1]) for line in headers if line.lower().startswith(b'content-length'))
+            received.append(stream.read(length))
+            if len(received) > 1:
+                return  # executed, but the response is lost
+            connection.sendall(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 36\r\n\r\n'
+                               b'{"jsonrpc":"2.0","id":1,"result":42}')
+
+
+with socket.socket() as listener:
+    listener.bind(('127.0.0.1', 0))
+    listener.listen()
+    thread = threading.Thread(target=answer_once_then_hang_up, args=(listener,), daemon=True)
+    thread.start()
+    transport = HttpClientTransport()
+    url = f'http://127.0.0.1:{listener.getsockname()[1]}'
+    assert transport.post(url, '{"method":"getblockcount"}', timeout=5).json()['result'] == 42
+    try:
+        transport.post(url, '{"method":"sendrawtransaction"}', timeout=5)
+        raise AssertionError('the lost response should raise')
+    except requests.ConnectionError:
+        pass
+    thread.join(5)
+    assert received == [b'{"method":"getblockcount"}', b'{"method":"sendrawtransaction"}']
+    transport.close()
+
+try:
+    make_transport('curl')
+    raise AssertionError('unknown transport')
+except ValueError:
+    pass
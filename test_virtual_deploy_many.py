@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import time
+from neo_fairy_client import Hash160Str, DeployCache
+from neo_fairy_client.rpc.stub_server import FairyStubServer
+from neo_fairy_client.utils.nef import NefFile
+
+wallet_scripthash = Hash160Str('0x' + '22' * 20)
+main_method = {'name': 'main', 'parameters': [], 'returntype': 'Void', 'offset': 0, 'safe': False}
+directory = tempfile.mkdtemp()
+nef_paths = []
+for i, name in enumerate(['Token', 'Pool', 'Router']):
+    nef_path = os.path.join(directory, f'{name}.nef')
+    with open(nef_path, 'wb') as f:
+        f.write(NefFile(b'\x40', source=name).to_bytes())
+    with open(os.path.join(directory, f'{name}.manifest.json'), 'w') as f:
+        json.dump({'name': name, 'abi': {'methods': [main_method], 'events': []}, 'permissions': []}, f)
+    with open(os.path.join(directory, f'{name}.nefdbgnfo'), 'wb') as f:
+        f.write(b'PK debug info ' + name.encode())
+    nef_paths.append(nef_path)
+time.sleep(0.01)
+for nef_path in nef_paths:
+    with open(f'{nef_path}.txt', 'w') as f:
+        f.write('0 RET')
+token, pool, router = nef_paths
+
+with FairyStubServer() as server:
+    client = server.client(wallet_scripthash, fairy_session='deploy-many',
+                           deploy_cache=DeployCache(os.path.join(directory, 'deploy_cache.json')))
+    bodies_before = server.body_count
+    hashes = client.virtual_deploy_many(nef_paths, dependencies={router: [token, pool]}, data_by_path={pool: 1})
+    assert set(hashes) == {'Token', 'Pool', 'Router'}
+    assert len(set(hashes.values())) == 3
+    assert server.method_counts['virtualdeploy'] == 3 and server.method_counts['setdebuginfo'] == 3
+    # deploys and debug info in a single batch
+    assert server.body_count - bodies_before == 1
+    assert hashes['Router'] == client.predict_contract_hash_from_path(router)
+    assert client.contract_scripthash is None or client.contract_scripthash not in hashes.values()
+    assert client.get_contract_metadata(hashes['Pool']).name == 'Pool'
+
+    # everything is cached for the session now
+    assert client.virtual_deploy_many(nef_paths, dependencies={router: [token, pool]}, data_by_path={pool: 1}) == hashes
+    assert server.method_counts['virtualdeploy'] == 3 and server.method_counts['setdebuginfo'] == 3
+
+    # the same contracts deployed one by one have the same hashes
+    client.fairy_session = 'deploy-one-by-one'
+    client.new_snapshots_from_current_system()
+    assert client.virutal_deploy_from_path(token) == hashes['Token']
+
+    try:
+        client.virtual_deploy_many([token, pool], dependencies={token: [pool], pool: [token]})
+        raise AssertionError('circular dependencies should be rejected')
+    except ValueError:
+        pass
+
+    server.set_error('virtualdeploy', 'bad contract')
+    client.fairy_session = 'deploy-fail'
+    client.new_snapshots_from_current_system()
+    try:
+        client.virtual_deploy_many(nef_paths)
+        raise AssertionError('deploy errors should be raised')
+    except ValueError as e:
+        assert 'Router' in str(e)
+
+
+# debug info sent to a wrongly predicted scripthash is moved to the deployed contract
+with FairyStubServer() as server:
+    actual_hash = '0x' + '44' * 20
+    server.set_response('virtualdeploy', lambda params: {params[0]: actual_hash})
+    client = server.client(wallet_scripthash, fairy_session='deploy-mispredicted')
+    predicted_hash = client.predict_contract_hash_from_path(token)
+    assert client.virtual_deploy_many([token]) == {'Token': Hash160Str(actual_hash)}
+    assert server.debug_info.get(actual_hash) and str(predicted_hash) not in server.debug_info
+    assert server.method_counts['deletedebuginfo'] == 1
+    assert Hash160Str(actual_hash) in client.debug_info_sources
@@ -1,10 +1,11 @@
-from neo_fairy_client import FairyClient, Signer, WitnessScope, Hash160Str
+from neo_fairy_client import FairyClient, Signer, WitnessScope, Hash160Str, requests_session_from_environment
 from neo_fairy_client.utils.WitnessRule import *
 
 wallet_address = 'Nb2CHYY5wTh2ac58mTue5S3wpG6bQv5hSY'
 wallet_scripthash = Hash160Str.from_address(wallet_address)
 
-client = FairyClient(fairy_session='test-witness-rule', wallet_address_or_scripthash=wallet_address, with_print=False)
+client = FairyClient(fairy_session='test-witness-rule', wallet_address_or_scripthash=wallet_address, with_print=False,
+                     requests_session=requests_session_from_environment())
 nftloan_scripthash = client.virutal_deploy_from_path('../NFTLoan/NFTLoan/bin/sc/NFTFlashLoan.nef')
 test_nopht_d_hash = client.virutal_deploy_from_path('../NFTLoan/NophtD/bin/sc/TestNophtD.nef')
 client.contract_scripthash = nftloan_scripthash